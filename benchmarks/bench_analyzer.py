@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+内容分析基准测试 - 对比逐条分析与 ContentAnalyzer.analyze_batch (单进程 / 多进程)
+
+用法:
+    python3 benchmarks/bench_analyzer.py [--items 20000] [--workers 4]
+
+文本由 data.json / 合成句子拼成；批量结果与改造前的逐条实现逐条比对，
+不一致时以非零状态退出。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+
+from ai_summary import ContentAnalyzer
+
+WORDS = ['OpenAI', 'Google', 'SpaceX', 'NASA', 'IPO', 'billion', 'robot', 'model', 'launch',
+         'breakthrough', 'delay', 'issue', 'progress', '发布', '融资', '突破', '失败', '具身智能',
+         '大模型', '火箭', '机器人', '亿', '首次', 'the', 'a', 'new', 'system', 'data', '2025']
+
+def legacy_sentiment(analyzer, text):
+    """改造前的情感分析：正负情感词各自逐词查找"""
+    text = text.lower()
+    p_count = sum(1 for w in analyzer.POSITIVE_WORDS if w in text)
+    n_count = sum(1 for w in analyzer.NEGATIVE_WORDS if w in text)
+
+    if p_count > n_count:
+        return "positive"
+    elif n_count > p_count:
+        return "negative"
+    return "neutral"
+
+def legacy_importance(analyzer, title, content):
+    """改造前的重要性评分：每个命中的重要实体加0.5，限制在0-5范围"""
+    score = 0.0
+    text = (title + " " + content).lower()
+    for entity in analyzer.IMPORTANT_ENTITIES:
+        if entity in text:
+            score += 0.5
+    return min(5.0, max(0, score))
+
+def legacy_analyze(analyzer, title, content):
+    """改造前 ContentAnalyzer.analyze 的实现，作为批量结果的比对基准"""
+    return {
+        "summary": analyzer.summarizer.summarize(content, title),
+        "keywords": analyzer.keyword_extractor.extract(title + " " + content),
+        "sentiment": legacy_sentiment(analyzer, title + " " + content),
+        "importance": legacy_importance(analyzer, title, content),
+    }
+
+def build_items(count, rng):
+    items = []
+    for _ in range(count):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 10)))
+        sentences = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + rng.choice('.。!？')
+                     for _ in range(rng.randint(1, 8))]
+        items.append((title, ' '.join(sentences)))
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description='analyze_batch 基准测试')
+    parser.add_argument('--items', type=int, default=20000, help='资讯条数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='进程数')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    items = build_items(args.items, random.Random(args.seed))
+    analyzer = ContentAnalyzer()
+
+    start = time.perf_counter()
+    legacy = [legacy_analyze(analyzer, t, c) for t, c in items]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    serial = analyzer.analyze_batch(items, workers=1)
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = analyzer.analyze_batch(items, workers=args.workers)
+    parallel_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b, c in zip(legacy, serial, parallel) if not a == b == c)
+    result = {
+        "items": len(items),
+        "workers": args.workers,
+        "per_item_ms": round(legacy_seconds * 1000, 2),
+        "batch_serial_ms": round(serial_seconds * 1000, 2),
+        "batch_parallel_ms": round(parallel_seconds * 1000, 2),
+        "speedup": round(legacy_seconds / parallel_seconds, 2) if parallel_seconds else None,
+        "mismatches": mismatches,
+    }
+    print(json.dumps(result, ensure_ascii=False))
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
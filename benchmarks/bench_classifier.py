@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+关键词分类器基准测试 - 对比逐关键词子串扫描与 Aho-Corasick 自动机
+
+用法:
+    python3 benchmarks/bench_classifier.py [--keywords 500] [--items 5000] [--match-rate 0.3]
+
+关键词表取自 config.example.json，不足 --keywords 个时用合成词补齐；
+两种实现的结果逐条比对，不一致时以非零状态退出。
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+
+from keyword_matcher import KeywordClassifier
+
+def legacy_classify(title, summary, keywords):
+    """改造前 monitor.classify_content 的实现"""
+    text = (title + " " + summary).lower()
+    categories = []
+    for cat, kws in keywords.items():
+        for kw in kws:
+            if kw.lower() in text:
+                categories.append(cat)
+                break
+    return categories if categories else ["other"]
+
+def random_word(rng, cjk=False):
+    if cjk:
+        return ''.join(chr(rng.randint(0x4e00, 0x4e00 + 2000)) for _ in range(rng.randint(2, 4)))
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+def build_keywords(target, rng):
+    with open(os.path.join(BASE_DIR, 'config.example.json'), 'r', encoding='utf-8') as f:
+        keywords = {cat: list(kws) for cat, kws in json.load(f)["keywords"].items()}
+    cats = list(keywords)
+    total = sum(len(kws) for kws in keywords.values())
+    while total < target:
+        keywords[cats[total % len(cats)]].append(random_word(rng, cjk=total % 3 == 0))
+        total += 1
+    return keywords
+
+def build_texts(count, keywords, match_rate, rng):
+    all_kws = [kw for kws in keywords.values() for kw in kws]
+    filler = [random_word(rng, cjk=i % 4 == 0) for i in range(500)]
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(filler) for _ in range(rng.randint(20, 50))]
+        if rng.random() < match_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(all_kws))
+        title = ' '.join(words[:8])
+        texts.append((title, ' '.join(words[8:])))
+    return texts
+
+def main():
+    parser = argparse.ArgumentParser(description='classify_content 基准测试')
+    parser.add_argument('--keywords', type=int, default=500, help='关键词总数')
+    parser.add_argument('--items', type=int, default=5000, help='资讯条数')
+    parser.add_argument('--match-rate', type=float, default=0.3, help='含关键词的资讯比例')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = build_keywords(args.keywords, rng)
+    texts = build_texts(args.items, keywords, args.match_rate, rng)
+
+    start = time.perf_counter()
+    classifier = KeywordClassifier(keywords)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [legacy_classify(t, s, keywords) for t, s in texts]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    current = [classifier.classify(t, s) for t, s in texts]
+    current_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    result = {
+        "keywords": sum(len(kws) for kws in keywords.values()),
+        "items": len(texts),
+        "compile_ms": round(compile_seconds * 1000, 2),
+        "legacy_ms": round(legacy_seconds * 1000, 2),
+        "automaton_ms": round(current_seconds * 1000, 2),
+        "speedup": round(legacy_seconds / current_seconds, 2) if current_seconds else None,
+        "mismatches": mismatches,
+    }
+    print(json.dumps(result, ensure_ascii=False))
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
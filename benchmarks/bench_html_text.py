@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+RSS 摘要 HTML 清理基准测试 - 对比逐条 BeautifulSoup 与单遍标签剥离
+
+用法:
+    python3 benchmarks/bench_html_text.py [--items 2000] [--paragraphs 40] [--malformed-rate 0.01]
+
+合成类似 content:encoded 的正文 (段落、链接、实体、图片、<script>/<style>、注释)，
+按 RSSSource 的方式生成 300 字符摘要；--malformed-rate 比例的条目带未闭合标签，走 BeautifulSoup 回退。
+两种实现的摘要逐条比对，不一致时以非零状态退出。
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import string
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+
+from bs4 import BeautifulSoup
+from html_text import html_to_text
+from rss import SUMMARY_LENGTH
+
+def legacy_summary(html):
+    """改造前 RSSSource.fetch 的清理和截断"""
+    summary = BeautifulSoup(html, "html.parser").get_text()
+    summary = re.sub(r'\s+', ' ', summary).strip()
+    return summary[:SUMMARY_LENGTH] + "..." if len(summary) > SUMMARY_LENGTH else summary
+
+def current_summary(html):
+    summary = html_to_text(html, limit=SUMMARY_LENGTH)
+    return summary[:SUMMARY_LENGTH] + "..." if len(summary) > SUMMARY_LENGTH else summary
+
+def random_word(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 10)))
+
+def build_body(rng, paragraphs, malformed):
+    parts = []
+    if rng.random() < 0.2:
+        parts.append('<style>p { color: #333; } a > b { margin: 0 }</style>')
+    for i in range(rng.randint(1, paragraphs)):
+        words = [random_word(rng) for _ in range(rng.randint(10, 60))]
+        for j in rng.sample(range(len(words)), 3):
+            words[j] = rng.choice([
+                f'<a href="https://example.com/{words[j]}?a=1&amp;b=2" title="x > y">{words[j]}</a>',
+                f'<b>{words[j]}</b>', f'<em>{words[j]}</em>', '&amp;', '&#8217;', '&nbsp;', '&eacute;',
+            ])
+        parts.append(f'<p>{" ".join(words)}</p>\n')
+        if i % 5 == 4:
+            parts.append('<figure><img src="https://example.com/a.png" alt="chart" /></figure>'
+                         '<!-- ad slot --><script>window.ads = "<div>";</script>')
+    body = ''.join(parts)
+    if malformed:
+        body = body[:len(body) // 3] + '<div class="cut'
+    return body
+
+def main():
+    parser = argparse.ArgumentParser(description='RSS 摘要 HTML 清理基准测试')
+    parser.add_argument('--items', type=int, default=2000, help='条目数')
+    parser.add_argument('--paragraphs', type=int, default=40, help='每条正文的最大段落数')
+    parser.add_argument('--malformed-rate', type=float, default=0.01, help='带未闭合标签的条目比例')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bodies = [build_body(rng, args.paragraphs, rng.random() < args.malformed_rate)
+              for _ in range(args.items)]
+
+    start = time.perf_counter()
+    legacy = [legacy_summary(b) for b in bodies]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    current = [current_summary(b) for b in bodies]
+    current_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    result = {
+        "items": len(bodies),
+        "avg_body_kb": round(sum(len(b) for b in bodies) / len(bodies) / 1024, 1),
+        "legacy_ms": round(legacy_seconds * 1000, 2),
+        "stripper_ms": round(current_seconds * 1000, 2),
+        "legacy_us_per_item": round(legacy_seconds / len(bodies) * 1e6, 1),
+        "stripper_us_per_item": round(current_seconds / len(bodies) * 1e6, 1),
+        "speedup": round(legacy_seconds / current_seconds, 2) if current_seconds else None,
+        "mismatches": mismatches,
+    }
+    print(json.dumps(result, ensure_ascii=False))
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+端到端流水线基准测试 - 对本地数据源替身跑完整的采集、处理、订阅匹配、报告和入库
+
+用法:
+    python3 benchmarks/bench_pipeline.py [--rss 8] [--items 50] [--latency 20] [--output result.json]
+
+在子进程中启动 feed_server.py，按参数生成指向它的配置，依次执行
+collect_all / process_items / filter_new_items / save_data / check_subscriptions / generate_report，
+输出各阶段耗时、吞吐 (条/秒) 和进程峰值内存 (RSS) 的 JSON。
+最后再采集一轮 (collect_all_cached)：RSS/Atom/arXiv 应全部通过条件请求得到 304 并复用缓存，
+否则以非零状态退出。
+报告、网站数据、资讯库、订阅和缓存文件 (feed_cache.json 等) 都写到临时目录，不影响项目数据。
+流水线自身的日志输出到 stderr，stdout 只有结果 JSON。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+
+import monitor
+from feed_cache import FeedCache
+from storage import open_store
+from subscription import SubscriptionManager
+
+def peak_rss_mb() -> float:
+    """进程迄今为止的峰值常驻内存 (Linux 单位为KB，macOS 为字节)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+def traffic_bytes(client) -> int:
+    """上次 collect_all 开始以来下载的字节数 (collect_all 开始时清零统计)"""
+    return int(sum(s["bytes"] for s in client.stats().values()))
+
+def start_feed_server(args) -> tuple:
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BASE_DIR, 'benchmarks', 'feed_server.py'),
+         '--items', str(args.items), '--latency', str(args.latency),
+         '--match-rate', str(args.match_rate)],
+        stdout=subprocess.PIPE, text=True
+    )
+    line = proc.stdout.readline()
+    if not line.startswith('PORT '):
+        proc.kill()
+        raise SystemExit("❌ feed_server.py 启动失败")
+    return proc, f"http://127.0.0.1:{int(line.split()[1])}"
+
+def build_config(args, base_url: str, workdir: str) -> dict:
+    with open(os.path.join(BASE_DIR, 'config.example.json'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    rss = [{"name": f"Bench-RSS-{i}", "url": f"{base_url}/rss/feed{i}.xml"} for i in range(args.rss)]
+    rss += [{"name": f"Bench-Atom-{i}", "url": f"{base_url}/atom/feed{i}.xml"} for i in range(args.atom)]
+    api = [{"name": "Bench-HN", "type": "hn", "top_n": args.hn, "max_workers": 8,
+            "api_base": f"{base_url}/hn/v0", "algolia_base": f"{base_url}/algolia",
+            "cache_file": os.path.join(workdir, 'hn_cache.json')}]
+    if args.reddit:
+        api.append({"name": "Bench-Reddit", "type": "reddit", "mode": "new", "limit": args.items * args.reddit,
+                    "subreddits": [f"sub{i}" for i in range(args.reddit)], "base_url": f"{base_url}/reddit",
+                    "state_file": os.path.join(workdir, 'reddit_state.json')})
+    api += [{"name": f"Bench-arXiv-{i}", "type": "arxiv", "category": f"cs.B{i}",
+             "max_results": args.items, "api_url": f"{base_url}/arxiv/query"} for i in range(args.arxiv)]
+    api += [{"name": f"Bench-X-{i}", "type": "twitter", "bearer_token": "bench", "query": f"query{i}",
+             "max_results": 100, "max_pages": 3, "api_base": f"{base_url}/twitter/2",
+             "state_file": os.path.join(workdir, 'twitter_state.json')} for i in range(args.twitter)]
+    config["sources"] = {"rss": rss, "api": api}
+    config["settings"]["http"]["retries"] = 0
+    return config
+
+def build_subscriptions(config: dict, count: int, path: str) -> SubscriptionManager:
+    keywords = [kw for kws in config["keywords"].values() for kw in kws]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"subscriptions": [], "alerts": []}, f)
+    mgr = SubscriptionManager(path)
+    for i in range(count):
+        kw = keywords[i % len(keywords)]
+        mgr.add_subscription(kw if i < len(keywords) else f"{kw}*{i}")
+    return mgr
+
+def main():
+    parser = argparse.ArgumentParser(description='StellarPulse 端到端基准测试')
+    parser.add_argument('--rss', type=int, default=8, help='RSS 源个数')
+    parser.add_argument('--atom', type=int, default=2, help='Atom 源个数')
+    parser.add_argument('--hn', type=int, default=100, help='HackerNews top_n')
+    parser.add_argument('--reddit', type=int, default=3, help='Reddit 子版块个数')
+    parser.add_argument('--arxiv', type=int, default=2, help='arXiv 分类个数')
+    parser.add_argument('--twitter', type=int, default=0, help='X 搜索查询个数')
+    parser.add_argument('--items', type=int, default=50, help='每个订阅源的条目数')
+    parser.add_argument('--latency', type=float, default=20, help='每个请求的附加延迟(毫秒)')
+    parser.add_argument('--match-rate', type=float, default=0.5, help='标题含关键词的比例')
+    parser.add_argument('--subs', type=int, default=50, help='关键词订阅数')
+    parser.add_argument('--output', help='结果另存为JSON文件')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='stellarpulse-bench-')
+    monitor.REPORTS_DIR = os.path.join(workdir, 'reports')
+    monitor.SITE_DATA_DIR = os.path.join(workdir, 'site_data')
+    monitor.SOURCE_HEALTH_FILE = os.path.join(workdir, 'source_health.json')
+
+    proc, base_url = start_feed_server(args)
+    stages = {}
+
+    def stage(name, count_in, func):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):
+            result = func()
+        seconds = time.perf_counter() - start
+        stages[name] = {
+            "seconds": round(seconds, 4),
+            "items": count_in,
+            "items_per_sec": round(count_in / seconds, 1) if seconds else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        return result
+
+    try:
+        config = build_config(args, base_url, workdir)
+        mgr = build_subscriptions(config, args.subs, os.path.join(workdir, 'keywords.json'))
+        store = open_store(os.path.join(workdir, 'data.db'), None)
+        feed_cache = FeedCache(os.path.join(workdir, 'feed_cache.json'))
+        client = monitor.get_http_client(config)
+        source_stats = []
+        run_start = time.perf_counter()
+
+        raw = stage("collect_all", 0, lambda: monitor.collect_all(config, source_stats, feed_cache))
+        stages["collect_all"]["items"] = len(raw)
+        seconds = stages["collect_all"]["seconds"]
+        stages["collect_all"]["items_per_sec"] = round(len(raw) / seconds, 1) if seconds else None
+        first_bytes = traffic_bytes(client)
+
+        processed = stage("process_items", len(raw), lambda: monitor.process_items(raw, config))
+        new_items = stage("filter_new_items", len(processed),
+                          lambda: monitor.filter_new_items(store, processed, config))
+        stage("save_data", len(new_items), lambda: monitor.save_data(store, new_items))
+        matches = stage("check_subscriptions", len(new_items),
+                        lambda: monitor.check_subscriptions(new_items, mgr))
+        stage("generate_report", len(processed), lambda: monitor.generate_report(processed, config, new_items=new_items))
+        total_seconds = time.perf_counter() - run_start
+
+        # 第二轮采集：订阅源内容未变，应全部命中条件请求
+        cached_raw = stage("collect_all_cached", 0, lambda: monitor.collect_all(config, [], feed_cache))
+        stages["collect_all_cached"]["items"] = len(cached_raw)
+        seconds = stages["collect_all_cached"]["seconds"]
+        stages["collect_all_cached"]["items_per_sec"] = round(len(cached_raw) / seconds, 1) if seconds else None
+        feeds = args.rss + args.atom + args.arxiv
+        conditional = {
+            "feeds": feeds,
+            "cached_feeds": len(feed_cache.entries),
+            "bytes_first": first_bytes,
+            "bytes_cached": traffic_bytes(client),
+        }
+        failures = []
+        if conditional["cached_feeds"] != feeds:
+            failures.append(f"feed_cache 只缓存了 {conditional['cached_feeds']}/{feeds} 个订阅源")
+        if feeds and conditional["bytes_cached"] >= conditional["bytes_first"]:
+            failures.append("第二轮采集没有因 304 减少传输字节")
+
+        result = {
+            "params": vars(args),
+            "sources": len(source_stats),
+            "source_errors": sum(1 for s in source_stats if s["status"] != "ok"),
+            "raw_items": len(raw),
+            "processed_items": len(processed),
+            "new_items": len(new_items),
+            "subscription_matches": len(matches),
+            "total_seconds": round(total_seconds, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+            "conditional_get": conditional,
+            "failures": failures,
+        }
+        store.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    sys.exit(1 if result["failures"] else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Reddit 增量采集检查 - 对本地 Reddit 替身验证多子版块合并、fullname 游标和 /by_id/ 计数刷新
+
+用法:
+    python3 benchmarks/bench_reddit.py [--subs 3] [--items 50] [--limit 45] [--rounds 5]
+
+在进程内启动 feed_server.py 的 HTTP 服务，RedditSource 的状态文件写到临时目录：
+  cold         new 模式首次采集，按 after 翻页取满 limit 条
+  incremental  每轮前各子版块新增 --new-per-round 条帖子；应全部取回，已知帖子的分数应被刷新
+  hot          hot 模式按 after 翻页
+与每个子版块单独请求 hot.json?limit=15 的旧实现对比请求数和传输字节数。
+漏掉新帖子、已知帖子计数未刷新或请求数超出预期时以非零状态退出。
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+sys.path.insert(0, os.path.join(BASE_DIR, 'benchmarks'))
+
+from feed_server import create_server
+from http_client import HttpClient
+from reddit import RedditSource
+
+def make_source(base_url: str, client: HttpClient, state_file: str, args, **overrides) -> RedditSource:
+    config = {"name": "Bench-Reddit", "type": "reddit", "mode": "new", "limit": args.limit,
+              "subreddits": [f"sub{i}" for i in range(args.subs)], "max_pages": 3,
+              "base_url": f"{base_url}/reddit", "state_file": state_file}
+    config.update(overrides)
+    return RedditSource(config, client=client)
+
+def traffic(client: HttpClient) -> dict:
+    stats = client.stats(reset=True).values()
+    return {"requests": int(sum(s["requests"] for s in stats)), "bytes": int(sum(s["bytes"] for s in stats))}
+
+def scores(items: list) -> dict:
+    return {item["link"]: int(item["summary"].split()[1]) for item in items}
+
+def main():
+    parser = argparse.ArgumentParser(description='Reddit 增量采集检查')
+    parser.add_argument('--subs', type=int, default=3, help='子版块个数')
+    parser.add_argument('--items', type=int, default=50, help='每个子版块的初始帖子数')
+    parser.add_argument('--limit', type=int, default=45, help='返回和跟踪的帖子数')
+    parser.add_argument('--rounds', type=int, default=5, help='增量轮数')
+    parser.add_argument('--new-per-round', type=int, default=2, help='每轮每个子版块新增帖子数')
+    args = parser.parse_args()
+
+    server = create_server(items=args.items, tweet_interval=3600)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = HttpClient(retries=0)
+    workdir = tempfile.mkdtemp(prefix='stellarpulse-bench-reddit-')
+    state_file = os.path.join(workdir, 'reddit_state.json')
+    failures = []
+
+    try:
+        # 数据源的日志输出到 stderr，stdout 只有结果 JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            source = make_source(base_url, client, state_file, args)
+            items = source.fetch()
+            cold = dict(traffic(client), posts=len(items))
+            if len(items) != min(args.limit, args.subs * args.items) or source.last_error:
+                failures.append(f"cold: 取回 {len(items)} 条，错误 {source.last_error}")
+
+            incremental = {"requests": 0, "bytes": 0, "new_posts": 0, "missed": 0, "refreshed": 0}
+            legacy = {"requests": 0, "bytes": 0}
+            seen = set(scores(items))
+            new_per_round = args.new_per_round * args.subs
+            # 每轮的 new 列表页 (每满 100 条新帖多一页) 加上已知帖子的 /by_id/ 批量请求
+            expected_requests = args.rounds * (new_per_round // 100 + 1 + math.ceil(args.limit / 100))
+            for _ in range(args.rounds):
+                before = scores(items)
+                server.reddit.advance(args.new_per_round)
+                items = make_source(base_url, client, state_file, args).fetch()
+                for key, value in traffic(client).items():
+                    incremental[key] += value
+                current = scores(items)
+                fresh = [link for link in current if link not in seen]
+                incremental["new_posts"] += len(fresh)
+                incremental["missed"] += max(0, new_per_round - len(fresh))
+                incremental["refreshed"] += sum(1 for link, score in current.items()
+                                                if link in before and score > before[link])
+                seen.update(current)
+
+                for i in range(args.subs):
+                    client.get_json(f"{base_url}/reddit/r/sub{i}/hot.json", params={"limit": 15})
+                for key, value in traffic(client).items():
+                    legacy[key] += value
+            if incremental["missed"]:
+                failures.append(f"incremental: 漏掉 {incremental['missed']} 条新帖子")
+            if not incremental["refreshed"]:
+                failures.append("incremental: 已知帖子的计数没有刷新")
+            if incremental["requests"] > expected_requests:
+                failures.append(f"incremental: {incremental['requests']} 次请求，预期至多 {expected_requests}")
+
+            source = make_source(base_url, client, state_file, args, mode="hot", limit=150)
+            items = source.fetch()
+            hot = dict(traffic(client), posts=len(items))
+            if len(items) != min(150, args.subs * (args.items + args.rounds * args.new_per_round)) \
+                    or source.last_error:
+                failures.append(f"hot: 取回 {len(items)} 条，错误 {source.last_error}")
+    finally:
+        server.shutdown()
+        client.close()
+
+    print(json.dumps({
+        "params": vars(args),
+        "cold": cold,
+        "incremental": incremental,
+        "legacy": legacy,
+        "hot": hot,
+        "failures": failures,
+    }, ensure_ascii=False, indent=2))
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准测试 - 检查不采集的命令和聊天入口是否保持轻量
+
+用法:
+    python3 benchmarks/bench_startup.py [--runs 5] [--budget-scale 1.0] [--output result.json]
+
+每个场景在子进程中以 `python -X importtime` 运行 --runs 次，取中位数：
+  import_ms  场景代码导入的模块累计耗时 (扣除解释器启动时 site 等已导入的模块)
+  wall_ms    子进程总耗时
+导入耗时超过预算 (乘以 --budget-scale，用于较慢的机器)，或导入了禁止的重量级模块
+(requests、feedparser、bs4 等，只应在实际采集时加载) 时以非零状态退出。
+场景均为只读操作，不会修改项目数据。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只应在采集时加载的模块
+FORBIDDEN_MODULES = ("requests", "urllib3", "feedparser", "bs4", "ai_summary")
+
+# (名称, 解释器参数, 导入耗时预算毫秒)
+SCENARIOS = [
+    ("import_monitor", ["-c", "import monitor"], 80),
+    ("cli_help", ["monitor.py", "--help"], 80),
+    ("cli_list_subs", ["monitor.py", "--list-subs"], 80),
+    ("web_import", ["-c", "import web.server"], 120),
+    # 常驻聊天服务不可用时的回退路径：瘦客户端 + chat_handler；非命令消息直接返回 SKIP
+    ("chat", ["chat_bot.py", "hello"], 60),
+]
+
+def parse_importtime(stderr: str) -> list:
+    """[(模块名, 是否顶层导入, 累计微秒)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue   # 表头
+        name = parts[2].rstrip()
+        entries.append((name.strip(), not name[1:].startswith(" "), int(parts[1])))
+    return entries
+
+def run_once(args: list, env: dict) -> tuple:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=BASE_DIR, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(f"❌ {' '.join(args)} 退出码 {proc.returncode}:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr), wall
+
+def main():
+    parser = argparse.ArgumentParser(description='StellarPulse 启动耗时基准测试')
+    parser.add_argument('--runs', type=int, default=5, help='每个场景的运行次数')
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='预算倍数')
+    parser.add_argument('--output', help='结果另存为JSON文件')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # 确保聊天场景走本进程回退路径，而不是转发给正在运行的常驻服务
+    env["STELLARPULSE_CHAT_SOCKET"] = os.path.join(BASE_DIR, ".bench-no-such-socket")
+
+    baseline_entries, _ = run_once(["-c", "pass"], env)
+    baseline = {name for name, _, _ in baseline_entries}
+    baseline_walls = [run_once(["-c", "pass"], env)[1] for _ in range(args.runs)]
+    baseline_wall = statistics.median(baseline_walls)
+
+    results = {}
+    failed = False
+    for name, scenario_args, budget_ms in SCENARIOS:
+        import_times, walls, forbidden = [], [], set()
+        for _ in range(args.runs):
+            entries, wall = run_once(scenario_args, env)
+            import_times.append(sum(us for mod, top, us in entries if top and mod not in baseline) / 1000)
+            walls.append(wall)
+            packages = {mod.split(".")[0] for mod, _, _ in entries}
+            forbidden.update(packages.intersection(FORBIDDEN_MODULES))
+        import_ms = statistics.median(import_times)
+        budget = budget_ms * args.budget_scale
+        ok = import_ms <= budget and not forbidden
+        failed |= not ok
+        results[name] = {
+            "import_ms": round(import_ms, 1),
+            "budget_ms": round(budget, 1),
+            "wall_ms": round(statistics.median(walls) * 1000, 1),
+            "forbidden_modules": sorted(forbidden),
+            "ok": ok,
+        }
+
+    output = json.dumps({
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "interpreter_wall_ms": round(baseline_wall * 1000, 1),
+        "scenarios": results,
+    }, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+X/Twitter 增量采集检查 - 对本地 X API 替身验证 since_id 游标、翻页和限流调度
+
+用法:
+    python3 benchmarks/bench_twitter.py [--items 50] [--max-results 10] [--max-pages 3] [--rounds 5] [--burst 65]
+
+在进程内启动 feed_server.py 的 HTTP 服务，TwitterSource 的状态文件写到临时目录：
+  cold         首次采集，按 next_token 翻页直到 max_pages
+  incremental  每轮前时间线新增 --new-per-round 条推文，只应取回这些新推文
+  burst        一次新增 --burst 条 (超过 max_results * max_pages)，之后几次采集应补抓完全部，不重复
+  rate_limited 额度用完后，窗口重置前不应再发请求，也不应记为失败
+与不带 since_id、每轮都取一页的旧实现对比请求数和重复推文数。
+出现重复推文、漏掉新推文 (含突发时超出页数预算的部分) 或限流期间仍有请求时以非零状态退出。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+sys.path.insert(0, os.path.join(BASE_DIR, 'benchmarks'))
+
+from feed_server import create_server
+from http_client import HttpClient
+from twitter import TwitterSource
+
+def make_source(base_url: str, client: HttpClient, state_file: str, args, **overrides) -> TwitterSource:
+    config = {"name": "Bench-X", "type": "twitter", "bearer_token": "bench", "query": "AI",
+              "max_results": args.max_results, "max_pages": args.max_pages,
+              "api_base": f"{base_url}/twitter/2", "state_file": state_file}
+    config.update(overrides)
+    return TwitterSource(config, client=client)
+
+def requests_made(client: HttpClient) -> int:
+    return int(sum(s["requests"] for s in client.stats(reset=True).values()))
+
+def main():
+    parser = argparse.ArgumentParser(description='X/Twitter 增量采集检查')
+    parser.add_argument('--items', type=int, default=50, help='时间线初始推文数')
+    parser.add_argument('--max-results', type=int, default=10, help='每页条数')
+    parser.add_argument('--max-pages', type=int, default=3, help='每次采集的页数预算')
+    parser.add_argument('--rounds', type=int, default=5, help='增量轮数')
+    parser.add_argument('--new-per-round', type=int, default=4, help='每轮新增推文数')
+    parser.add_argument('--burst', type=int, default=None,
+                        help='突发新增推文数 (默认 max_results * max_pages * 2 + 5)')
+    args = parser.parse_args()
+
+    server = create_server(items=args.items, tweet_interval=3600, rate_limit=10 ** 6)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = HttpClient(retries=0)
+    workdir = tempfile.mkdtemp(prefix='stellarpulse-bench-x-')
+    state_file = os.path.join(workdir, 'twitter_state.json')
+    failures = []
+
+    try:
+        # 数据源的日志输出到 stderr，stdout 只有结果 JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            # 首次采集
+            seen = set()
+            source = make_source(base_url, client, state_file, args)
+            items = source.fetch()
+            seen.update(item["link"] for item in items)
+            cold = {"requests": requests_made(client), "tweets": len(items)}
+            expected = min(args.items, args.max_results * args.max_pages)
+            if len(items) != expected or source.last_error:
+                failures.append(f"cold: 取回 {len(items)} 条，预期 {expected}")
+
+            # 增量采集 vs 旧实现 (无 since_id，每轮一页)
+            incremental = {"requests": 0, "tweets": 0, "duplicates": 0, "missed": 0}
+            legacy = {"requests": 0, "tweets": 0, "duplicates": 0}
+            legacy_seen = set(seen)
+            for _ in range(args.rounds):
+                server.timeline.advance(args.new_per_round)
+                items = make_source(base_url, client, state_file, args).fetch()
+                links = [item["link"] for item in items]
+                incremental["requests"] += requests_made(client)
+                incremental["tweets"] += len(links)
+                incremental["duplicates"] += sum(1 for link in links if link in seen)
+                incremental["missed"] += max(0, min(args.new_per_round, args.max_results * args.max_pages) - len(links))
+                seen.update(links)
+
+                old = make_source(base_url, client, os.path.join(workdir, 'legacy.json'), args,
+                                  max_pages=1)
+                old._load_state = lambda: {}
+                links = [item["link"] for item in old.fetch()]
+                legacy["requests"] += requests_made(client)
+                legacy["tweets"] += len(links)
+                legacy["duplicates"] += sum(1 for link in links if link in legacy_seen)
+                legacy_seen.update(links)
+            if incremental["duplicates"] or incremental["missed"]:
+                failures.append(f"incremental: 重复 {incremental['duplicates']} 条，漏掉 {incremental['missed']} 条")
+
+            # 突发超出页数预算：反复采集直到没有待补抓的区间
+            burst_size = args.burst or args.max_results * args.max_pages * 2 + 5
+            server.timeline.advance(burst_size)
+            burst = {"tweets": burst_size, "fetches": 0, "requests": 0, "fetched": 0, "duplicates": 0}
+            burst_seen = set()
+            max_fetches = burst_size // (args.max_results * args.max_pages) + 2
+            while burst["fetches"] < max_fetches:
+                links = [item["link"] for item in make_source(base_url, client, state_file, args).fetch()]
+                burst["fetches"] += 1
+                burst["requests"] += requests_made(client)
+                burst["duplicates"] += sum(1 for link in links if link in seen or link in burst_seen)
+                burst_seen.update(links)
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    if "backfill" not in json.load(f)["AI"]:
+                        break
+            seen.update(burst_seen)
+            burst["fetched"] = len(burst_seen)
+            burst["missed"] = burst_size - burst["fetched"]
+            if burst["duplicates"] or burst["missed"]:
+                failures.append(f"burst: 重复 {burst['duplicates']} 条，漏掉 {burst['missed']} 条")
+
+            # 额度用完后不再请求
+            server.timeline.rate_limit = 2
+            server.timeline.windows.clear()
+            limited_state = os.path.join(workdir, 'limited.json')
+            for _ in range(2):
+                server.timeline.advance(args.max_results * args.max_pages)
+                make_source(base_url, client, limited_state, args).fetch()
+            used = requests_made(client)
+            source = make_source(base_url, client, limited_state, args)
+            source.fetch()
+            rate_limited = {"requests_until_exhausted": used, "requests_while_exhausted": requests_made(client),
+                            "error": source.last_error}
+            if rate_limited["requests_while_exhausted"] or source.last_error:
+                failures.append(f"rate_limited: 额度用完后仍请求 {rate_limited['requests_while_exhausted']} 次")
+    finally:
+        server.shutdown()
+        client.close()
+
+    print(json.dumps({
+        "params": vars(args),
+        "cold": cold,
+        "incremental": incremental,
+        "legacy": legacy,
+        "burst": burst,
+        "rate_limited": rate_limited,
+        "failures": failures,
+    }, ensure_ascii=False, indent=2))
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
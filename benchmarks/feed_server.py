@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+本地数据源替身 - 生成合成的 RSS/Atom、HackerNews、Reddit、arXiv 响应
+
+用法:
+    python3 benchmarks/feed_server.py [--port 8765] [--items 50] [--latency 20]
+
+路由:
+    /rss/<name>.xml                  RSS 2.0
+    /atom/<name>.xml                 Atom
+    /hn/v0/topstories.json           HN 热门ID
+    /hn/v0/item/<id>.json            HN 故事详情
+    /algolia/search?tags=(story_1,..)  Algolia 批量计数
+    /reddit/r/<a+b>/(hot|new).json   Reddit 列表 (多个子版块合并，after/before/limit 翻页)
+    /reddit/by_id/<t3_x,t3_y>.json   Reddit 按 fullname 批量取帖子
+    /arxiv/query?search_query=cat:X  arXiv Atom
+    /twitter/2/tweets/search/recent  X API v2 最近搜索 (since_id、until_id、next_token、限流响应头)
+
+同一路径每次返回相同内容 (按路径播种)，标题中按 --match-rate 混入 config.example.json 的关键词。
+RSS/Atom/arXiv 响应带 ETag 和 Last-Modified，条件请求 (If-None-Match / If-Modified-Since) 命中时返回 304。
+X 搜索和 Reddit 例外：每个查询/子版块启动时已有 --items 条，之后每 --tweet-interval 秒新增一条，
+分数随时间增长；每个 Bearer Token 在 15 分钟窗口内最多 --rate-limit 次 X 请求，超出返回 429。
+启动后在标准输出打印一行 "PORT <端口>"，供 bench_pipeline.py 读取。
+"""
+
+import argparse
+import json
+import zlib
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FILLER = ['new', 'system', 'research', 'team', 'report', 'data', 'platform', 'update', 'study',
+          'model', 'release', 'open', 'source', 'tool', 'results', '发布', '团队', '研究', '平台',
+          '数据', '系统', '最新', '进展', '行业', '公司', '产品', '技术']
+
+HN_BASE_ID = 40000000
+TWEET_BASE_ID = 1800000000000000000
+RATE_LIMIT_WINDOW = 900
+
+def load_keywords():
+    with open(os.path.join(BASE_DIR, 'config.example.json'), 'r', encoding='utf-8') as f:
+        return [kw for kws in json.load(f)["keywords"].values() for kw in kws]
+
+
+class FeedFactory:
+    """按路径确定性地生成条目"""
+
+    def __init__(self, items: int, match_rate: float, summary_words: int):
+        self.items = items
+        self.match_rate = match_rate
+        self.summary_words = summary_words
+        self.keywords = load_keywords()
+        self.now = datetime.now(timezone.utc)
+
+    def entries(self, seed: str, count: int = None):
+        rng = random.Random(seed)
+        result = []
+        for i in range(count or self.items):
+            words = [rng.choice(FILLER) for _ in range(rng.randint(5, 12))]
+            if rng.random() < self.match_rate:
+                words.insert(rng.randrange(len(words)), rng.choice(self.keywords))
+            summary = ' '.join(rng.choice(FILLER) for _ in range(self.summary_words))
+            result.append({
+                "title": f"{' '.join(words)} #{i}",
+                "summary": f"<p>{summary}</p><p><a href='https://example.com'>more</a></p>",
+                "link": f"https://example.com/{seed}/{i}",
+                "published": self.now - timedelta(minutes=i * 7),
+                "score": rng.randint(1, 2000),
+                "comments": rng.randint(0, 500),
+            })
+        return result
+
+    def rss(self, name: str) -> bytes:
+        items = ''.join(
+            f"<item><title>{escape(e['title'])}</title><link>{e['link']}</link>"
+            f"<description>{escape(e['summary'])}</description>"
+            f"<pubDate>{e['published'].strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate></item>"
+            for e in self.entries(f"rss-{name}")
+        )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f'<title>{escape(name)}</title>{items}</channel></rss>').encode('utf-8')
+
+    def atom(self, seed: str, count: int = None) -> bytes:
+        entries = ''.join(
+            f"<entry><title>{escape(e['title'])}</title><link href=\"{e['link']}\"/>"
+            f"<id>{e['link']}</id><summary>{escape(e['summary'])}</summary>"
+            f"<published>{e['published'].isoformat()}</published></entry>"
+            for e in self.entries(seed, count)
+        )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f'<title>{escape(seed)}</title>{entries}</feed>').encode('utf-8')
+
+    def hn_story(self, story_id: int) -> dict:
+        e = self.entries(f"hn-{story_id}", 1)[0]
+        return {"id": story_id, "type": "story", "by": "bench", "title": e["title"],
+                "url": e["link"], "score": e["score"], "descendants": e["comments"],
+                "time": int(e["published"].timestamp())}
+
+
+    def tweet(self, query: str, index: int, created: datetime) -> dict:
+        e = self.entries(f"tweet-{query}-{index}", 1)[0]
+        return {"id": str(TWEET_BASE_ID + index), "text": e["title"], "author_id": str(index % 7),
+                "created_at": created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                "public_metrics": {"like_count": e["score"], "retweet_count": e["comments"],
+                                   "reply_count": e["comments"] // 3}}
+
+
+class TweetTimeline:
+    """按查询生成随时间增长的推文流，并按 Bearer Token 计算请求额度"""
+
+    def __init__(self, factory: FeedFactory, interval: float, rate_limit: int):
+        self.factory = factory
+        self.interval = interval
+        self.rate_limit = rate_limit
+        self.start = time.time()
+        self.skew = 0.0
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def advance(self, count: int):
+        """让每个查询立即新增 count 条推文"""
+        self.skew += count * self.interval
+
+    def take_request(self, token: str) -> tuple:
+        """消耗一次额度，返回 (是否允许, 剩余次数, 窗口重置时间)"""
+        now = time.time()
+        with self.lock:
+            reset_at, used = self.windows.get(token, (0, 0))
+            if now >= reset_at:
+                reset_at, used = int(now) + RATE_LIMIT_WINDOW, 0
+            allowed = used < self.rate_limit
+            used += int(allowed)
+            self.windows[token] = (reset_at, used)
+        return allowed, self.rate_limit - used, reset_at
+
+    def search(self, query: str, since_id: str, max_results: int, next_token: str,
+               until_id: str = None) -> dict:
+        total = self.factory.items + int((time.time() + self.skew - self.start) / self.interval)
+        newest = total - 1
+        if until_id:
+            newest = min(newest, int(until_id) - TWEET_BASE_ID - 1)
+        oldest = int(since_id) - TWEET_BASE_ID + 1 if since_id else 0
+        offset = int(next_token) if next_token else 0
+        # 最新的在前
+        indexes = list(range(newest - offset, max(oldest, 0) - 1, -1))
+        page = indexes[:max_results]
+        if not page:
+            return {"meta": {"result_count": 0}}
+        base = datetime.fromtimestamp(self.start, timezone.utc)
+        tweets = [self.factory.tweet(query, i, base + timedelta(seconds=(i - self.factory.items) * self.interval))
+                  for i in page]
+        meta = {"newest_id": tweets[0]["id"], "oldest_id": tweets[-1]["id"], "result_count": len(tweets)}
+        if len(indexes) > max_results:
+            meta["next_token"] = str(offset + max_results)
+        users = [{"id": str(i), "username": f"bench{i}", "name": f"Bench {i}"} for i in range(7)]
+        return {"data": tweets, "includes": {"users": users}, "meta": meta}
+
+
+def base36(n: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+
+class RedditTimeline:
+    """按子版块生成随时间增长的帖子，帖子 ID 编码了子版块和序号，/by_id/ 可直接还原"""
+
+    SUB_SLOTS = 4096
+
+    def __init__(self, factory: FeedFactory, interval: float):
+        self.factory = factory
+        self.interval = interval
+        self.start = time.time()
+        self.skew = 0.0
+        self.subs = {}
+
+    def advance(self, count: int):
+        """让每个子版块立即新增 count 条帖子，已有帖子的分数随之增长"""
+        self.skew += count * self.interval
+
+    def now(self) -> float:
+        return time.time() + self.skew
+
+    def _post(self, sub: str, index: int, now: float) -> dict:
+        slot = zlib.crc32(sub.encode('utf-8')) % self.SUB_SLOTS
+        self.subs[slot] = sub
+        e = self.factory.entries(f"reddit-{sub}-{index}", 1)[0]
+        created = self.start + (index - self.factory.items) * self.interval + slot / self.SUB_SLOTS
+        post_id = base36(index * self.SUB_SLOTS + slot)
+        # 分数随帖子年龄增长，刷新计数时能看到变化
+        growth = int(max(0.0, now - created) / self.interval)
+        return {"name": f"t3_{post_id}", "id": post_id, "subreddit": sub, "title": e["title"],
+                "permalink": f"/r/{sub}/comments/{post_id}/", "created_utc": created,
+                "score": e["score"] + growth, "num_comments": e["comments"] + growth // 2,
+                "removed_by_category": None}
+
+    def posts(self, subs: list) -> list:
+        now = self.now()
+        total = self.factory.items + int((now - self.start) / self.interval)
+        posts = [self._post(sub, i, now) for sub in subs for i in range(total)]
+        return sorted(posts, key=lambda p: p["created_utc"], reverse=True)
+
+    def listing(self, subs: list, mode: str, limit: int, after: str, before: str) -> dict:
+        posts = self.posts(subs)
+        if mode == 'hot':
+            posts.sort(key=lambda p: p["score"], reverse=True)
+        names = [p["name"] for p in posts]
+        if before in names:
+            end = names.index(before)
+            page = posts[max(0, end - limit):end]
+        else:
+            start = names.index(after) + 1 if after in names else 0
+            page = posts[start:start + limit]
+        data = {"children": [{"kind": "t3", "data": p} for p in page], "after": None, "before": None}
+        if page and page[-1] is not posts[-1]:
+            data["after"] = page[-1]["name"]
+        if page and page[0] is not posts[0]:
+            data["before"] = page[0]["name"]
+        return {"kind": "Listing", "data": data}
+
+    def by_id(self, names: list) -> dict:
+        now = self.now()
+        children = []
+        for name in names:
+            value = int(name.split('_', 1)[-1], 36)
+            sub = self.subs.get(value % self.SUB_SLOTS)
+            if sub is not None:
+                children.append({"kind": "t3", "data": self._post(sub, value // self.SUB_SLOTS, now)})
+        return {"kind": "Listing", "data": {"children": children, "after": None, "before": None}}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        parts = [p for p in parsed.path.split('/') if p]
+        factory = server.factory
+
+        if len(parts) == 2 and parts[0] == 'rss':
+            self._feed(factory.rss(parts[1].rsplit('.', 1)[0]), 'application/rss+xml')
+        elif len(parts) == 2 and parts[0] == 'atom':
+            self._feed(factory.atom(f"atom-{parts[1].rsplit('.', 1)[0]}"), 'application/atom+xml')
+        elif parts[:3] == ['hn', 'v0', 'topstories.json']:
+            self._json(list(range(HN_BASE_ID, HN_BASE_ID + 500)))
+        elif parts[:3] == ['hn', 'v0', 'item'] and len(parts) == 4:
+            self._json(factory.hn_story(int(parts[3].split('.')[0])))
+        elif parts[:2] == ['algolia', 'search']:
+            tags = params.get('tags', [''])[0].strip('()')
+            ids = [int(t.split('_', 1)[1]) for t in tags.split(',') if t.startswith('story_')]
+            hits = [{"objectID": str(i), "points": s["score"], "num_comments": s["descendants"]}
+                    for i, s in ((i, factory.hn_story(i)) for i in ids)]
+            self._json({"hits": hits})
+        elif len(parts) == 4 and parts[0] == 'reddit' and parts[1] == 'r':
+            arg = lambda name, default=None: params.get(name, [default])[0]
+            self._json(server.reddit.listing(parts[2].split('+'), parts[3].rsplit('.', 1)[0],
+                                             min(int(arg('limit', 25)), 100), arg('after'), arg('before')))
+        elif len(parts) == 3 and parts[:2] == ['reddit', 'by_id']:
+            self._json(server.reddit.by_id(parts[2].rsplit('.', 1)[0].split(',')))
+        elif parts[:2] == ['arxiv', 'query']:
+            category = params.get('search_query', ['cat:cs.AI'])[0].split(':', 1)[-1]
+            count = int(params.get('max_results', [factory.items])[0])
+            self._feed(factory.atom(f"arxiv-{category}", count), 'application/atom+xml')
+        elif parts[:4] == ['twitter', '2', 'tweets', 'search']:
+            self._twitter(params)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def _twitter(self, params):
+        token = self.headers.get('Authorization', '')
+        if not token.startswith('Bearer '):
+            self._json({"title": "Unauthorized", "status": 401}, status=401)
+            return
+        allowed, remaining, reset_at = self.server.timeline.take_request(token)
+        headers = {"x-rate-limit-limit": self.server.timeline.rate_limit,
+                   "x-rate-limit-remaining": remaining, "x-rate-limit-reset": reset_at}
+        if not allowed:
+            self._json({"title": "Too Many Requests", "status": 429}, status=429, headers=headers)
+            return
+        arg = lambda name, default=None: params.get(name, [default])[0]
+        data = self.server.timeline.search(arg('query', ''), arg('since_id'),
+                                           int(arg('max_results', 10)), arg('next_token'), arg('until_id'))
+        self._json(data, headers=headers)
+
+    def _feed(self, body: bytes, content_type: str):
+        """订阅源响应：内容按路径固定，ETag 取内容校验和，Last-Modified 为服务启动时间"""
+        validators = {"ETag": f'"{zlib.crc32(body):08x}"',
+                      "Last-Modified": formatdate(self.server.factory.now.timestamp(), usegmt=True)}
+        if_none_match = self.headers.get('If-None-Match')
+        if (if_none_match == validators["ETag"] if if_none_match is not None
+                else self.headers.get('If-Modified-Since') == validators["Last-Modified"]):
+            self.send_response(304)
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self._send(body, content_type, headers=validators)
+
+    def _json(self, data, status: int = 200, headers: dict = None):
+        self._send(json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json',
+                   status, headers)
+
+    def _send(self, body: bytes, content_type: str, status: int = 200, headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(port: int = 0, items: int = 50, latency_ms: float = 0,
+                  match_rate: float = 0.5, summary_words: int = 60,
+                  tweet_interval: float = 10, rate_limit: int = 450) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', port), FeedHandler)
+    server.daemon_threads = True
+    server.factory = FeedFactory(items, match_rate, summary_words)
+    server.timeline = TweetTimeline(server.factory, tweet_interval, rate_limit)
+    server.reddit = RedditTimeline(server.factory, tweet_interval)
+    server.latency = latency_ms / 1000
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='StellarPulse 本地数据源替身')
+    parser.add_argument('--port', type=int, default=0, help='监听端口 (0为随机)')
+    parser.add_argument('--items', type=int, default=50, help='每个订阅源的条目数')
+    parser.add_argument('--latency', type=float, default=0, help='每个请求的附加延迟(毫秒)')
+    parser.add_argument('--match-rate', type=float, default=0.5, help='标题含关键词的比例')
+    parser.add_argument('--summary-words', type=int, default=60, help='摘要词数')
+    parser.add_argument('--tweet-interval', type=float, default=10, help='每个 X 查询/Reddit 子版块新增一条的间隔(秒)')
+    parser.add_argument('--rate-limit', type=int, default=450, help='X 搜索每15分钟的请求额度')
+    args = parser.parse_args()
+
+    server = create_server(args.port, args.items, args.latency, args.match_rate, args.summary_words,
+                           args.tweet_interval, args.rate_limit)
+    print(f"PORT {server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
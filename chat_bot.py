@@ -1,41 +1,50 @@
 #!/usr/bin/env python3
 """
 StellarPulse Chat Bot - 消息交互入口
-集成到主监控系统中
+瘦客户端：优先把消息转发给常驻的 chat_daemon.py，服务未运行时在本进程内处理
 """
 
 import sys
 import json
 import os
+import socket
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, BASE_DIR)
 
-from chat_handler import handle_command, handle_number, should_respond
+SOCKET_PATH = os.environ.get("STELLARPULSE_CHAT_SOCKET", "/tmp/stellarpulse_chat.sock")
+
+def ask_daemon(message: str, session: str, socket_path: str = SOCKET_PATH):
+    """发送到常驻服务；服务不可用时抛出 OSError"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(socket_path)
+        request = json.dumps({"message": message, "session": session}, ensure_ascii=False)
+        sock.sendall(request.encode('utf-8') + b"\n")
+        response = sock.makefile('rb').readline()
+    if not response:
+        raise ConnectionError("empty response")
+    return json.loads(response.decode('utf-8'))["reply"]
+
+def handle_locally(message: str):
+    """无常驻服务时的回退路径"""
+    sys.path.insert(0, BASE_DIR)
+    from chat_handler import handle_message
+    return handle_message(message)
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python3 chat_bot.py '<message>'")
+        print("Usage: python3 chat_bot.py '<message>' [session]")
         sys.exit(1)
-    
+
     message = sys.argv[1]
-    
-    # 检查是否应该响应
-    if not should_respond(message):
-        print("SKIP")
-        sys.exit(0)
-    
-    # 处理数字回复 (查看详情)
-    if message.strip().isdigit():
-        result = handle_number(message.strip())
-        if result:
-            print(result)
-        else:
-            print("❌ 无效的选择，请重试")
-        sys.exit(0)
-    
-    # 处理命令
-    result = handle_command(message)
-    print(result)
+    session = sys.argv[2] if len(sys.argv) > 2 else os.environ.get("STELLARPULSE_CHAT_SESSION", "default")
+
+    try:
+        reply = ask_daemon(message, session)
+    except (OSError, ValueError, KeyError):
+        reply = handle_locally(message)
+
+    # 不需要响应
+    print(reply if reply is not None else "SKIP")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+StellarPulse Chat Daemon - 常驻聊天服务
+监听本地 Unix socket，长期持有资讯库连接和查询结果，数据变化时自动失效重载。
+chat_bot.py 作为瘦客户端把消息转发到这里。
+
+协议: 每个连接发送一行 JSON {"message": "...", "session": "..."}，
+      返回一行 JSON {"reply": "..."}；不需要响应时 reply 为 null。
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from chat_bot import SOCKET_PATH
+from chat_handler import handle_message, MemoryQueryCache
+from storage import open_store, ItemStore
+
+# 单条请求的最大字节数
+MAX_REQUEST = 64 * 1024
+
+# 最多保留的会话数 (每个会话记住最后一次列表查询)
+MAX_SESSIONS = 1000
+
+class CachedStore:
+    """带查询结果缓存的资讯库视图
+
+    通过 PRAGMA data_version 感知其他进程 (monitor.py) 的写入，
+    数据变化后清空缓存，下次查询重新读取。
+    """
+
+    def __init__(self, store: ItemStore):
+        self.store = store
+        self._version = None
+        self._memo: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.reloads = 0
+
+    def _check_version(self):
+        version = self.store.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            if self._version is not None:
+                self.reloads += 1
+            self._version = version
+            self._memo.clear()
+
+    def _cached(self, key: tuple, loader):
+        self._check_version()
+        if key not in self._memo:
+            self._memo[key] = loader()
+        return self._memo[key]
+
+    def recent(self, limit: int = 20, category: str = None, source: str = None,
+               since: str = None, until: str = None) -> List[Dict[str, Any]]:
+        return self._cached(("recent", limit, category, source, since, until),
+                            lambda: self.store.recent(limit, category, source, since, until))
+
+    def search(self, query: str, limit: int = 8, category: str = None) -> Optional[List[Dict[str, Any]]]:
+        return self._cached(("search", query, limit, category),
+                            lambda: self.store.search(query, limit, category))
+
+    def top_by_importance(self, limit: int = 5) -> List[Dict[str, Any]]:
+        return self._cached(("top", limit), lambda: self.store.top_by_importance(limit))
+
+    def iter_recent(self, category: str = None, source: str = None):
+        return self.store.iter_recent(category, source)
+
+
+class ChatService:
+    """消息处理：按会话保存最后一次列表查询，供数字回复使用"""
+
+    def __init__(self, store: ItemStore):
+        self.store = CachedStore(store)
+        self.sessions: "OrderedDict[str, MemoryQueryCache]" = OrderedDict()
+
+    def _session(self, session_id: str) -> MemoryQueryCache:
+        cache = self.sessions.pop(session_id, None) or MemoryQueryCache()
+        self.sessions[session_id] = cache
+        while len(self.sessions) > MAX_SESSIONS:
+            self.sessions.popitem(last=False)
+        return cache
+
+    def handle(self, message: str, session_id: str = "default") -> Optional[str]:
+        return handle_message(message, self.store, self._session(session_id))
+
+
+class ChatRequestHandler(socketserver.StreamRequestHandler):
+    """单条请求处理；慢客户端在超时后断开，不会长期阻塞服务"""
+
+    timeout = 5
+
+    def handle(self):
+        start = time.perf_counter()
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST).decode('utf-8'))
+            reply = self.server.service.handle(str(request.get("message", "")),
+                                               str(request.get("session") or "default"))
+        except (ValueError, AttributeError):
+            reply = "❌ 请求格式错误"
+        except Exception as e:
+            reply = f"❌ 出错了: {str(e)}"
+        response = json.dumps({"reply": reply}, ensure_ascii=False) + "\n"
+        try:
+            self.wfile.write(response.encode('utf-8'))
+        except OSError:
+            return
+        if self.server.verbose:
+            print(f"[chat] {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+class ChatServer(socketserver.UnixStreamServer):
+    """单线程处理请求：每条消息只需几毫秒，串行处理即可避免共享连接加锁"""
+
+    def __init__(self, socket_path: str, service: ChatService, verbose: bool = False):
+        self.service = service
+        self.verbose = verbose
+        super().__init__(socket_path, ChatRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+
+def remove_stale_socket(socket_path: str):
+    """清理上次异常退出遗留的 socket 文件；已有服务在运行时报错退出"""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise SystemExit(f"❌ 聊天服务已在运行: {socket_path}")
+    finally:
+        probe.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='StellarPulse 常驻聊天服务')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Unix socket 路径')
+    parser.add_argument('--verbose', action='store_true', help='打印每条请求耗时')
+    args = parser.parse_args()
+
+    remove_stale_socket(args.socket)
+    service = ChatService(open_store())
+    server = ChatServer(args.socket, service, verbose=args.verbose)
+    print(f"💬 聊天服务启动: {args.socket}")
+    # systemd 等以 SIGTERM 停止服务时同样清理 socket 文件
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,17 +9,14 @@ import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
+from storage import open_store, ItemStore
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_FILE = os.path.join(BASE_DIR, "data.json")
 CACHE_FILE = "/tmp/stellarpulse_last_query.json"
 
-def load_data() -> Dict:
-    """加载数据"""
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        return {"items": []}
+def load_store() -> ItemStore:
+    """打开资讯库"""
+    return open_store()
 
 def save_cache(items: List[Dict]):
     """保存最后查询结果"""
@@ -37,6 +34,27 @@ def load_cache() -> List[Dict]:
     except:
         return []
 
+class QueryCache:
+    """最后一次查询结果，供数字回复查看详情；默认落盘到 CACHE_FILE"""
+    
+    def save(self, items: List[Dict]):
+        save_cache(items)
+    
+    def load(self) -> List[Dict]:
+        return load_cache()
+
+class MemoryQueryCache(QueryCache):
+    """常驻进程使用的内存缓存"""
+    
+    def __init__(self):
+        self.items: List[Dict] = []
+    
+    def save(self, items: List[Dict]):
+        self.items = list(items)
+    
+    def load(self) -> List[Dict]:
+        return self.items
+
 def format_time_ago(iso_time: str) -> str:
     """格式化相对时间"""
     try:
@@ -54,23 +72,23 @@ def format_time_ago(iso_time: str) -> str:
     except:
         return ""
 
-def search_items(items: List[Dict], query: str = None, category: str = None, limit: int = 8) -> List[Dict]:
-    """搜索资讯"""
-    results = items
-    
-    # 按分类筛选
-    if category:
-        results = [i for i in results if category in i.get('categories', [])]
-    
-    # 按关键词搜索
-    if query:
-        query_lower = query.lower()
-        results = [i for i in results if query_lower in (i.get('title', '') + i.get('summary', '')).lower()]
-    
-    # 按时间排序
-    results.sort(key=lambda x: x.get('fetched_at', ''), reverse=True)
-    
-    return results[:limit]
+def search_items(store: ItemStore, query: str = None, category: str = None, limit: int = 8) -> List[Dict]:
+    """搜索资讯 - 优先走倒排索引，无法索引的查询 (如单个汉字) 按时间倒序扫描"""
+    if not query:
+        return store.recent(limit=limit, category=category)
+    
+    results = store.search(query, limit=limit, category=category)
+    if results is not None:
+        return results
+    
+    query_lower = query.lower()
+    results = []
+    for item in store.iter_recent(category=category):
+        if query_lower in (item.get('title', '') + item.get('summary', '')).lower():
+            results.append(item)
+            if len(results) >= limit:
+                break
+    return results
 
 def format_list_item(item: Dict, index: int) -> str:
     """格式化列表项 - 简洁版"""
@@ -151,10 +169,10 @@ def format_detail(item: Dict) -> str:
     
     return '\n'.join(lines)
 
-def handle_command(command: str) -> str:
+def handle_command(command: str, store: ItemStore = None, cache: QueryCache = None) -> str:
     """处理命令"""
-    data = load_data()
-    items = data.get('items', [])
+    store = store or load_store()
+    cache = cache or QueryCache()
     
     command = command.strip().lower()
     
@@ -174,8 +192,8 @@ def handle_command(command: str) -> str:
     
     # 最新
     if command in ['/latest', 'latest', '最新']:
-        results = search_items(items, limit=5)
-        save_cache(results)  # 保存到缓存
+        results = search_items(store, limit=5)
+        cache.save(results)  # 保存到缓存
         if not results:
             return "📭 暂无数据"
         
@@ -187,8 +205,8 @@ def handle_command(command: str) -> str:
     
     # 热门
     if command in ['/hot', 'hot', '热门']:
-        hot_items = sorted(items, key=lambda x: x.get('importance', 0), reverse=True)[:5]
-        save_cache(hot_items)  # 保存到缓存
+        hot_items = store.top_by_importance(5)
+        cache.save(hot_items)  # 保存到缓存
         if not hot_items:
             return "📭 暂无数据"
         
@@ -200,8 +218,8 @@ def handle_command(command: str) -> str:
     
     # AI
     if command in ['/ai', 'ai', '人工智能']:
-        results = search_items(items, category='ai', limit=8)
-        save_cache(results)  # 保存到缓存
+        results = search_items(store, category='ai', limit=8)
+        cache.save(results)  # 保存到缓存
         if not results:
             return "🤖 暂无 AI 相关资讯"
         
@@ -213,8 +231,8 @@ def handle_command(command: str) -> str:
     
     # 机器人
     if command in ['/robot', 'robot', 'robotics', '机器人', '具身智能']:
-        results = search_items(items, category='robotics', limit=8)
-        save_cache(results)  # 保存到缓存
+        results = search_items(store, category='robotics', limit=8)
+        cache.save(results)  # 保存到缓存
         if not results:
             return "🦾 暂无机器人相关资讯"
         
@@ -226,8 +244,8 @@ def handle_command(command: str) -> str:
     
     # 航天
     if command in ['/space', 'space', '航天', '太空']:
-        results = search_items(items, category='space', limit=8)
-        save_cache(results)  # 保存到缓存
+        results = search_items(store, category='space', limit=8)
+        cache.save(results)  # 保存到缓存
         if not results:
             return "🚀 暂无航天相关资讯"
         
@@ -243,8 +261,8 @@ def handle_command(command: str) -> str:
         if not query:
             return "❓ 请输入关键词，如: /search GPT-5"
         
-        results = search_items(items, query=query, limit=8)
-        save_cache(results)  # 保存到缓存
+        results = search_items(store, query=query, limit=8)
+        cache.save(results)  # 保存到缓存
         if not results:
             return f"🔍 未找到 '{query}' 相关内容"
         
@@ -255,8 +273,8 @@ def handle_command(command: str) -> str:
         return '\n'.join(lines)
     
     # 默认
-    results = search_items(items, limit=6)
-    save_cache(results)  # 保存到缓存
+    results = search_items(store, limit=6)
+    cache.save(results)  # 保存到缓存
     if not results:
         return "📭 暂无数据"
     
@@ -266,7 +284,7 @@ def handle_command(command: str) -> str:
     lines.append("\n💡 回复数字查看详情 | /help 查看命令")
     return '\n'.join(lines)
 
-def handle_number(number_str: str) -> str:
+def handle_number(number_str: str, cache: QueryCache = None) -> str:
     """处理数字选择 - 从缓存读取"""
     try:
         num = int(number_str.strip())
@@ -274,7 +292,7 @@ def handle_number(number_str: str) -> str:
             return "❌ 请输入 1-10 的数字"
         
         # 从缓存读取最后一次查询结果
-        cached_items = load_cache()
+        cached_items = (cache or QueryCache()).load()
         
         if not cached_items:
             return "❌ 请先发送查询命令 (如 /ai /robot)，再回复数字"
@@ -306,6 +324,18 @@ def should_respond(message: str) -> bool:
     
     return False
 
+def handle_message(message: str, store: ItemStore = None, cache: QueryCache = None) -> Optional[str]:
+    """处理一条聊天消息，不需要响应时返回 None"""
+    if not should_respond(message):
+        return None
+    
+    # 处理数字回复 (查看详情)
+    if message.strip().isdigit():
+        return handle_number(message.strip(), cache) or "❌ 无效的选择，请重试"
+    
+    # 处理命令
+    return handle_command(message, store, cache)
+
 if __name__ == '__main__':
     import sys
     if len(sys.argv) > 1:
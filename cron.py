@@ -0,0 +1,92 @@
+"""
+StellarPulse 定时表达式 - 标准5字段 cron (分 时 日 月 周)
+支持 *、数字、范围 a-b、列表 a,b 和步长 */n、a-b/n、a/n (即 a-最大值/n)；周日可写作 0 或 7。
+日和周都不以 * 开头时按 cron 惯例取并集 (任一匹配即可)。
+"""
+
+from datetime import datetime, timedelta
+from typing import Set
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:   # Python 3.8
+    ZoneInfo = None
+
+_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+def _parse_field(text: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in text.split(","):
+        step, stepped = 1, "/" in part
+        if stepped:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"步长必须为正数: {text}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = int(part)
+            # N/step 等同于 N-最大值/step
+            end = high if stepped else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"取值超出范围 {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """解析后的 cron 表达式"""
+
+    def __init__(self, expression: str, timezone: str = None):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式需要5个字段: {expression!r}")
+        self.expression = expression
+        parsed = [_parse_field(f, low, high) for f, (_, low, high) in zip(fields, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # cron 中 0 和 7 都表示周日；转换为 datetime.weekday() 的编号 (周一为0)
+        self.weekdays = {(d - 1) % 7 for d in weekdays}
+        # 与 cron 一致，以 * 开头的字段 (含 */n) 视为不受限
+        self.day_restricted = not fields[2].startswith("*")
+        self.weekday_restricted = not fields[4].startswith("*")
+        self.tz = ZoneInfo(timezone) if timezone and ZoneInfo else None
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz) if self.tz else datetime.now()
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = dt.weekday() in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def matches(self, dt: datetime) -> bool:
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt: datetime) -> datetime:
+        """严格晚于 dt 的下一个触发时刻 (按 dt 所在时区的墙上时间计算)"""
+        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"cron 表达式永远不会触发: {self.expression!r}")
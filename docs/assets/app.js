@@ -1,7 +1,9 @@
 // StellarPulse GitHub Pages App
 
+// Loads data/manifest.json first; category and day shards are fetched on demand
 const app = {
     data: null,
+    shards: {},
     
     async init() {
         try {
@@ -14,8 +16,17 @@ const app = {
     },
     
     async loadData() {
-        const response = await fetch('data/site_data.json');
-        this.data = await response.json();
+        this.data = await this.fetchJson('data/manifest.json');
+    },
+    
+    async fetchJson(url) {
+        if (!this.shards[url]) {
+            this.shards[url] = fetch(url).then(response => {
+                if (!response.ok) throw new Error(`${url}: ${response.status}`);
+                return response.json();
+            });
+        }
+        return this.shards[url];
     },
     
     render() {
@@ -62,7 +73,7 @@ const app = {
         grid.innerHTML = trending.slice(0, 6).map(item => `
             <div class="news-card">
                 <div class="category">
-                    ${this.getCategoryEmoji(item.category)} ${item.category}
+                    ${this.getCategoryEmoji(this.primaryCategory(item))} ${this.primaryCategory(item)}
                 </div>
                 <h4>
                     <a href="${item.link}" target="_blank" rel="noopener">
@@ -77,9 +88,9 @@ const app = {
         `).join('');
     },
     
-    renderLatest() {
+    renderLatest(items) {
         const list = document.getElementById('latest-list');
-        const latest = this.data.latest || [];
+        const latest = items || this.data.latest || [];
         
         if (latest.length === 0) {
             list.innerHTML = '<div class="loading">No items yet</div>';
@@ -96,10 +107,10 @@ const app = {
                         </a>
                     </h4>
                     <div class="meta">
-                        ${item.source} · ${this.formatTime(item.time)}
+                        ${item.source} · ${this.formatTime(item.time || item.pub_date)}
                     </div>
                 </div>
-                <span class="category-badge">${this.getCategoryEmoji(item.category)}</span>
+                <span class="category-badge">${this.getCategoryEmoji(this.primaryCategory(item))}</span>
             </div>
         `).join('');
     },
@@ -118,6 +129,10 @@ const app = {
             `).join('');
     },
     
+    primaryCategory(item) {
+        return (item.categories || [])[0] || item.category || 'general';
+    },
+    
     getCategoryEmoji(cat) {
         const map = { ai: '🤖', robotics: '🦾', space: '🚀' };
         return map[cat] || '📰';
@@ -141,9 +156,15 @@ const app = {
         return div.innerHTML;
     },
     
-    filterByCategory(cat) {
-        // Could implement filtering here
-        console.log('Filter by:', cat);
+    async filterByCategory(cat) {
+        const meta = this.data.categories[cat];
+        if (!meta || !meta.shard) return;
+        try {
+            const shard = await this.fetchJson(`data/${meta.shard}`);
+            this.renderLatest(shard.items);
+        } catch (err) {
+            console.error('Failed to load category shard:', err);
+        }
     },
     
     showError() {
@@ -1,8 +1,11 @@
 #!/bin/bash
 # StellarPulse 消息处理器
 # 用于集成到 OpenClaw 自动响应
+# 用法: handle_message.sh '<message>' [session]
+# 常驻服务 chat_daemon.py 运行时由 chat_bot.py 转发，否则在本进程内处理
 
 MESSAGE="$1"
+SESSION="${2:-default}"
 
 if [ -z "$MESSAGE" ]; then
     exit 0
@@ -10,7 +13,7 @@ fi
 
 # 运行 chat_bot.py 并捕获输出
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )"
-OUTPUT=$(cd "$SCRIPT_DIR" && python3 chat_bot.py "$MESSAGE" 2>&1)
+OUTPUT=$(cd "$SCRIPT_DIR" && python3 chat_bot.py "$MESSAGE" "$SESSION" 2>&1)
 
 # 如果输出不是 SKIP，则返回
 if [ "$OUTPUT" != "SKIP" ]; then
@@ -0,0 +1,118 @@
+"""
+StellarPulse 数据源健康状态 - 熔断器
+连续失败达到阈值的数据源进入熔断 (open)，冷却期内直接跳过，不再等待超时；
+冷却结束后放行一次试探 (half_open)：成功则恢复，失败则冷却时间加倍。
+状态保存在 source_health.json，重启后继续生效。
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any
+
+from sources.fileio import atomic_write
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_HEALTH_FILE = os.path.join(BASE_DIR, "source_health.json")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class SourceHealth:
+    """按数据源名称记录连续失败次数与熔断状态"""
+
+    def __init__(self, state_file: str = SOURCE_HEALTH_FILE, failure_threshold: int = 3,
+                 cooldown: float = 300, max_cooldown: float = 21600):
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = load_health(state_file)
+        # 上次运行在试探中途保存或退出时会留下 half_open；没有进行中的试探，
+        # 恢复为冷却已结束的 open，下次 allow() 重新放行试探
+        for entry in self.state.values():
+            if entry.get("state") == HALF_OPEN:
+                entry["state"] = OPEN
+                entry["open_until"] = 0
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        return self.state.setdefault(name, {
+            "state": CLOSED, "failures": 0, "total_failures": 0, "trips": 0,
+            "open_until": 0, "last_error": None, "last_failure": None, "last_success": None,
+        })
+
+    def allow(self, name: str) -> bool:
+        """是否放行本次采集；冷却结束的熔断源转为 half_open 放行一次试探"""
+        with self._lock:
+            entry = self.state.get(name)
+            if entry is None or entry["state"] == CLOSED:
+                return True
+            if entry["state"] == OPEN and time.time() >= entry["open_until"]:
+                entry["state"] = HALF_OPEN
+                return True
+            # 试探进行中或仍在冷却期
+            return False
+
+    def retry_in(self, name: str) -> float:
+        """距冷却结束的秒数"""
+        with self._lock:
+            entry = self.state.get(name)
+            return max(0.0, entry["open_until"] - time.time()) if entry else 0.0
+
+    def record_success(self, name: str):
+        with self._lock:
+            entry = self._entry(name)
+            entry.update(state=CLOSED, failures=0, trips=0, open_until=0,
+                         last_success=datetime.now().isoformat())
+
+    def record_failure(self, name: str, error: str):
+        """记录一次失败，返回是否因此进入熔断"""
+        with self._lock:
+            entry = self._entry(name)
+            entry["failures"] += 1
+            entry["total_failures"] += 1
+            entry["last_error"] = error
+            entry["last_failure"] = datetime.now().isoformat()
+            if entry["state"] != HALF_OPEN and entry["failures"] < self.failure_threshold:
+                return False
+            # 首次熔断使用基础冷却时间，试探失败后每次加倍
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** entry["trips"])
+            entry["trips"] += 1
+            entry["state"] = OPEN
+            entry["open_until"] = time.time() + cooldown
+            return True
+
+    def release(self, name: str):
+        """试探未得到结论 (如未知类型) 时撤回 half_open，下次仍可试探"""
+        with self._lock:
+            entry = self.state.get(name)
+            if entry and entry["state"] == HALF_OPEN:
+                entry["state"] = OPEN
+
+    def unhealthy(self) -> List[tuple]:
+        """[(名称, 状态记录)]，仅包含熔断中或有连续失败的数据源"""
+        with self._lock:
+            return [(name, dict(entry)) for name, entry in sorted(self.state.items())
+                    if entry["state"] != CLOSED or entry["failures"]]
+
+    def save(self):
+        """写回 source_health.json"""
+        with self._lock:
+            data = json.dumps(self.state, ensure_ascii=False, indent=2)
+        try:
+            atomic_write(self.state_file, data)
+        except OSError as e:
+            print(f"  [Health] 写入 {self.state_file} 失败: {e}")
+
+
+def load_health(path: str = SOURCE_HEALTH_FILE) -> Dict[str, Dict[str, Any]]:
+    """读取健康状态文件，不存在或损坏时返回空字典"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,76 @@
+"""
+StellarPulse 运行指标 - 各阶段耗时与计数
+每次采集运行生成一条记录，以 JSON Lines 追加到 metrics.jsonl，便于跨运行对比趋势
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_FILE = os.path.join(BASE_DIR, "metrics.jsonl")
+
+class RunMetrics:
+    """单次运行的指标：阶段计时 (秒，同名累加)、计数器和各数据源的采集结果"""
+
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.sources: List[Dict[str, Any]] = []
+        self.status = "ok"
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def set(self, name: str, value: int):
+        self.counters[name] = value
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "finished_at": datetime.now().isoformat(),
+            "status": self.status,
+            "total_seconds": round(time.perf_counter() - self._start, 4),
+            "timings": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            "counters": self.counters,
+            "sources": self.sources,
+        }
+
+    def append(self, path: str = METRICS_FILE) -> Dict[str, Any]:
+        """追加本次记录到 JSON Lines 文件；写入失败只打印警告，不影响采集结果"""
+        record = self.record()
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"  [Metrics] 写入 {path} 失败: {e}")
+        return record
+
+
+
+def load_recent_records(path: str = METRICS_FILE, limit: int = 50) -> List[Dict[str, Any]]:
+    """读取最近 limit 条运行记录 (按时间先后)，只读取文件末尾"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 512 * 1024))
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    records = []
+    for line in lines[-limit:]:
+        try:
+            records.append(json.loads(line.decode('utf-8')))
+        except ValueError:
+            continue   # 截断的首行或写入中的末行
+    return records
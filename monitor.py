@@ -8,161 +8,435 @@ import json
 import os
 import sys
 import argparse
+import heapq
+import importlib
+import queue
+import signal
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, TYPE_CHECKING
 
 # 添加sources目录到路径
-import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
 
-from rss import RSSSource
-from hackernews import HackerNewsSource
-from reddit import RedditSource
-from arxiv import ArXivSource
-from twitter import TwitterSource
-from ai_summary import ContentAnalyzer
+# 数据源、HTTP客户端 (requests) 和内容分析模块按需导入：
+# --list-subs / --subscribe / --web 等不采集的命令不必加载 feedparser、requests、bs4
 from subscription import SubscriptionManager
+from feed_cache import FeedCache
+from storage import open_store, ItemStore
+from keyword_matcher import KeywordClassifier
+from near_dup import fold_near_duplicates, alt_source
+from metrics import RunMetrics
+from polling import AdaptivePoller
+from health import SourceHealth, SOURCE_HEALTH_FILE
+from cron import CronSchedule
+from publish import write_if_changed, write_json_if_changed, read_json, content_hash, stable_items
+
+if TYPE_CHECKING:
+    from http_client import HttpClient
 
 # ============ 配置 ============
 CONFIG_FILE = os.path.join(BASE_DIR, "config.json")
-DATA_FILE = os.path.join(BASE_DIR, "data.json")
+DATA_FILE = os.path.join(BASE_DIR, "data.json")   # 旧版数据文件，仅用于迁移
+DB_FILE = os.path.join(BASE_DIR, "data.db")
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
-SITE_DATA_FILE = os.path.join(BASE_DIR, "docs/data/site_data.json")
+SITE_DATA_DIR = os.path.join(BASE_DIR, "docs/data")
+PROFILE_FILE = os.path.join(BASE_DIR, "monitor.prof")
 
 def load_config() -> Dict:
     """加载配置"""
     with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def load_data() -> Dict:
-    """加载数据"""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
-    return {"items": [], "last_run": None, "stats": {}}
-
-def save_data(data: Dict):
-    """保存数据"""
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_data(store: ItemStore, new_items: List[Dict]) -> List[Dict]:
+    """增量保存新资讯并更新运行信息，返回实际入库的条目"""
+    inserted = store.add_items(new_items)
+    now = datetime.now().isoformat()
+    store.set_meta("last_run", now)
+    store.set_meta("stats", {
+        "total_items": store.count(),
+        "last_new_items": len(inserted),
+        "last_run": now
+    })
+    return inserted
 
 # ============ 数据源采集 ============
-def collect_all(config: Dict) -> List[Dict]:
-    """采集所有数据源"""
-    all_items = []
+# 数据源类型 -> (模块, 类名)，首次创建该类型的数据源时才导入
+RSS_SOURCE = ("rss", "RSSSource")
+API_SOURCES = {
+    "hn": ("hackernews", "HackerNewsSource"),
+    "reddit": ("reddit", "RedditSource"),
+    "arxiv": ("arxiv", "ArXivSource"),
+    "twitter": ("twitter", "TwitterSource"),
+}
+
+DEFAULT_COLLECT_SETTINGS = {
+    "max_workers": 8,       # 并发采集线程数
+    "source_timeout": 30,   # 单个数据源的截止时间(秒)
+    "run_timeout": 120,     # 整轮采集的截止时间(秒)
+}
+
+def get_collect_settings(config: Dict) -> Dict:
+    """读取采集设置，缺省项使用默认值"""
+    settings = dict(DEFAULT_COLLECT_SETTINGS)
+    settings.update(config.get("settings", {}).get("collect", {}))
+    return settings
+
+DEFAULT_HEALTH_SETTINGS = {
+    "failure_threshold": 3,   # 连续失败该次数后熔断，跳过该数据源
+    "cooldown": 300,          # 首次熔断的冷却时间(秒)，之后每次试探失败加倍
+    "max_cooldown": 21600,    # 冷却时间上限(秒)
+}
+
+def get_health_settings(config: Dict) -> Dict:
+    """读取熔断设置，缺省项使用默认值"""
+    settings = dict(DEFAULT_HEALTH_SETTINGS)
+    settings.update(config.get("settings", {}).get("health", {}))
+    return settings
+
+def get_source_health(config: Dict) -> SourceHealth:
+    # 运行时读取模块变量，基准测试可把状态文件指向临时目录
+    return SourceHealth(SOURCE_HEALTH_FILE, **get_health_settings(config))
+
+def print_health(health: SourceHealth):
+    """打印熔断中和有连续失败的数据源"""
+    for name, entry in health.unhealthy():
+        if entry["state"] == "closed":
+            print(f"  健康: {name} 连续失败 {entry['failures']}次")
+        else:
+            print(f"  熔断: {name} 连续失败 {entry['failures']}次，"
+                  f"{health.retry_in(name):.0f}s 后试探 ({(entry['last_error'] or '')[:80]})")
+
+def list_source_jobs(config: Dict) -> List[Dict]:
+    """按配置顺序列出所有启用的数据源"""
     sources_config = config.get("sources", {})
+    jobs = []
     
-    print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 开始采集...")
-    
-    # RSS源
     for src_cfg in sources_config.get("rss", []):
         if src_cfg.get("enabled", True):
-            print(f"  → RSS: {src_cfg['name']}...", end=" ")
-            source = RSSSource(src_cfg)
-            items = source.fetch()
-            all_items.extend(items)
-            print(f"✓ {len(items)}条")
+            jobs.append({"kind": "RSS", "type": "rss", "config": src_cfg})
     
-    # API源
     for src_cfg in sources_config.get("api", []):
-        if not src_cfg.get("enabled", True):
-            continue
+        if src_cfg.get("enabled", True):
+            jobs.append({"kind": "API", "type": src_cfg.get("type"), "config": src_cfg})
+    
+    return jobs
+
+_http_client = None
+
+def get_http_client(config: Dict) -> "HttpClient":
+    """进程内共享的HTTP客户端，连接池在多轮采集之间保持"""
+    global _http_client
+    if _http_client is None:
+        from http_client import HttpClient
+        _http_client = HttpClient.from_config(config)
+    return _http_client
+
+def create_source(job: Dict, client: "HttpClient" = None, feed_cache: FeedCache = None):
+    """根据任务类型创建数据源实例，未知类型返回None"""
+    target = RSS_SOURCE if job["type"] == "rss" else API_SOURCES.get(job["type"])
+    if target is None:
+        return None
+    module, class_name = target
+    source_cls = getattr(importlib.import_module(module), class_name)
+    return source_cls(job["config"], client=client, feed_cache=feed_cache)
+
+def _fetch_job(job: Dict, index: int, started: Dict[int, float],
+               client: "HttpClient", feed_cache: FeedCache) -> tuple:
+    """在工作线程中执行单个数据源采集，返回 (items, 耗时)"""
+    started[index] = time.monotonic()
+    source = create_source(job, client, feed_cache)
+    if source is None:
+        return None, 0.0
+    items = source.fetch()
+    if source.last_error:
+        raise RuntimeError(source.last_error)
+    return items, time.monotonic() - started[index]
+
+def collect_all(config: Dict, stats: List[Dict] = None, feed_cache: FeedCache = None) -> List[Dict]:
+    """并发采集所有数据源
+
+    每个数据源有独立的截止时间，整轮采集另有全局截止时间；超时的数据源
+    结果被丢弃。熔断中的数据源直接跳过 (状态 skipped)。结果按配置顺序合并，
+    保证输出顺序稳定。如传入 stats 列表，每个数据源的耗时、条数和状态会追加到其中。
+    feed_cache 默认为项目根目录的 feed_cache.json。
+    """
+    settings = get_collect_settings(config)
+    source_timeout = settings["source_timeout"]
+    jobs = list_source_jobs(config)
+    
+    print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 开始采集... "
+          f"({len(jobs)}个数据源, {settings['max_workers']}线程)")
+    
+    run_start = time.monotonic()
+    run_deadline = run_start + settings["run_timeout"]
+    started: Dict[int, float] = {}
+    results: List[Dict] = [None] * len(jobs)
+    client = get_http_client(config)
+    client.stats(reset=True)
+    feed_cache = feed_cache or FeedCache()
+    health = get_source_health(config)
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, settings["max_workers"]))
+    futures = {}
+    for i, job in enumerate(jobs):
+        if health.allow(job["config"].get("name", "Unknown")):
+            futures[executor.submit(_fetch_job, job, i, started, client, feed_cache)] = i
+        else:
+            results[i] = {"status": "skipped", "items": [], "seconds": 0.0}
+    pending = set(futures)
+    
+    while pending:
+        now = time.monotonic()
         
-        source_type = src_cfg.get("type")
-        print(f"  → API: {src_cfg['name']}...", end=" ")
+        # 单源超时
+        for future in list(pending):
+            i = futures[future]
+            if i in started and now - started[i] >= source_timeout:
+                pending.discard(future)
+                results[i] = {"status": "timeout", "items": [], "seconds": now - started[i]}
         
-        if source_type == "hn":
-            source = HackerNewsSource(src_cfg)
-        elif source_type == "reddit":
-            source = RedditSource(src_cfg)
-        elif source_type == "arxiv":
-            source = ArXivSource(src_cfg)
-        elif source_type == "twitter":
-            source = TwitterSource(src_cfg)
+        # 全局超时
+        if now >= run_deadline:
+            for future in pending:
+                i = futures[future]
+                future.cancel()
+                results[i] = {"status": "timeout", "items": [],
+                              "seconds": now - started[i] if i in started else 0.0}
+            break
+        
+        if not pending:
+            break
+        
+        deadlines = [run_deadline] + [started[futures[f]] + source_timeout
+                                      for f in pending if futures[f] in started]
+        done, pending = wait(pending, timeout=max(0.0, min(min(deadlines) - now, 1.0)),
+                             return_when=FIRST_COMPLETED)
+        
+        for future in done:
+            i = futures[future]
+            try:
+                items, seconds = future.result()
+            except Exception as e:
+                results[i] = {"status": "error", "items": [], "error": str(e),
+                              "seconds": time.monotonic() - started.get(i, now)}
+                continue
+            if items is None:
+                results[i] = {"status": "unknown", "items": [], "seconds": 0.0}
+            else:
+                results[i] = {"status": "ok", "items": items, "seconds": seconds}
+    
+    # 不等待已超时的线程，它们会在各自的请求超时后自行结束
+    executor.shutdown(wait=False)
+    feed_cache.save()
+    
+    all_items = []
+    for job, result in zip(jobs, results):
+        name = job["config"].get("name", "Unknown")
+        status = result["status"]
+        if status == "ok":
+            all_items.extend(result["items"])
+            health.record_success(name)
+            print(f"  → {job['kind']}: {name} ✓ {len(result['items'])}条 ({result['seconds']:.2f}s)")
+        elif status == "timeout":
+            health.record_failure(name, "超时")
+            print(f"  → {job['kind']}: {name} ✗ 超时 ({result['seconds']:.2f}s)")
+        elif status == "unknown":
+            health.release(name)
+            print(f"  → {job['kind']}: {name} ✗ 未知类型")
+        elif status == "skipped":
+            print(f"  → {job['kind']}: {name} ⏸ 熔断中，跳过")
         else:
-            print("✗ 未知类型")
-            continue
+            health.record_failure(name, result.get("error", ""))
+            print(f"  → {job['kind']}: {name} ✗ {result.get('error', '')}")
         
-        items = source.fetch()
-        all_items.extend(items)
-        print(f"✓ {len(items)}条")
+        if stats is not None:
+            stats.append({
+                "name": name,
+                "type": job["type"],
+                "status": status,
+                "items": len(result["items"]),
+                "seconds": round(result["seconds"], 3),
+            })
     
-    print(f"  总计: {len(all_items)}条")
+    health.save()
+    
+    print(f"  总计: {len(all_items)}条 (耗时 {time.monotonic() - run_start:.2f}s)")
+    print_http_stats(client.stats())
+    print_health(health)
     return all_items
 
+def print_http_stats(host_stats: Dict[str, Dict]):
+    """打印本轮HTTP请求汇总"""
+    if not host_stats:
+        return
+    total = {"requests": 0, "errors": 0, "retries": 0, "bytes": 0, "seconds": 0.0}
+    for stats in host_stats.values():
+        for key in total:
+            total[key] += stats[key]
+    avg_ms = total["seconds"] / total["requests"] * 1000 if total["requests"] else 0
+    print(f"  HTTP: {total['requests']}次请求 / {len(host_stats)}个主机, "
+          f"重试 {total['retries']}, 失败 {total['errors']}, "
+          f"{total['bytes'] / 1024:.0f}KB, 平均 {avg_ms:.0f}ms")
+
 # ============ 内容处理 ============
+_classifier = None
+
+def get_classifier(config: Dict) -> KeywordClassifier:
+    """按 config["keywords"] 编译的分类器，关键词表不变时复用"""
+    global _classifier
+    keywords = config.get("keywords", {})
+    if _classifier is None or _classifier.keywords is not keywords:
+        _classifier = KeywordClassifier(keywords)
+    return _classifier
+
 def classify_content(title: str, summary: str, config: Dict) -> List[str]:
     """内容分类"""
-    text = (title + " " + summary).lower()
-    categories = []
-    
-    for cat, keywords in config.get("keywords", {}).items():
-        for kw in keywords:
-            if kw.lower() in text:
-                categories.append(cat)
-                break
-    
-    return categories if categories else ["other"]
+    return get_classifier(config).classify(title, summary)
 
-def process_items(items: List[Dict], config: Dict) -> List[Dict]:
-    """处理内容：去重、分类、AI分析"""
+# ============ 近似重复 ============
+DEFAULT_DEDUP_SETTINGS = {
+    "enabled": True,
+    "threshold": 0.6,       # 估计的 Jaccard 相似度不低于该值视为同一条新闻
+    "window_days": 30,      # 与多少天内入库的资讯比较
+}
+
+def get_dedup_settings(config: Dict) -> Dict:
+    """读取去重设置，缺省项使用默认值"""
+    settings = dict(DEFAULT_DEDUP_SETTINGS)
+    settings.update(config.get("settings", {}).get("dedup", {}))
+    return settings
+
+def filter_new_items(store: ItemStore, items: List[Dict], config: Dict) -> List[Dict]:
+    """与历史数据去重：链接已入库或与近期资讯近似重复的条目不再入库，
+    其来源记入已有条目的 alt_sources；已入库条目带有的最新互动计数 (engagement) 写回库中"""
+    dedup = get_dedup_settings(config)
+    since = (datetime.now() - timedelta(days=dedup["window_days"])).isoformat()
+    existing_links = store.existing_links([item["link"] for item in items])
+    new_items = []
+    merged = 0
+    engagement_updates = []
+    for item in items:
+        if item["link"] in existing_links:
+            if item.get("alt_sources"):
+                store.merge_alternates(item["link"], item["alt_sources"])
+            if item.get("engagement"):
+                engagement_updates.append(item)
+            continue
+        if dedup["enabled"]:
+            dup_id = store.find_near_duplicate(item, dedup["threshold"], since)
+            if dup_id is not None:
+                store.merge_alternates_by_id(dup_id, [alt_source(item)] + item.get("alt_sources", []))
+                merged += 1
+                continue
+        new_items.append(item)
+    if merged:
+        print(f"  近似重复 (已合并到历史资讯): {merged}条")
+    refreshed = store.update_engagement(engagement_updates) if engagement_updates else 0
+    if refreshed:
+        print(f"  互动计数已更新: {refreshed}条")
+    return new_items
+
+def process_items(items: List[Dict], config: Dict, metrics: RunMetrics = None) -> List[Dict]:
+    """处理内容：去重、分类、AI分析；各步骤耗时和条数记入 metrics"""
     print("\n[处理内容]")
+    metrics = metrics or RunMetrics()
     
     # 去重
-    seen_links = set()
-    unique_items = []
-    for item in items:
-        link = item.get("link", "")
-        if link and link not in seen_links:
-            seen_links.add(link)
-            unique_items.append(item)
+    with metrics.timer("dedup"):
+        seen_links = set()
+        unique_items = []
+        for item in items:
+            link = item.get("link", "")
+            if link and link not in seen_links:
+                seen_links.add(link)
+                unique_items.append(item)
+    metrics.set("unique_items", len(unique_items))
     
     print(f"  去重后: {len(unique_items)}条")
     
-    # 分类和分析
+    # 分类
+    from ai_summary import ContentAnalyzer
     analyzer = ContentAnalyzer()
+    classifier = get_classifier(config)
     processed = []
     
-    for item in unique_items:
-        # 分类
-        categories = classify_content(
-            item.get("title", ""), 
-            item.get("summary", ""), 
-            config
-        )
-        item["categories"] = categories
-        
-        # 跳过无关内容
-        if categories == ["other"]:
-            continue
-        
-        # AI分析
-        analysis = analyzer.analyze(
-            item.get("title", ""),
-            item.get("summary", "")
-        )
-        item["ai_summary"] = analysis["summary"]
-        item["keywords"] = analysis["keywords"]
-        item["importance"] = analysis["importance"]
-        
-        processed.append(item)
+    with metrics.timer("classify"):
+        for item in unique_items:
+            categories, matched_terms = classifier.match(
+                item.get("title", ""), 
+                item.get("summary", "")
+            )
+            item["categories"] = categories or ["other"]
+            
+            # 跳过无关内容
+            if not categories:
+                continue
+            item["matched_terms"] = matched_terms
+            processed.append(item)
+    metrics.set("relevant_items", len(processed))
     
     print(f"  相关资讯: {len(processed)}条")
     
+    # 合并不同来源转载的同一新闻
+    dedup = get_dedup_settings(config)
+    if dedup["enabled"]:
+        before = len(processed)
+        with metrics.timer("near_dup"):
+            processed = fold_near_duplicates(processed, dedup["threshold"])
+        metrics.set("near_dup_folded", before - len(processed))
+        if len(processed) < before:
+            print(f"  近似重复合并: {before - len(processed)}条")
+    
+    # AI分析
+    with metrics.timer("analyze"):
+        analyses = analyzer.analyze_batch([(item.get("title", ""), item.get("summary", "")) for item in processed])
+        for item, analysis in zip(processed, analyses):
+            item["ai_summary"] = analysis["summary"]
+            item["keywords"] = analysis["keywords"]
+            item["importance"] = analysis["importance"]
+    
     # 按重要性排序
     processed.sort(key=lambda x: x.get("importance", 0), reverse=True)
     
     return processed
 
+def ingest_items(store: ItemStore, items: List[Dict], config: Dict,
+                 metrics: RunMetrics, mgr: SubscriptionManager = None) -> tuple:
+    """处理、入库并检查订阅，返回 (处理后的条目, 新增条目, 订阅命中)
+
+    mgr 为复用的订阅管理器 (常驻进程传入，避免每轮重新读取和编译订阅)。
+    """
+    processed = process_items(items, config, metrics)
+    
+    # 与历史数据去重
+    with metrics.timer("filter_new"):
+        new_items = filter_new_items(store, processed, config)
+    metrics.set("new_items", len(new_items))
+    print(f"\n[数据更新] 新增: {len(new_items)}条")
+    
+    with metrics.timer("save"):
+        save_data(store, new_items)
+    
+    with metrics.timer("subscriptions"):
+        matches = check_subscriptions(new_items, mgr)
+    metrics.set("subscription_matches", len(matches))
+    return processed, new_items, matches
+
 # ============ 报告生成 ============
-def generate_report(items: List[Dict], config: Dict) -> tuple:
-    """生成报告"""
+def generate_report(items: List[Dict], config: Dict, metrics: RunMetrics = None,
+                    changed: List[str] = None, new_items: List[Dict] = None) -> tuple:
+    """生成报告和网站数据
+
+    内容 (不含生成时间和采集时间) 与已有文件相同时不写入；如传入 changed 列表，
+    实际写入的文件路径会追加到其中，供 sync_to_github 只提交这些产物。
+    new_items 为本轮新入库的条目，只有它们进入当天的日分片；未传入时 items 即全部为新条目
+    (如日报推送的上次推送以来的新资讯)。
+    """
+    metrics = metrics or RunMetrics()
     now = datetime.now()
     date_str = now.strftime("%Y-%m-%d")
     
@@ -176,7 +450,9 @@ def generate_report(items: List[Dict], config: Dict) -> tuple:
     # 生成Markdown
     per_cat = config.get("settings", {}).get("items_per_category", 15)
     
+    digest = content_hash({"date": date_str, "per_cat": per_cat, "items": stable_items(items)})
     md = f"""# 📡 科技情报日报 | {date_str}
+<!-- content-hash: {digest} -->
 
 > 生成时间: {now.strftime("%H:%M")}  
 > 本期精选: {len(items)} 条相关资讯 | AI自动摘要
@@ -222,20 +498,80 @@ def generate_report(items: List[Dict], config: Dict) -> tuple:
 """
     
     # 保存
-    os.makedirs(REPORTS_DIR, exist_ok=True)
     report_path = f"{REPORTS_DIR}/report-{date_str}.md"
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(md)
+    if not write_if_changed(report_path, md, digest, changed):
+        print(f"  报告内容未变化，跳过写入: {report_path}")
     
     # 生成网站数据
-    generate_site_data(items, by_cat, config)
+    with metrics.timer("site_data"):
+        generate_site_data(items, by_cat, config, changed, new_items)
     
     return report_path, md
 
 
-def generate_site_data(items: List[Dict], by_cat: Dict, config: Dict):
-    """生成 GitHub Pages 网站数据"""
+SITE_CATEGORIES = {
+    "ai": {"name": "AI & LLM", "name_cn": "AI & 大模型", "emoji": "🤖"},
+    "robotics": {"name": "Robotics", "name_cn": "具身智能", "emoji": "🦾"},
+    "space": {"name": "Space", "name_cn": "航天", "emoji": "🚀"},
+}
+
+# 清单 (首屏) 和分片中每条资讯保留的字段；新增字段不会自动进入网站数据
+MANIFEST_ITEM_FIELDS = ("title", "link", "source", "categories", "importance", "pub_date", "fetched_at")
+SHARD_ITEM_FIELDS = MANIFEST_ITEM_FIELDS + ("summary", "ai_summary", "keywords", "alt_sources")
+
+# 分类分片保留的最近条目数；清单中列出的最近天数 (更早的日分片仍可按 URL 访问)
+CATEGORY_SHARD_SIZE = 100
+MANIFEST_DAYS = 90
+
+def _compact(item: Dict, fields: tuple) -> Dict:
+    return {k: item[k] for k in fields if item.get(k) not in (None, "", [])}
+
+def _merge_shard_items(existing: List[Dict], new: List[Dict]) -> List[Dict]:
+    """按链接合并，新数据覆盖旧数据但保留首次采集时间；按首次采集时间倒序"""
+    merged = {item["link"]: item for item in existing}
+    for item in new:
+        old = merged.get(item["link"])
+        merged[item["link"]] = dict(item, fetched_at=old["fetched_at"]) if old and old.get("fetched_at") else item
+    return sorted(merged.values(), key=lambda x: x.get("fetched_at", ""), reverse=True)
+
+def generate_site_data(items: List[Dict], by_cat: Dict, config: Dict, changed: List[str] = None,
+                       new_items: List[Dict] = None) -> bool:
+    """生成 GitHub Pages 网站数据：清单 + 分类分片 + 日分片，内容未变化的文件不写入
+
+    manifest.json        首屏所需的统计、热门和最新条目 (精简字段)、分片地址和可用日期
+    category/<分类>.json 该分类最近 CATEGORY_SHARD_SIZE 条
+    day/<日期>.json      当天各轮新入库的条目 (new_items，默认为 items)，过了当天不再改写；
+                         之前已入库的条目不会再并入，各天的分片互不重叠
+    每个文件都有预压缩的 .gz 副本。返回清单是否写入。
+    """
     now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    shards = [_compact(item, SHARD_ITEM_FIELDS) for item in items if item.get("link")]
+    
+    # 日分片：本轮新入库的条目与当天早先的运行合并
+    day_new = shards if new_items is None else [_compact(item, SHARD_ITEM_FIELDS)
+                                                 for item in new_items if item.get("link")]
+    day_path = os.path.join(SITE_DATA_DIR, "day", f"{today}.json")
+    day_items = _merge_shard_items(read_json(day_path).get("items", []), day_new)
+    write_json_if_changed(day_path, {
+        "content_hash": content_hash(stable_items(day_items)),
+        "date": today,
+        "count": len(day_items),
+        "items": day_items,
+    }, changed)
+    
+    # 分类分片：滚动保留最近的条目
+    categories = {}
+    for cat, meta in SITE_CATEGORIES.items():
+        cat_path = os.path.join(SITE_DATA_DIR, "category", f"{cat}.json")
+        cat_new = [item for item in shards if cat in item.get("categories", [])]
+        cat_items = _merge_shard_items(read_json(cat_path).get("items", []), cat_new)[:CATEGORY_SHARD_SIZE]
+        write_json_if_changed(cat_path, {
+            "content_hash": content_hash(stable_items(cat_items)),
+            "category": cat,
+            "items": cat_items,
+        }, changed)
+        categories[cat] = dict(meta, count=len(by_cat.get(cat, [])), shard=f"category/{cat}.json")
     
     # 统计数据源
     sources = {}
@@ -243,8 +579,18 @@ def generate_site_data(items: List[Dict], by_cat: Dict, config: Dict):
         src = item.get("source", "Unknown")
         sources[src] = sources.get(src, 0) + 1
     
-    # 构建网站数据
-    site_data = {
+    day_dir = os.path.join(SITE_DATA_DIR, "day")
+    days = sorted((f[:-5] for f in os.listdir(day_dir) if f.endswith(".json")), reverse=True)[:MANIFEST_DAYS]
+    trending = sorted(items, key=lambda x: x.get("importance", 0), reverse=True)[:10]
+    stable = {
+        "categories": categories,
+        "stats": {"total_items": len(items), "today_items": len(day_items), "sources": sources},
+        "trending": [_compact(item, MANIFEST_ITEM_FIELDS) for item in trending],
+        "latest": [_compact(item, MANIFEST_ITEM_FIELDS) for item in day_items[:20]],
+        "days": days,
+    }
+    manifest = {
+        "content_hash": content_hash(dict(stable, trending=stable_items(stable["trending"]))),
         "site": {
             "name": "StellarPulse",
             "name_cn": "星脉",
@@ -254,43 +600,17 @@ def generate_site_data(items: List[Dict], by_cat: Dict, config: Dict):
             "last_update": now.isoformat(),
             "total_items": len(items)
         },
-        "categories": {
-            "ai": {
-                "name": "AI & LLM",
-                "name_cn": "AI & 大模型",
-                "emoji": "🤖",
-                "count": len(by_cat.get("ai", []))
-            },
-            "robotics": {
-                "name": "Robotics",
-                "name_cn": "具身智能",
-                "emoji": "🦾",
-                "count": len(by_cat.get("robotics", []))
-            },
-            "space": {
-                "name": "Space",
-                "name_cn": "航天",
-                "emoji": "🚀",
-                "count": len(by_cat.get("space", []))
-            }
-        },
-        "stats": {
-            "total_items": len(items),
-            "today_items": len(items),
-            "sources": sources,
-            "last_update": now.isoformat()
-        },
-        "trending": sorted(items, key=lambda x: x.get("importance", 0), reverse=True)[:10],
-        "latest": sorted(items, key=lambda x: x.get("fetched_at", ""), reverse=True)[:20],
+        **stable,
         "updated_at": now.isoformat()
     }
+    manifest["stats"]["last_update"] = now.isoformat()
     
-    # 保存网站数据
-    os.makedirs(os.path.dirname(SITE_DATA_FILE), exist_ok=True)
-    with open(SITE_DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(site_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"  网站数据已更新: {SITE_DATA_FILE}")
+    manifest_path = os.path.join(SITE_DATA_DIR, "manifest.json")
+    if not write_json_if_changed(manifest_path, manifest, changed):
+        print(f"  网站数据未变化，跳过写入: {manifest_path}")
+        return False
+    print(f"  网站数据已更新: {manifest_path} ({len(day_items)}条 / {len(days)}天)")
+    return True
 
 def format_item(item: Dict) -> str:
     """格式化单条资讯"""
@@ -327,9 +647,9 @@ def get_top_keywords(items: List[Dict]) -> str:
     return ', '.join([k[0] for k in top]) if top else 'N/A'
 
 # ============ 关键词订阅检查 ============
-def check_subscriptions(items: List[Dict]) -> List[Dict]:
-    """检查关键词匹配"""
-    mgr = SubscriptionManager()
+def check_subscriptions(items: List[Dict], mgr: SubscriptionManager = None) -> List[Dict]:
+    """检查关键词匹配；未传入 mgr 时临时创建 (单次运行)"""
+    mgr = mgr or SubscriptionManager()
     matches = mgr.check_matches(items)
     
     if matches:
@@ -371,16 +691,20 @@ def generate_whatsapp_summary(items: List[Dict], matches: List[Dict]) -> str:
     
     return msg
 
-def sync_to_github():
-    """同步到 GitHub（仅在内容有变更时提交）"""
+def sync_to_github(paths: List[str]):
+    """只提交本次写入的产物 (报告、网站数据)；没有写入任何文件时不执行 git"""
+    if not paths:
+        print("\n[GitHub] 产物未变化，跳过提交")
+        return
     try:
-        # 检查是否有变更
-        subprocess.run(["git", "add", "-A"], cwd=BASE_DIR, check=True)
-        # 检查暂存区是否有变更
-        result = subprocess.run(["git", "diff", "--cached", "--quiet"], cwd=BASE_DIR, capture_output=True)
+        subprocess.run(["git", "add", "--"] + paths, cwd=BASE_DIR, check=True)
+        # 内容哈希变化但文件与已提交版本一致时 (如手动回退过)，暂存区没有差异
+        result = subprocess.run(["git", "diff", "--cached", "--quiet", "--"] + paths,
+                                cwd=BASE_DIR, capture_output=True)
         if result.returncode != 0:  # 有变更才提交
             commit_msg = f"chore: auto-update StellarPulse data {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            subprocess.run(["git", "commit", "-m", commit_msg], cwd=BASE_DIR, check=True)
+            # 只提交这些路径，不带上工作区或暂存区里的其他改动
+            subprocess.run(["git", "commit", "-m", commit_msg, "--"] + paths, cwd=BASE_DIR, check=True)
             subprocess.run(["git", "push", "origin", "main"], cwd=BASE_DIR, check=True)
             print("\n[GitHub] 已自动同步提交")
         else:
@@ -388,12 +712,239 @@ def sync_to_github():
     except subprocess.CalledProcessError as e:
         print(f"\n[GitHub] 自动同步失败: {e}")
 
+# ============ 常驻模式 ============
+DEFAULT_DAEMON_SETTINGS = {
+    "default_interval": 900,   # 数据源未配置 poll_interval 时的轮询间隔(秒)
+    "min_interval": 60,        # 轮询间隔下限(秒)
+    "max_interval": 21600,     # 自适应轮询的间隔上限(秒)
+    "adaptive": True,          # 按每轮新增条数自动调整各数据源的轮询间隔
+    "busy_items": 5,           # 一轮新增超过该条数时加快轮询
+}
+
+def get_daemon_settings(config: Dict) -> Dict:
+    """读取常驻模式设置，缺省项使用默认值"""
+    settings = dict(DEFAULT_DAEMON_SETTINGS)
+    settings.update(config.get("settings", {}).get("daemon", {}))
+    return settings
+
+class MonitorDaemon:
+    """常驻采集：每个数据源按各自的间隔轮询，返回结果后立即处理入库
+
+    HTTP 连接池、条件请求缓存、分类器和资讯库连接在各轮之间保持。
+    开启 adaptive 时各数据源的间隔按新增条数在 [min_interval, max_interval] 之间调整，保存在 poll_state.json。
+    熔断中的数据源推迟到冷却结束再轮询。
+    settings.notification.schedule (cron) 到点时，把上次推送以来的新资讯生成报告和摘要。
+    """
+    
+    def __init__(self, config: Dict):
+        self.config = config
+        self.settings = get_daemon_settings(config)
+        self.source_timeout = get_collect_settings(config)["source_timeout"]
+        self.jobs = list_source_jobs(config)
+        self.store = open_store(DB_FILE, DATA_FILE)
+        self.client = get_http_client(config)
+        self.feed_cache = FeedCache()
+        self.subscriptions = SubscriptionManager()
+        self.health = get_source_health(config)
+        self.poller = AdaptivePoller(busy_items=self.settings["busy_items"]) if self.settings["adaptive"] else None
+        self.executor = ThreadPoolExecutor(max_workers=max(1, get_collect_settings(config)["max_workers"]))
+        self.results: "queue.Queue[tuple]" = queue.Queue()
+        self.started: Dict[int, float] = {}
+        self.running: Dict[int, int] = {}      # 数据源序号 -> 本次轮询编号，超时作废的结果据此丢弃
+        self.poll_ids = 0
+        self.due = [(time.monotonic(), i) for i in range(len(self.jobs))]
+        heapq.heapify(self.due)
+        self.pending_matches: List[Dict] = []
+        self.stopping = False
+        if self.store.get_meta("last_digest") is None:
+            self.store.set_meta("last_digest", datetime.now().isoformat())
+        
+        notification = config.get("settings", {}).get("notification", {})
+        self.digest = None
+        if notification.get("enabled") and notification.get("schedule"):
+            self.digest = CronSchedule(notification["schedule"], notification.get("timezone"))
+            self.next_digest = self.digest.next_after(self.digest.now())
+    
+    def _bounds(self, index: int) -> tuple:
+        """(初始间隔, 下限, 上限)；数据源可单独配置 poll_interval / min_interval / max_interval"""
+        job_config = self.jobs[index]["config"]
+        low = job_config.get("min_interval", self.settings["min_interval"])
+        high = max(low, job_config.get("max_interval", self.settings["max_interval"]))
+        initial = max(low, job_config.get("poll_interval", self.settings["default_interval"]))
+        return initial, low, high
+    
+    def interval(self, index: int) -> float:
+        initial, low, high = self._bounds(index)
+        if self.poller is None:
+            return initial
+        return self.poller.interval(self.jobs[index]["config"].get("name", "Unknown"), initial, low, high)
+    
+    def run(self):
+        names = ", ".join(f"{job['config'].get('name', '?')} {self.interval(i):.0f}s"
+                          for i, job in enumerate(self.jobs))
+        print(f"🛰️ 常驻模式启动: {len(self.jobs)}个数据源 ({names})")
+        if self.digest:
+            print(f"  日报推送: {self.digest.expression} → 下次 {self.next_digest:%Y-%m-%d %H:%M}")
+        try:
+            while not self.stopping:
+                self._submit_due()
+                self._expire_timeouts()
+                try:
+                    result = self.results.get(timeout=self._wait_seconds())
+                except queue.Empty:
+                    result = None
+                if result is not None:
+                    self._handle_result(*result)
+                if self.digest and self.digest.now() >= self.next_digest:
+                    self._send_digest()
+        finally:
+            self.executor.shutdown(wait=False)
+            self.feed_cache.save()
+            self.store.close()
+    
+    def stop(self):
+        self.stopping = True
+        self.results.put(None)   # 唤醒主循环
+    
+    def _submit_due(self):
+        now = time.monotonic()
+        while self.due and self.due[0][0] <= now:
+            _, index = heapq.heappop(self.due)
+            name = self.jobs[index]["config"].get("name", "Unknown")
+            if not self.health.allow(name):
+                retry_in = max(self.health.retry_in(name), self.settings["min_interval"])
+                print(f"  → {name} ⏸ 熔断中，{retry_in:.0f}s 后试探")
+                heapq.heappush(self.due, (now + retry_in, index))
+                continue
+            self.poll_ids += 1
+            poll_id = self.running[index] = self.poll_ids
+            self.started.pop(index, None)
+            future = self.executor.submit(_fetch_job, self.jobs[index], index, self.started,
+                                          self.client, self.feed_cache)
+            future.add_done_callback(
+                lambda f, index=index, poll_id=poll_id: self.results.put((index, poll_id, f)))
+    
+    def _expire_timeouts(self):
+        now = time.monotonic()
+        for index, poll_id in list(self.running.items()):
+            started = self.started.get(index)
+            if started is not None and now - started >= self.source_timeout:
+                del self.running[index]
+                name = self.jobs[index]["config"].get("name", "Unknown")
+                print(f"  → {name} ✗ 超时 ({now - started:.2f}s)")
+                self._record(index, "timeout", [], now - started, "超时")
+                heapq.heappush(self.due, (now + self.interval(index), index))
+    
+    def _wait_seconds(self) -> float:
+        now = time.monotonic()
+        deadlines = [now + 60]
+        if self.due:
+            deadlines.append(self.due[0][0])
+        deadlines += [self.started[i] + self.source_timeout for i in self.running if i in self.started]
+        wait_seconds = min(deadlines) - now
+        if self.digest:
+            wait_seconds = min(wait_seconds, (self.next_digest - self.digest.now()).total_seconds())
+        return max(0.05, wait_seconds)
+    
+    def _handle_result(self, index: int, poll_id: int, future):
+        if self.running.get(index) != poll_id:
+            return   # 已按超时处理
+        del self.running[index]
+        name = self.jobs[index]["config"].get("name", "Unknown")
+        try:
+            items, seconds = future.result()
+        except Exception as e:
+            print(f"  → {name} ✗ {e}")
+            self._record(index, "error", [], time.monotonic() - self.started.get(index, time.monotonic()), str(e))
+        else:
+            if items is None:
+                print(f"  → {name} ✗ 未知类型")
+                self.health.release(name)
+                return   # 未知类型不再调度
+            print(f"\n[{datetime.now():%H:%M:%S}] {name} ✓ {len(items)}条 ({seconds:.2f}s)")
+            self._record(index, "ok", items, seconds)
+        heapq.heappush(self.due, (time.monotonic() + self.interval(index), index))
+    
+    def _record(self, index: int, status: str, items: List[Dict], seconds: float, error: str = None):
+        """把单个数据源的一次轮询作为一轮运行处理并记入 metrics.jsonl"""
+        job = self.jobs[index]
+        metrics = RunMetrics()
+        metrics.sources.append({
+            "name": job["config"].get("name", "Unknown"),
+            "type": job["type"],
+            "status": status,
+            "items": len(items),
+            "seconds": round(seconds, 3),
+        })
+        metrics.timings["collect"] = seconds
+        metrics.set("raw_items", len(items))
+        metrics.set("source_errors", int(status != "ok"))
+        name = metrics.sources[0]["name"]
+        if status == "ok":
+            self.health.record_success(name)
+        elif self.health.record_failure(name, error or status):
+            print(f"  → {name} ⏸ 连续失败，熔断 {self.health.retry_in(name):.0f}s")
+        self.health.save()
+        try:
+            new_count = 0
+            if items:
+                _, new_items, matches = ingest_items(self.store, items, self.config, metrics,
+                                                     self.subscriptions)
+                self.pending_matches.extend(matches)
+                new_count = len(new_items)
+            self.feed_cache.save()
+            if self.poller is not None and status == "ok":
+                state = self.poller.observe(metrics.sources[0]["name"], new_count, *self._bounds(index))
+                self.poller.save()
+                metrics.sources[0]["new_items"] = new_count
+                metrics.sources[0]["ewma_new_items"] = state["ewma"]
+            metrics.sources[0]["interval"] = self.interval(index)
+        except Exception as e:
+            metrics.status = "error"
+            print(f"  [处理失败] {e}")
+        finally:
+            metrics.append()
+    
+    def _send_digest(self):
+        """生成上次推送以来新资讯的报告和摘要，并同步到 GitHub"""
+        since = self.store.get_meta("last_digest")
+        now = datetime.now()
+        self.next_digest = self.digest.next_after(self.digest.now())
+        items = self.store.recent(limit=500, since=since)
+        items.sort(key=lambda x: x.get("importance", 0), reverse=True)
+        print(f"\n[日报] {len(items)}条新资讯，下次推送 {self.next_digest:%Y-%m-%d %H:%M}")
+        if items:
+            changed: List[str] = []
+            report_path, _ = generate_report(items, self.config, changed=changed)
+            print(f"[报告生成] {report_path}")
+            print("=" * 60)
+            print("WHATSAPP_MSG_START")
+            print(generate_whatsapp_summary(items, self.pending_matches))
+            print("WHATSAPP_MSG_END")
+            sync_to_github(changed)
+        self.pending_matches = []
+        self.store.set_meta("last_digest", now.isoformat())
+
+def run_daemon():
+    """常驻运行直到 SIGTERM / Ctrl+C"""
+    daemon = MonitorDaemon(load_config())
+    # systemd 以 SIGTERM 停止服务时完成当前处理后退出
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    print("👋 常驻模式已退出")
+
 # ============ 主流程 ============
 def main():
     parser = argparse.ArgumentParser(description='StellarPulse')
     parser.add_argument('--web', action='store_true', help='启动Web服务器')
     parser.add_argument('--subscribe', type=str, help='添加关键词订阅')
     parser.add_argument('--list-subs', action='store_true', help='列出订阅')
+    parser.add_argument('--daemon', action='store_true', help='常驻运行，各数据源按各自间隔轮询')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, metavar='FILE',
+                        help=f'用 cProfile 分析本轮采集 (默认输出 {os.path.basename(PROFILE_FILE)})')
     args = parser.parse_args()
     
     # Web服务器模式
@@ -419,42 +970,55 @@ def main():
             print(f"  • {s['keyword']} (匹配: {s.get('match_count', 0)}次)")
         return
     
+    if args.daemon:
+        run_daemon()
+        return
+    
     # 正常采集模式
+    if args.profile:
+        profile_run(args.profile)
+    else:
+        run_once()
+
+def run_once():
+    """执行一轮采集；各阶段耗时和计数追加到 metrics.jsonl"""
     print("=" * 60)
     print("📡 StellarPulse v2.0 启动")
     print("=" * 60)
     
+    metrics = RunMetrics()
+    try:
+        _run(metrics)
+    except BaseException:
+        metrics.status = "error"
+        raise
+    finally:
+        record = metrics.append()
+        print(f"\n[运行指标] 总耗时 {record['total_seconds']:.2f}s | " +
+              " | ".join(f"{name} {seconds:.2f}s" for name, seconds in record["timings"].items()))
+
+def _run(metrics: RunMetrics):
     # 加载配置
     config = load_config()
-    data = load_data()
+    store = open_store(DB_FILE, DATA_FILE)
     
     # 1. 采集
-    raw_items = collect_all(config)
-    
-    # 2. 处理
-    processed = process_items(raw_items, config)
+    with metrics.timer("collect"):
+        raw_items = collect_all(config, metrics.sources)
+    metrics.set("raw_items", len(raw_items))
+    metrics.set("source_errors", sum(1 for s in metrics.sources if s["status"] not in ("ok", "skipped")))
+    metrics.set("sources_skipped", sum(1 for s in metrics.sources if s["status"] == "skipped"))
     
-    # 3. 去重 (与历史数据)
-    existing_links = {item["link"] for item in data.get("items", [])}
-    new_items = [item for item in processed if item["link"] not in existing_links]
-    print(f"\n[数据更新] 新增: {len(new_items)}条")
-    
-    # 4. 保存
-    data["items"] = (data.get("items", []) + new_items)[-1000:]  # 保留1000条
-    data["last_run"] = datetime.now().isoformat()
-    data["stats"] = {
-        "total_items": len(data["items"]),
-        "last_new_items": len(new_items),
-        "last_run": datetime.now().isoformat()
-    }
-    save_data(data)
-    
-    # 5. 检查订阅
-    matches = check_subscriptions(new_items)
+    # 2-5. 处理、与历史数据去重、保存、检查订阅
+    processed, new_items, matches = ingest_items(store, raw_items, config, metrics)
     
     # 6. 生成报告
+    changed: List[str] = []
     if processed:
-        report_path, full_report = generate_report(processed, config)
+        # report 含其中的 site_data 耗时
+        with metrics.timer("report"):
+            report_path, full_report = generate_report(processed, config, metrics, changed, new_items)
+        metrics.set("artifacts_written", len(changed))
         print(f"\n[报告生成] {report_path}")
         
         # 7. WhatsApp摘要
@@ -467,10 +1031,24 @@ def main():
         print("\n[报告] 本期无相关资讯")
     
     # 自动同步到 GitHub
-    sync_to_github()
+    with metrics.timer("sync"):
+        sync_to_github(changed)
     
     print("=" * 60)
     print("✅ 完成")
 
+def profile_run(output: str):
+    """在 cProfile 下执行一轮采集，统计数据写入 output 并打印耗时最多的函数"""
+    import cProfile
+    import pstats
+    
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run_once)
+    finally:
+        profiler.dump_stats(output)
+        print(f"\n[性能分析] 已保存: {output} (可用 python3 -m pstats 或 snakeviz 查看)")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,123 @@
+"""
+StellarPulse 近似重复检测 - MinHash 签名与分段分桶 (LSH)
+同一新闻被不同来源转载时标题和摘要措辞略有差异，链接去重无法识别，
+用词元集合的 Jaccard 相似度判断是否为同一条新闻。
+标题通常只有十几个词元，MinHash 对这类短文本比 SimHash 稳定。
+"""
+
+import hashlib
+import random
+import struct
+from typing import List, Dict, Any, Optional, Tuple
+
+from search_index import tokenize
+
+# 签名长度 = BANDS * ROWS；同一分段的 ROWS 个值完全相同才成为候选，
+# Jaccard 约 (1/BANDS)^(1/ROWS) ≈ 0.5 以上的条目大概率落入同一个桶
+BANDS = 16
+ROWS = 4
+NUM_HASHES = BANDS * ROWS
+
+DEFAULT_THRESHOLD = 0.6
+
+# 摘要只取开头部分，各来源的摘要长短差异很大
+SUMMARY_CHARS = 120
+
+# 词元太少的文本容易误判，不参与检测
+MIN_TOKENS = 4
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601)   # 固定种子：签名需要跨运行保持一致
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+
+Signature = Tuple[int, ...]
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def minhash(title: str, summary: str = "") -> Optional[Signature]:
+    """计算 title + summary 开头部分的 MinHash 签名；词元不足时返回 None"""
+    tokens = set(tokenize(f"{title or ''} {(summary or '')[:SUMMARY_CHARS]}"))
+    if len(tokens) < MIN_TOKENS:
+        return None
+    hashes = [_token_hash(token) for token in tokens]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+                 for a, b in _PERMUTATIONS)
+
+def item_minhash(item: Dict[str, Any]) -> Optional[Signature]:
+    return minhash(item.get("title") or "", item.get("summary") or "")
+
+def band_keys(signature: Signature) -> List[int]:
+    """各分段的桶编号，取分段内容的哈希 (SQLite 有符号64位范围内)"""
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f">H{ROWS}I", band, *signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'big') >> 1)
+    return keys
+
+def similarity(a: Signature, b: Signature) -> float:
+    """两个签名估计的 Jaccard 相似度"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+def pack_signature(signature: Signature) -> bytes:
+    return struct.pack(f">{NUM_HASHES}I", *signature)
+
+def unpack_signature(data: bytes) -> Signature:
+    return struct.unpack(f">{NUM_HASHES}I", data)
+
+def alt_source(item: Dict[str, Any]) -> Dict[str, Any]:
+    """被合并条目在规范条目 alt_sources 中的记录"""
+    return {
+        "source": item.get("source", ""),
+        "link": item.get("link", ""),
+        "title": item.get("title", ""),
+        "fetched_at": item.get("fetched_at", ""),
+    }
+
+
+class NearDupIndex:
+    """内存中的分桶索引，用于单批资讯内部去重"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.buckets: Dict[int, List[int]] = {}
+        self.signatures: List[Signature] = []
+
+    def find(self, signature: Signature) -> Optional[int]:
+        """返回最相似的已收录签名的序号"""
+        best = None
+        for key in band_keys(signature):
+            for index in self.buckets.get(key, ()):
+                score = similarity(signature, self.signatures[index])
+                if score >= self.threshold and (best is None or (-score, index) < best):
+                    best = (-score, index)
+        return best[1] if best else None
+
+    def add(self, signature: Signature) -> int:
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        for key in band_keys(signature):
+            self.buckets.setdefault(key, []).append(index)
+        return index
+
+
+def fold_near_duplicates(items: List[Dict[str, Any]],
+                         threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """合并批内的近似重复条目：保留最先出现的一条，其余记入其 alt_sources"""
+    index = NearDupIndex(threshold)
+    canonical: List[Dict[str, Any]] = []
+    owners: List[Dict[str, Any]] = []   # 签名序号 -> 规范条目
+    for item in items:
+        signature = item_minhash(item)
+        if signature is None:
+            canonical.append(item)
+            continue
+        found = index.find(signature)
+        if found is not None:
+            owners[found].setdefault("alt_sources", []).append(alt_source(item))
+            continue
+        index.add(signature)
+        owners.append(item)
+        canonical.append(item)
+    return canonical
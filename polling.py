@@ -0,0 +1,80 @@
+"""
+StellarPulse 自适应轮询 - 按各数据源每轮新增条数调整轮询间隔
+长期没有新内容的源逐步放慢，新内容多的源加快，间隔限制在 [最小, 最大] 之间。
+学到的状态保存在 poll_state.json，重启后继续使用。
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any
+
+from sources.fileio import atomic_write
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+POLL_STATE_FILE = os.path.join(BASE_DIR, "poll_state.json")
+
+# 每个源保留的最近轮询新增条数
+HISTORY_SIZE = 20
+
+# 新增条数的指数滑动平均系数
+EWMA_ALPHA = 0.3
+
+# 没有新增时间隔放大的倍数；新增较多时间隔缩小的倍数
+BACKOFF_FACTOR = 1.5
+SPEEDUP_FACTOR = 2.0
+
+class AdaptivePoller:
+    """各数据源的轮询间隔与新增历史
+
+    规则：一轮没有新增 → 间隔乘以 BACKOFF_FACTOR；新增超过 busy_items → 间隔除以 SPEEDUP_FACTOR；
+    其余情况保持不变。失败和超时的轮询不计入 (不代表数据源没有更新)。
+    """
+
+    def __init__(self, state_file: str = POLL_STATE_FILE, busy_items: int = 5):
+        self.state_file = state_file
+        self.busy_items = busy_items
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """写回 poll_state.json"""
+        with self._lock:
+            data = json.dumps(self.state, ensure_ascii=False, indent=2)
+        try:
+            atomic_write(self.state_file, data)
+        except OSError as e:
+            print(f"  [Polling] 写入 {self.state_file} 失败: {e}")
+
+    def interval(self, name: str, initial: float, low: float, high: float) -> float:
+        """当前间隔；没有历史时使用 initial，结果限制在 [low, high]"""
+        with self._lock:
+            current = self.state.get(name, {}).get("interval", initial)
+        return min(high, max(low, current))
+
+    def observe(self, name: str, new_items: int, initial: float, low: float, high: float) -> Dict[str, Any]:
+        """记录一轮成功轮询的新增条数，返回更新后的状态"""
+        with self._lock:
+            entry = self.state.setdefault(name, {"interval": initial, "ewma": None, "history": [], "polls": 0})
+            ewma = entry["ewma"]
+            entry["ewma"] = new_items if ewma is None else EWMA_ALPHA * new_items + (1 - EWMA_ALPHA) * ewma
+            entry["history"] = (entry["history"] + [new_items])[-HISTORY_SIZE:]
+            entry["polls"] += 1
+            entry["last_poll"] = datetime.now().isoformat()
+
+            interval = min(high, max(low, entry["interval"]))
+            if new_items == 0:
+                interval *= BACKOFF_FACTOR
+            elif new_items > self.busy_items:
+                interval /= SPEEDUP_FACTOR
+            entry["interval"] = round(min(high, max(low, interval)), 1)
+            entry["ewma"] = round(entry["ewma"], 3)
+            return dict(entry)
@@ -0,0 +1,79 @@
+"""
+StellarPulse 产物发布 - 按内容哈希决定是否写入报告和网站数据
+哈希基于不含时间戳的内容计算并写进产物本身 (Markdown 注释 / JSON 字段)，
+内容未变时不写磁盘，也就不会产生 git 提交和 Pages 重新部署。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import List, Dict, Any, Optional
+
+from sources.fileio import atomic_write
+
+# 每次采集都会变化、不代表内容变化的条目字段
+VOLATILE_FIELDS = ("fetched_at",)
+
+# 产物中记录哈希的位置：Markdown 的 <!-- content-hash: ... --> 或 JSON 的 "content_hash" 字段
+_HASH_RE = re.compile(r'content-hash: ([0-9a-f]+)|"content_hash":\s*"([0-9a-f]+)"')
+
+# 只在文件开头查找哈希
+_HASH_SCAN_BYTES = 4096
+
+def stable_items(items: List[Dict]) -> List[Dict]:
+    """去掉易变字段后的条目，用于计算哈希"""
+    return [{k: v for k, v in item.items() if k not in VOLATILE_FIELDS} for item in items]
+
+def content_hash(data: Any) -> str:
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+def stored_hash(path: str) -> Optional[str]:
+    """读取已有产物中记录的哈希，文件不存在或没有哈希时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            head = f.read(_HASH_SCAN_BYTES)
+    except (OSError, UnicodeDecodeError):
+        return None
+    match = _HASH_RE.search(head)
+    return (match.group(1) or match.group(2)) if match else None
+
+def read_json(path: str) -> Dict[str, Any]:
+    """读取已有的 JSON 产物，不存在或损坏时返回空字典"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_if_changed(path: str, content: str, digest: str, changed: List[str] = None) -> bool:
+    """已有文件的哈希与 digest 相同时不写入；写入时把路径追加到 changed"""
+    if stored_hash(path) == digest:
+        return False
+    atomic_write(path, content)
+    if changed is not None:
+        changed.append(path)
+    return True
+
+def write_json_if_changed(path: str, data: Dict[str, Any], changed: List[str] = None) -> bool:
+    """写入紧凑 JSON 及预压缩的 .gz 副本；data 的第一个字段应为 content_hash
+
+    gzip 头不含时间戳，相同内容总是得到相同的字节，不会产生多余的提交。
+    """
+    gz_path = path + ".gz"
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    written = write_if_changed(path, content, data["content_hash"], changed)
+    if written:
+        raw = content.encode('utf-8')
+    elif os.path.exists(gz_path):
+        return False
+    else:
+        # 补写缺失的 .gz，内容与已有 JSON 保持一致
+        with open(path, 'rb') as f:
+            raw = f.read()
+    atomic_write(gz_path, gzip.compress(raw, compresslevel=9, mtime=0))
+    if changed is not None:
+        changed.append(gz_path)
+    return written
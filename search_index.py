@@ -0,0 +1,34 @@
+"""
+StellarPulse 全文检索 - 分词
+中日韩文字按相邻两字切分 (bigram)，其余文字按单词切分，统一小写
+"""
+
+import re
+from typing import List, Optional
+
+CJK_RANGES = "぀-ヿ㐀-䶿一-鿿가-힯"
+
+_TOKEN_RE = re.compile(rf"[{CJK_RANGES}]+|[^\W{CJK_RANGES}]+")
+_CJK_RE = re.compile(rf"[{CJK_RANGES}]")
+
+def _split(text: str) -> List[str]:
+    """切分为词元，单个汉字的片段不成词元"""
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if _CJK_RE.match(run):
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+def tokenize(text: str) -> List[str]:
+    """索引用分词，返回去重后的词元"""
+    return list(dict.fromkeys(_split(text)))
+
+def query_tokens(query: str) -> Optional[List[str]]:
+    """查询分词；含无法用索引表达的部分 (如单个汉字) 时返回 None，由调用方回退到扫描"""
+    for run in _TOKEN_RE.findall(query.lower()):
+        if len(run) == 1 and _CJK_RE.match(run):
+            return None
+    tokens = tokenize(query)
+    return tokens or None
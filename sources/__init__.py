@@ -1,14 +1,35 @@
 """数据源模块 - 统一接口"""
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
+
+# http_client 依赖 requests，只在构造数据源时导入：
+# 顶层模块导入 sources.fileio 等工具时不应加载 requests
+if TYPE_CHECKING:
+    from http_client import HttpClient
+
+def get_default_client() -> "HttpClient":
+    """进程共享的 HTTP 客户端"""
+    try:
+        from .http_client import get_default_client as default_client
+    except ImportError:
+        from http_client import get_default_client as default_client
+    return default_client()
 
 class BaseSource(ABC):
     """数据源基类"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], client: "HttpClient" = None, feed_cache=None):
         self.config = config
         self.name = config.get("name", "Unknown")
         self.enabled = config.get("enabled", True)
+        # 单次请求超时(秒)，未配置时各数据源使用自己的默认值
+        self.timeout = config.get("timeout")
+        # 共享HTTP客户端，由调用方传入以便所有数据源复用连接池
+        self.client = client or get_default_client()
+        # 可选的条件请求缓存 (FeedCache)，由调用方在多个数据源间共享
+        self.feed_cache = feed_cache
+        # 最近一次 fetch 失败的原因；fetch 出错时仍返回空列表，调用方据此区分"失败"和"没有内容"
+        self.last_error = None
     
     @abstractmethod
     def fetch(self) -> List[Dict[str, Any]]:
@@ -1,6 +1,16 @@
 """AI摘要生成模块"""
+import os
 import re
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SENTENCE_END_RE = re.compile(r'(?<=[。！？.!?])\s+')
+_DIGIT_RE = re.compile(r'\d+')
+_WORD_RE = re.compile(r'[\u4e00-\u9fa5]{2,}|[a-zA-Z]+')
+
+# analyze_batch 条数达到该值时分片到多进程并行
+PARALLEL_MIN_ITEMS = 2000
 
 class SimpleSummarizer:
     """简单文本摘要器 - 无需外部API"""
@@ -14,18 +24,19 @@ class SimpleSummarizer:
             return text
         
         # 清理文本
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         
         # 提取关键句子 (简单启发式)
-        sentences = re.split(r'(?<=[。！？.!?])\s+', text)
+        sentences = _SENTENCE_END_RE.split(text)
         
         if len(sentences) <= 2:
             return text[:self.max_length] + "..."
         
         # 评分句子重要性
+        title_words = set(title.lower().split()) if title else None
         scored_sentences = []
         for i, sent in enumerate(sentences):
-            score = self._score_sentence(sent, title)
+            score = self._score_sentence(sent, title, title_words)
             scored_sentences.append((score, i, sent))
         
         # 选择高分句子
@@ -40,8 +51,11 @@ class SimpleSummarizer:
         
         return summary
     
-    def _score_sentence(self, sentence: str, title: str) -> float:
-        """给句子打分"""
+    IMPORTANT_WORDS = ['announced', 'launched', 'developed', 'achieved',
+                       '发布', '推出', '实现', '完成', '突破', '首次']
+    
+    def _score_sentence(self, sentence: str, title: str, title_words: set = None) -> float:
+        """给句子打分；title_words 为标题的小写词集合，逐句打分时由调用方预先计算"""
         score = 0.0
         sentence_lower = sentence.lower()
         
@@ -56,19 +70,18 @@ class SimpleSummarizer:
         # 由调用者控制
         
         # 关键词因子
-        important_words = ['announced', 'launched', 'developed', 'achieved', 
-                          '发布', '推出', '实现', '完成', '突破', '首次']
-        for word in important_words:
+        for word in self.IMPORTANT_WORDS:
             if word in sentence_lower:
                 score += 0.5
         
         # 数字因子 (包含数据更可信)
-        if re.search(r'\d+', sentence):
+        if _DIGIT_RE.search(sentence):
             score += 0.3
         
         # 与标题相关度
         if title:
-            title_words = set(title.lower().split())
+            if title_words is None:
+                title_words = set(title.lower().split())
             sent_words = set(sentence_lower.split())
             overlap = len(title_words & sent_words)
             score += overlap * 0.2
@@ -87,7 +100,7 @@ class KeywordExtractor:
     def extract(self, text: str, top_k: int = 5) -> List[str]:
         """提取关键词"""
         # 简单TF统计
-        words = re.findall(r'[\u4e00-\u9fa5]{2,}|[a-zA-Z]+', text)
+        words = _WORD_RE.findall(text)
         word_freq = {}
         
         for word in words:
@@ -104,20 +117,50 @@ class KeywordExtractor:
 class ContentAnalyzer:
     """内容分析器"""
     
+    POSITIVE_WORDS = ['突破', '成功', '首次', '创新', '领先', '打破', 'progress', 'success', 'breakthrough']
+    NEGATIVE_WORDS = ['失败', '问题', '争议', '批评', 'delay', 'failure', 'issue', 'problem']
+    
+    # 在小写文本中匹配：'IPO' 永远不会命中，重复的 'spacex' 计两次，保持原有评分
+    IMPORTANT_ENTITIES = ['openai', 'google', 'microsoft', 'nvidia', 'tesla', 'spacex',
+                          'meta', 'anthropic', 'deepmind', '苹果', '谷歌', '微软', '英伟达',
+                          'spacex', 'nasa', '发布', '收购', '融资', 'IPO', ' billion', '亿']
+    
     def __init__(self):
         self.summarizer = SimpleSummarizer()
         self.keyword_extractor = KeywordExtractor()
+        
+        # 情感词和重要实体合并成一张词表：每个词只查找一次，记录它在各列表中出现的次数
+        lexicon: Dict[str, List[int]] = {}
+        for column, words in enumerate((self.POSITIVE_WORDS, self.NEGATIVE_WORDS, self.IMPORTANT_ENTITIES)):
+            for word in words:
+                lexicon.setdefault(word, [0, 0, 0])[column] += 1
+        self._lexicon = [(word, *counts) for word, counts in lexicon.items()]
     
     def analyze(self, title: str, content: str) -> Dict[str, Any]:
         """分析内容并返回结构化数据"""
         summary = self.summarizer.summarize(content, title)
         keywords = self.keyword_extractor.extract(title + " " + content)
         
+        # 情感倾向与重要性共用同一份小写文本，逐词 `in` 查找由C实现，
+        # 词表只有几十个词时比逐字符的自动机更快
+        text = (title + " " + content).lower()
+        p_count = n_count = entity_count = 0
+        for word, pos, neg, entity in self._lexicon:
+            if word in text:
+                p_count += pos
+                n_count += neg
+                entity_count += entity
+        
         # 情感倾向 (简单规则)
-        sentiment = self._analyze_sentiment(title + " " + content)
+        if p_count > n_count:
+            sentiment = "positive"
+        elif n_count > p_count:
+            sentiment = "negative"
+        else:
+            sentiment = "neutral"
         
-        # 重要性评分
-        importance = self._score_importance(title, content)
+        # 重要性评分，限制在0-5范围
+        importance = min(5.0, max(0, entity_count * 0.5))
         
         return {
             "summary": summary,
@@ -126,33 +169,35 @@ class ContentAnalyzer:
             "importance": importance
         }
     
-    def _analyze_sentiment(self, text: str) -> str:
-        """简单情感分析"""
-        positive = ['突破', '成功', '首次', '创新', '领先', '打破', 'progress', 'success', 'breakthrough']
-        negative = ['失败', '问题', '争议', '批评', 'delay', 'failure', 'issue', 'problem']
-        
-        p_count = sum(1 for w in positive if w in text.lower())
-        n_count = sum(1 for w in negative if w in text.lower())
-        
-        if p_count > n_count:
-            return "positive"
-        elif n_count > p_count:
-            return "negative"
-        return "neutral"
-    
-    def _score_importance(self, title: str, content: str) -> float:
-        """评估重要性"""
-        score = 0.0
-        text = (title + " " + content).lower()
-        
-        # 重要实体提及
-        important_entities = ['openai', 'google', 'microsoft', 'nvidia', 'tesla', 'spacex',
-                             'meta', 'anthropic', 'deepmind', '苹果', '谷歌', '微软', '英伟达',
-                             'spacex', 'nasa', '发布', '收购', '融资', 'IPO', ' billion', '亿']
-        
-        for entity in important_entities:
-            if entity in text:
-                score += 0.5
-        
-        # 限制在0-5范围
-        return min(5.0, max(0, score))
+    def analyze_batch(self, items: List[Tuple[str, str]],
+                      workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """批量分析 (title, content) 列表，结果与逐条调用 analyze 相同且顺序一致
+
+        条数达到 PARALLEL_MIN_ITEMS 时按进程分片并行；workers 为 1 时始终在本进程执行。
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(items) < PARALLEL_MIN_ITEMS:
+            return [self.analyze(title, content) for title, content in items]
+        
+        # 每个进程分到若干片，慢的分片不会拖住整批
+        size = -(-len(items) // (workers * 4))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = []
+                for part in pool.map(_analyze_chunk, chunks):
+                    results.extend(part)
+                return results
+        except OSError:
+            # 无法创建子进程 (如受限环境) 时退回单进程
+            return [self.analyze(title, content) for title, content in items]
+
+
+_worker_analyzer = None
+
+def _analyze_chunk(items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """子进程入口：每个进程只构建一次分析器"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = ContentAnalyzer()
+    return [_worker_analyzer.analyze(title, content) for title, content in items]
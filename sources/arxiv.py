@@ -1,6 +1,5 @@
 """arXiv数据源 - 使用feedparser增强"""
 import feedparser
-import requests
 from datetime import datetime
 from typing import List, Dict, Any
 
@@ -9,8 +8,16 @@ try:
 except ImportError:
     from __init__ import BaseSource
 
+ARXIV_API = "http://export.arxiv.org/api/query"
+
 class ArXivSource(BaseSource):
-    """arXiv论文源"""
+    """arXiv论文源
+
+    配置项:
+      category     arXiv 分类 (默认 cs.AI)
+      max_results  每次抓取条数 (默认10)
+      api_url      API 地址 (默认 export.arxiv.org，基准测试时指向本地服务)
+    """
     
     def fetch(self) -> List[Dict[str, Any]]:
         if not self.is_enabled():
@@ -21,10 +28,17 @@ class ArXivSource(BaseSource):
         
         try:
             # arXiv API
-            url = f"http://export.arxiv.org/api/query?search_query=cat:{category}&sortBy=submittedDate&sortOrder=descending&max_results={max_results}"
+            api_url = self.config.get("api_url", ARXIV_API)
+            url = f"{api_url}?search_query=cat:{category}&sortBy=submittedDate&sortOrder=descending&max_results={max_results}"
+            
+            headers = self.feed_cache.conditional_headers(url) if self.feed_cache else {}
+            response = self.client.get(url, headers=headers, timeout=self.timeout or 20)
             
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
-            response = requests.get(url, headers=headers, timeout=20)
+            # 未变更：复用上次解析结果
+            if response.status_code == 304 and self.feed_cache:
+                cached = self.feed_cache.cached_items(url)
+                if cached is not None:
+                    return cached
             response.raise_for_status()
             
             # 使用feedparser解析Atom feed
@@ -47,7 +61,10 @@ class ArXivSource(BaseSource):
                         "fetched_at": datetime.now().isoformat()
                     })
             
+            if self.feed_cache:
+                self.feed_cache.store(url, response.headers, items)
             return items
         except Exception as e:
             print(f"  [arXiv Error] {category}: {e}")
+            self.last_error = str(e)
             return []
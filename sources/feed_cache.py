@@ -0,0 +1,87 @@
+"""订阅源条件请求缓存 - 按URL保存 ETag / Last-Modified 及解析结果"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+try:
+    from .fileio import atomic_write
+except ImportError:
+    from fileio import atomic_write
+
+class FeedCache:
+    """持久化的 HTTP 验证器缓存
+
+    服务器返回 304 时直接复用上次的解析结果，跳过下载正文和解析。
+    多个采集线程共享同一实例，所有读写都在锁内完成。
+    """
+
+    def __init__(self, cache_file: str = None):
+        if cache_file is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_file = os.path.join(base_dir, "feed_cache.json")
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return {}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """返回该URL的条件请求头"""
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def cached_items(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """304 时取回上次的解析结果，fetched_at 更新为当前时间"""
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry is None:
+            return None
+        now = datetime.now().isoformat()
+        return [dict(item, fetched_at=now) for item in entry.get("items", [])]
+
+    def store(self, url: str, headers, items: List[Dict[str, Any]]):
+        """保存响应的验证器和解析结果；服务器不提供验证器时不缓存"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not last_modified:
+                if self.entries.pop(url, None) is not None:
+                    self._dirty = True
+                return
+            self.entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "items": items,
+            }
+            self._dirty = True
+
+    def save(self):
+        """有变更时写回磁盘"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self.entries, ensure_ascii=False)
+            self._dirty = False
+        try:
+            # 中途崩溃或 CLI 与常驻进程同时写入时，不会留下截断的文件而丢失全部验证器
+            atomic_write(self.cache_file, snapshot)
+        except OSError as e:
+            print(f"  [FeedCache Error] {e}")
@@ -0,0 +1,56 @@
+"""文件写入工具 - 先写同目录的临时文件再替换，读者不会看到写了一半的文件
+
+只依赖标准库：顶层模块 (publish、polling、health) 和各数据源共用。
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Any
+
+# update_json 的读-改-写在进程内串行，共用同一状态文件的数据源不会丢失彼此的更新
+_update_lock = threading.Lock()
+
+def atomic_write(path: str, content):
+    """原子地写入 path；content 可为 str 或 bytes
+
+    每次写入使用 mkstemp 生成的独立临时文件，CLI 和常驻进程同时写同一文件时
+    互不截断，最后一次 os.replace 的内容生效。
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        if isinstance(content, bytes):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+        # mkstemp 创建的文件只有属主可读，替换后应与普通文件一致
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def load_json(path: str) -> Dict[str, Any]:
+    """读取 JSON 文件，不存在或损坏时返回空字典"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def update_json(path: str, key: str, entry: Any, indent: int = None):
+    """重新读取 path 后只替换 key 一项再原子写回
+
+    多个数据源 (各 X 查询、各 Reddit 列表) 共用同一状态文件，各自只更新自己的一项。
+    """
+    with _update_lock:
+        state = load_json(path)
+        state[key] = entry
+        atomic_write(path, json.dumps(state, ensure_ascii=False, indent=indent))
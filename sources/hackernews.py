@@ -1,31 +1,72 @@
 """HackerNews数据源"""
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
-from urllib.request import urlopen, Request
-import ssl
 
 try:
     from . import BaseSource
 except ImportError:
     from __init__ import BaseSource
 
+HN_API = "https://hacker-news.firebaseio.com/v0"
+ALGOLIA_API = "https://hn.algolia.com/api/v1"
+
+# 故事发布后基本不变的字段，缓存后下次运行只需刷新分数和评论数
+IMMUTABLE_FIELDS = ("title", "url", "time", "by")
+
+# Algolia 单次批量查询的最大ID数
+COUNTS_BATCH_SIZE = 100
+
 class HackerNewsSource(BaseSource):
-    """HackerNews热门故事"""
-    
+    """HackerNews热门故事
+
+    配置项:
+      top_n        抓取前N条热门故事 (默认20)
+      max_workers  并发抓取详情的线程数 (默认8，不宜超过共享客户端的连接池大小)
+      cache_file   不变字段缓存文件 (默认项目根目录 hn_cache.json)
+      api_base     HN API 地址 (默认官方 Firebase API，基准测试时指向本地服务)
+      algolia_base Algolia API 地址 (默认 hn.algolia.com)
+    """
+
+    def __init__(self, config, client=None, feed_cache=None):
+        super().__init__(config, client=client, feed_cache=feed_cache)
+        self.api_base = config.get("api_base", HN_API).rstrip("/")
+        self.algolia_base = config.get("algolia_base", ALGOLIA_API).rstrip("/")
+
     def fetch(self) -> List[Dict[str, Any]]:
         if not self.is_enabled():
             return []
-        
+
+        top_n = self.config.get("top_n", 20)
+        max_workers = self.config.get("max_workers", 8)
+
         try:
             # 获取热门故事ID
-            top_ids = self._fetch_json("https://hacker-news.firebaseio.com/v0/topstories.json")
+            top_ids = self._fetch_json(f"{self.api_base}/topstories.json")
             if not top_ids:
                 return []
-            
+            top_ids = top_ids[:top_n]
+
+            cache = self._load_cache()
+
+            # 已缓存的故事只刷新计数，刷新失败的退回完整抓取
+            cached_ids = [i for i in top_ids if str(i) in cache]
+            counts = self._fetch_counts(cached_ids)
+            full_ids = [i for i in top_ids if str(i) not in cache or i not in counts]
+
+            stories = {}
+            for story_id in cached_ids:
+                if story_id in counts:
+                    story = dict(cache[str(story_id)])
+                    story["score"], story["descendants"] = counts[story_id]
+                    stories[story_id] = story
+            stories.update(self._fetch_stories(full_ids, max_workers))
+
             items = []
-            for story_id in top_ids[:20]:  # 前20条
-                story = self._fetch_json(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json")
+            for story_id in top_ids:
+                story = stories.get(story_id)
                 if story and story.get('title'):
                     items.append({
                         "title": story['title'],
@@ -35,16 +76,67 @@ class HackerNewsSource(BaseSource):
                         "pub_date": datetime.fromtimestamp(story.get('time', 0)).isoformat() if story.get('time') else '',
                         "fetched_at": datetime.now().isoformat()
                     })
+
+            self._save_cache({
+                str(i): {k: stories[i][k] for k in IMMUTABLE_FIELDS if k in stories[i]}
+                for i in top_ids if stories.get(i, {}).get('title')
+            })
             return items
         except Exception as e:
             print(f"  [HN Error] {e}")
+            self.last_error = str(e)
             return []
-    
+
+    def _fetch_stories(self, story_ids: List[int], max_workers: int) -> Dict[int, Dict]:
+        """并发获取故事详情，单条失败不影响其他条目"""
+        if not story_ids:
+            return {}
+
+        def fetch_one(story_id):
+            try:
+                return story_id, self._fetch_json(f"{self.api_base}/item/{story_id}.json")
+            except Exception:
+                return story_id, None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(story_ids)))) as pool:
+            return {sid: story for sid, story in pool.map(fetch_one, story_ids) if story}
+
+    def _fetch_counts(self, story_ids: List[int]) -> Dict[int, tuple]:
+        """通过 Algolia 批量获取 (分数, 评论数)"""
+        counts = {}
+        for start in range(0, len(story_ids), COUNTS_BATCH_SIZE):
+            batch = story_ids[start:start + COUNTS_BATCH_SIZE]
+            tags = "(" + ",".join(f"story_{i}" for i in batch) + ")"
+            try:
+                data = self._fetch_json(
+                    f"{self.algolia_base}/search?tags={tags}&hitsPerPage={len(batch)}"
+                )
+            except Exception:
+                continue
+            for hit in data.get("hits", []):
+                try:
+                    counts[int(hit["objectID"])] = (hit.get("points") or 0, hit.get("num_comments") or 0)
+                except (KeyError, ValueError):
+                    continue
+        return counts
+
+    def _cache_path(self) -> str:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return self.config.get("cache_file") or os.path.join(base_dir, "hn_cache.json")
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        try:
+            with open(self._cache_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_cache(self, cache: Dict[str, Dict]):
+        try:
+            with open(self._cache_path(), 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"  [HN Error] 缓存写入失败: {e}")
+
     def _fetch_json(self, url: str) -> Any:
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
-        req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urlopen(req, timeout=15, context=ctx) as resp:
-            return json.loads(resp.read().decode('utf-8'))
+        return self.client.get_json(url, timeout=self.timeout or 15)
@@ -0,0 +1,103 @@
+"""HTML 转纯文本 - 单遍扫描剥离标签
+
+输出与 `BeautifulSoup(html, "html.parser").get_text()` 再合并空白一致：
+标签、注释、<script>/<style> 内容被丢弃，实体被解码，连续空白合并为一个空格。
+不构建文档树；传入 limit 时，文本一旦超过 limit 个字符就停止扫描。
+遇到无法可靠切分的输入 (未闭合的标签、注释或 <script>) 时退回 BeautifulSoup。
+不合法的实体 (如缺少分号的 &amp) 按 html.unescape 解码，与 BeautifulSoup 可能略有差异。
+"""
+import re
+from html import unescape
+
+# 标签：属性值可含 '>'，按引号整体跳过
+_TAG = re.compile(r'''<(/?)([A-Za-z][A-Za-z0-9:_-]*)(?:[^>"']|"[^"]*"|'[^']*')*>''')
+_COMMENT = re.compile(r'<!--.*?-->', re.S)
+_CDATA = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.S)
+_DECL = re.compile(r'<[!?][^>]*>')
+_RAW_END = {
+    'script': re.compile(r'</script\s*>', re.I),
+    'style': re.compile(r'</style\s*>', re.I),
+}
+_WS = re.compile(r'\s+')
+# 文本片段中出现这些序列说明有未闭合的标签/注释/声明
+_UNCLOSED = re.compile(r'<[A-Za-z/!?]')
+
+class MalformedHTML(ValueError):
+    """快速路径无法处理的输入"""
+
+
+def html_to_text(markup: str, limit: int = None) -> str:
+    """提取纯文本并合并空白
+
+    传入 limit 时结果可能被截断，但只要原文长于 limit，返回值至少有 limit+1 个字符，
+    调用方仍可据此判断是否需要加省略号。
+    """
+    if '<' not in markup and '&' not in markup:
+        return _WS.sub(' ', markup).strip()
+    try:
+        return _strip_tags(markup, limit)
+    except MalformedHTML:
+        return _soup_text(markup)
+
+
+def _strip_tags(markup: str, limit: int = None) -> str:
+    out = []
+    length = 0
+    last_space = True      # 开头的空白最终会被 strip，视同前面已有空格
+    pos = 0
+    end = len(markup)
+
+    while pos < end:
+        text, cdata, pos = _next_token(markup, pos)
+        if text:
+            if _UNCLOSED.search(text):
+                raise MalformedHTML(text[:40])
+            if '&' in text:
+                text = unescape(text)
+        for piece in (text, cdata):
+            if not piece:
+                continue
+            chunk = _WS.sub(' ', piece)
+            if last_space and chunk.startswith(' '):
+                chunk = chunk[1:]
+            if chunk:
+                out.append(chunk)
+                length += len(chunk)
+                last_space = chunk.endswith(' ')
+        # 末尾至多一个空格会被 strip
+        if limit is not None and length > limit + 1:
+            break
+
+    return ''.join(out).strip()
+
+
+def _next_token(markup: str, pos: int) -> tuple:
+    """从 pos 开始取一段文本和其后的一个标签，返回 (文本, CDATA 内容, 标签之后的位置)"""
+    lt = markup.find('<', pos)
+    while lt >= 0:
+        if markup.startswith('<!--', lt):
+            match = _COMMENT.match(markup, lt)
+        elif markup.startswith('<![CDATA[', lt):
+            # CDATA 段原样作为文本 (不解码实体)
+            match = _CDATA.match(markup, lt)
+            if match is not None:
+                return markup[pos:lt], match.group(1), match.end()
+        elif markup.startswith('<!', lt) or markup.startswith('<?', lt):
+            match = _DECL.match(markup, lt)
+        else:
+            match = _TAG.match(markup, lt)
+            if match and not match.group(1) and match.group(2).lower() in _RAW_END:
+                # <script>/<style> 的内容不是文本，整段跳过
+                match = _RAW_END[match.group(2).lower()].search(markup, match.end())
+                if match is None:
+                    raise MalformedHTML('unclosed script/style')
+        if match is not None:
+            return markup[pos:lt], None, match.end()
+        # 不是标签的 '<' (如 "a < b") 按文本处理；未闭合的标签由调用方检查文本时发现
+        lt = markup.find('<', lt + 1)
+    return markup[pos:], None, len(markup)
+
+
+def _soup_text(markup: str) -> str:
+    from bs4 import BeautifulSoup
+    return _WS.sub(' ', BeautifulSoup(markup, "html.parser").get_text()).strip()
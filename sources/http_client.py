@@ -0,0 +1,131 @@
+"""共享HTTP客户端 - 连接池、压缩协商、重试与耗时统计"""
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# 可重试的HTTP状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class HttpClient:
+    """所有数据源共享的HTTP客户端
+
+    - 每个主机一个 keep-alive 连接池，跨数据源、跨轮次复用TLS连接
+    - 统一 User-Agent 和 gzip/deflate 压缩协商
+    - 连接错误、超时及 429/5xx 按带抖动的指数退避重试
+    - 按主机记录请求数、重试、错误和耗时
+    """
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, pool_size: int = 16,
+                 max_hosts: int = 64, retries: int = 2, backoff: float = 0.5,
+                 verify_ssl: bool = True):
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept-Encoding": "gzip, deflate",
+        })
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "HttpClient":
+        """根据 config.json 的 settings.http 创建客户端"""
+        http_cfg = config.get("settings", {}).get("http", {})
+        return cls(
+            user_agent=http_cfg.get("user_agent", DEFAULT_USER_AGENT),
+            pool_size=http_cfg.get("pool_size", 16),
+            retries=http_cfg.get("retries", 2),
+            backoff=http_cfg.get("backoff", 0.5),
+            verify_ssl=http_cfg.get("verify_ssl", True),
+        )
+
+    def get(self, url: str, headers: Dict[str, str] = None, params: Dict[str, Any] = None,
+            timeout: float = 15) -> requests.Response:
+        """发送GET请求；返回最后一次的响应，重试耗尽后抛出最后一次异常"""
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(host, time.monotonic() - start, error=True)
+                if attempt >= self.retries:
+                    raise
+            else:
+                self._record(host, time.monotonic() - start, nbytes=len(response.content),
+                             error=response.status_code >= 400)
+                if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                    return response
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit() and int(retry_after) <= 30:
+                    self._retry_sleep(host, attempt, int(retry_after))
+                    attempt += 1
+                    continue
+            self._retry_sleep(host, attempt)
+            attempt += 1
+
+    def get_json(self, url: str, headers: Dict[str, str] = None, params: Dict[str, Any] = None,
+                 timeout: float = 15) -> Any:
+        """GET并解析JSON，非2xx状态抛出异常"""
+        response = self.get(url, headers=headers, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _retry_sleep(self, host: str, attempt: int, delay: Optional[float] = None):
+        if delay is None:
+            delay = random.uniform(0, self.backoff * (2 ** attempt))
+        with self._lock:
+            self._host_stats(host)["retries"] += 1
+        time.sleep(delay)
+
+    def _host_stats(self, host: str) -> Dict[str, float]:
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = {"requests": 0, "errors": 0, "retries": 0,
+                                         "bytes": 0, "seconds": 0.0, "max_seconds": 0.0}
+        return stats
+
+    def _record(self, host: str, seconds: float, nbytes: int = 0, error: bool = False):
+        with self._lock:
+            stats = self._host_stats(host)
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["bytes"] += nbytes
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def stats(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """按主机返回请求统计的副本"""
+        with self._lock:
+            snapshot = {host: dict(s) for host, s in self._stats.items()}
+            if reset:
+                self._stats.clear()
+        return snapshot
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+def get_default_client() -> HttpClient:
+    """未显式传入客户端时使用的进程级默认实例"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
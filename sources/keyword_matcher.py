@@ -0,0 +1,111 @@
+"""多关键词匹配 - Aho-Corasick 自动机与分类器"""
+from collections import deque
+from typing import List, Dict, Tuple, Iterable, Set
+
+class KeywordAutomaton:
+    """Aho-Corasick 多模式子串匹配
+
+    所有模式编译进同一个自动机，对文本只扫描一遍即可找出出现过的全部模式，
+    结果与逐个 `pattern in text` 完全一致（区分大小写，调用方负责统一大小写）。
+    空模式无法放入自动机，视为在任何文本中都出现。
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self.always = [i for i, p in enumerate(self.patterns) if p == ""]
+
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].append(index)
+
+        # 按层序计算失败转移，并把 goto + fail 展开成确定的转移表
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+            row = dict(delta[fail[state]])
+            row.update(goto[state])
+            delta[state] = row
+
+        # 与根节点相同的转移不必存储，匹配时回落到根节点的转移
+        root = delta[0]
+        self._root = root
+        self._rows = [{ch: nxt for ch, nxt in row.items() if root.get(ch) != nxt}
+                      for row in delta]
+        self._rows[0] = {}
+        self._out = [tuple(o) for o in out]
+
+    def search(self, text: str) -> Set[int]:
+        """返回在文本中出现过的模式下标集合"""
+        found = set(self.always)
+        rows, out, root_get = self._rows, self._out, self._root.get
+        state = 0
+        for ch in text:
+            state = rows[state].get(ch) or root_get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class KeywordClassifier:
+    """按 config["keywords"] 分类，与逐关键词 `kw.lower() in text` 的旧实现结果一致"""
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.keywords = keywords
+        self.categories = list(keywords)
+
+        patterns: Dict[str, int] = {}
+        self._owners: List[List[str]] = []   # 模式 -> 所属分类
+        self._terms: List[List[str]] = []    # 模式 -> 原始关键词写法
+        for cat, kws in keywords.items():
+            for kw in kws:
+                pattern = kw.lower()
+                index = patterns.get(pattern)
+                if index is None:
+                    index = patterns[pattern] = len(self._owners)
+                    self._owners.append([])
+                    self._terms.append([])
+                if cat not in self._owners[index]:
+                    self._owners[index].append(cat)
+                if kw not in self._terms[index]:
+                    self._terms[index].append(kw)
+
+        self._term_order = {kw: i for i, kw in enumerate(kw for kws in keywords.values() for kw in kws)}
+        self.automaton = KeywordAutomaton(patterns)
+
+    def match(self, title: str, summary: str) -> Tuple[List[str], List[str]]:
+        """返回 (命中的分类, 命中的关键词)；均按配置中的顺序排列"""
+        text = (title + " " + summary).lower()
+        hits = self.automaton.search(text)
+        if not hits:
+            return [], []
+
+        cats = set()
+        terms = []
+        for index in hits:
+            cats.update(self._owners[index])
+            terms.extend(self._terms[index])
+        terms.sort(key=self._term_order.__getitem__)
+        return [c for c in self.categories if c in cats], terms
+
+    def classify(self, title: str, summary: str) -> List[str]:
+        """返回命中的分类，无命中时返回 ["other"]"""
+        categories, _ = self.match(title, summary)
+        return categories if categories else ["other"]
@@ -1,56 +1,159 @@
 """Reddit数据源"""
-import json
-import urllib.request
-import ssl
+import os
 from datetime import datetime
 from typing import List, Dict, Any
 
 try:
     from . import BaseSource
+    from .fileio import load_json, update_json
 except ImportError:
     from __init__ import BaseSource
+    from fileio import load_json, update_json
+
+REDDIT_BASE = "https://www.reddit.com"
+
+# 每个列表的游标和已知帖子，多个 Reddit 数据源共用同一文件
+REDDIT_STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "reddit_state.json")
+
+# 列表单页和 /by_id/ 单次请求的最大条数
+PAGE_LIMIT = 100
+
+# 已知帖子保存的字段
+POST_FIELDS = ("name", "title", "permalink", "subreddit", "created_utc", "score", "num_comments")
 
 class RedditSource(BaseSource):
-    """Reddit子版块数据源"""
-    
+    """Reddit子版块数据源
+
+    多个子版块合并为一次 r/a+b+c 请求。
+    new 模式记住最新帖子的 fullname，下次用 before 只取更新的帖子，新帖不受 limit 限制全部返回；
+    之前见过的帖子通过 /by_id/ 批量刷新分数和评论数，不再重新下载列表。
+    每条都带 engagement (分数、评论数)，已入库的帖子由 filter_new_items 据此更新库中的计数。
+    hot 模式按 after 翻页取当前热门，不保存状态。
+
+    配置项:
+      subreddits  子版块列表 (也可用单个 subreddit，默认 technology)
+      mode        new 或 hot (默认 hot)
+      limit       返回的帖子数 (默认15)；new 模式下是首次采集的条数和持续刷新的已知帖子数
+      max_pages   每次采集最多请求的列表页数 (默认3)
+      state_file  游标和已知帖子状态文件 (默认项目根目录 reddit_state.json)
+      base_url    API 地址 (默认 https://www.reddit.com，基准测试时指向本地服务)
+    """
+
     def fetch(self) -> List[Dict[str, Any]]:
         if not self.is_enabled():
             return []
-        
-        subreddit = self.config.get("subreddit", "technology")
-        
+
+        subreddits = self.config.get("subreddits") or [self.config.get("subreddit", "technology")]
+        mode = self.config.get("mode", "hot")
+        listing = f"r/{'+'.join(subreddits)}"
+
         try:
-            # Reddit JSON API (无需认证)
-            url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=15"
-            
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            req = urllib.request.Request(
-                url, 
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                }
-            )
-            
-            with urllib.request.urlopen(req, timeout=15, context=ctx) as resp:
-                data = json.loads(resp.read().decode('utf-8'))
-            
+            if mode == "new":
+                posts = self._fetch_new(listing)
+            elif mode == "hot":
+                posts = self._fetch_hot(listing)
+            else:
+                raise ValueError(f"未知的 mode: {mode}")
+
             items = []
-            for post in data.get('data', {}).get('children', []):
-                p = post.get('data', {})
+            for p in posts:
                 if p.get('title'):
+                    subreddit = p.get('subreddit') or subreddits[0]
                     items.append({
                         "title": p['title'][:200],
                         "link": f"https://reddit.com{p.get('permalink', '')}",
                         "summary": f"👍 {p.get('score', 0)} | 💬 {p.get('num_comments', 0)} | r/{subreddit}",
                         "source": f"Reddit-r/{subreddit}",
                         "pub_date": datetime.fromtimestamp(p.get('created_utc', 0)).isoformat() if p.get('created_utc') else '',
-                        "fetched_at": datetime.now().isoformat()
+                        "fetched_at": datetime.now().isoformat(),
+                        "engagement": {"score": p.get('score', 0), "comments": p.get('num_comments', 0)}
                     })
-            
+
             return items
         except Exception as e:
-            print(f"  [Reddit Error] r/{subreddit}: {e}")
+            print(f"  [Reddit Error] {listing}/{mode}: {e}")
+            self.last_error = str(e)
             return []
+
+    def _fetch_hot(self, listing: str) -> List[Dict]:
+        limit = self.config.get("limit", 15)
+        posts, after = [], None
+        for _ in range(max(1, self.config.get("max_pages", 3))):
+            page, after = self._listing(f"{listing}/hot", after=after,
+                                        limit=min(PAGE_LIMIT, limit - len(posts)))
+            posts.extend(page)
+            if not after or len(posts) >= limit:
+                break
+        return posts[:limit]
+
+    def _fetch_new(self, listing: str) -> List[Dict]:
+        """刷新已知帖子，再从其中最新的一条向后取新帖
+
+        返回全部新帖和刷新后的已知帖子；状态中只跟踪最新的 limit 条，其中最新一条是下次的 before 锚点。
+        """
+        limit = self.config.get("limit", 15)
+        max_pages = max(1, self.config.get("max_pages", 3))
+        key = f"{listing}/new"
+        known = self._refresh(self._load_state().get(key, {}).get("posts", []))
+
+        fresh = []
+        if known:
+            # before=<fullname> 返回紧挨着该帖之后发布的帖子；一页满了就继续向更新的方向翻
+            before = known[0]["name"]
+            for _ in range(max_pages):
+                page, _ = self._listing(f"{listing}/new", before=before, limit=PAGE_LIMIT)
+                fresh = page + fresh
+                if len(page) < PAGE_LIMIT:
+                    break
+                before = page[0]["name"]
+        else:
+            after = None
+            for _ in range(max_pages):
+                page, after = self._listing(f"{listing}/new", after=after,
+                                            limit=min(PAGE_LIMIT, limit - len(fresh)))
+                fresh.extend(page)
+                if not after or len(fresh) >= limit:
+                    break
+
+        seen = {p["name"] for p in fresh}
+        posts = fresh + [p for p in known if p["name"] not in seen]
+        posts.sort(key=lambda p: p.get("created_utc", 0), reverse=True)
+        posts = [{k: p.get(k) for k in POST_FIELDS} for p in posts]
+        self._save_state(key, {"posts": posts[:limit], "last_fetch": datetime.now().isoformat()})
+        return posts
+
+    def _refresh(self, posts: List[Dict]) -> List[Dict]:
+        """通过 /by_id/ 批量取回已知帖子的最新计数；已删除或移除的帖子不再跟踪 (也不能再作为游标)"""
+        current = {}
+        for start in range(0, len(posts), PAGE_LIMIT):
+            names = ",".join(p["name"] for p in posts[start:start + PAGE_LIMIT])
+            page, _ = self._listing(f"by_id/{names}")
+            current.update((p["name"], p) for p in page if not p.get("removed_by_category"))
+        refreshed = [dict(p, **{k: current[p["name"]].get(k, p.get(k)) for k in ("score", "num_comments")})
+                     for p in posts if p["name"] in current]
+        refreshed.sort(key=lambda p: p.get("created_utc", 0), reverse=True)
+        return refreshed
+
+    def _listing(self, path: str, **params) -> tuple:
+        """请求一个列表，返回 (帖子, after)"""
+        base_url = self.config.get("base_url", REDDIT_BASE).rstrip("/")
+        params = {k: v for k, v in params.items() if v is not None}
+        data = self.client.get_json(f"{base_url}/{path}.json", params=params or None,
+                                    timeout=self.timeout or 15)
+        listing = data.get('data', {})
+        posts = [child.get('data', {}) for child in listing.get('children', [])]
+        return [p for p in posts if p.get('name')], listing.get('after')
+
+    def _state_path(self) -> str:
+        return self.config.get("state_file") or REDDIT_STATE_FILE
+
+    def _load_state(self) -> Dict[str, Dict]:
+        return load_json(self._state_path())
+
+    def _save_state(self, key: str, entry: Dict):
+        """只更新本列表一项，不覆盖同时运行的其他 Reddit 数据源"""
+        try:
+            update_json(self._state_path(), key, entry)
+        except OSError as e:
+            print(f"  [Reddit Error] 状态写入失败: {e}")
@@ -1,15 +1,17 @@
 """RSS数据源 - 使用feedparser增强鲁棒性"""
 import feedparser
-import requests
 from datetime import datetime
 from typing import List, Dict, Any
-import re
-from bs4 import BeautifulSoup
 
 try:
     from . import BaseSource
+    from .html_text import html_to_text
 except ImportError:
     from __init__ import BaseSource
+    from html_text import html_to_text
+
+# 摘要保留的字符数
+SUMMARY_LENGTH = 300
 
 class RSSSource(BaseSource):
     """使用feedparser的RSS源"""
@@ -23,9 +25,15 @@ class RSSSource(BaseSource):
             return []
         
         try:
-            # 使用requests获取内容，带上User-Agent
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
-            response = requests.get(url, headers=headers, timeout=15)
+            # 通过共享客户端获取内容
+            headers = self.feed_cache.conditional_headers(url) if self.feed_cache else {}
+            response = self.client.get(url, headers=headers, timeout=self.timeout or 15)
+            
+            # 未变更：复用上次解析结果，跳过feedparser和HTML清理
+            if response.status_code == 304 and self.feed_cache:
+                cached = self.feed_cache.cached_items(url)
+                if cached is not None:
+                    return cached
             response.raise_for_status()
             
             # 使用feedparser解析
@@ -45,10 +53,9 @@ class RSSSource(BaseSource):
                 elif "content" in entry:
                     summary = entry.content[0].value
                 
-                # 清理HTML
+                # 清理HTML，超出摘要长度的部分不再扫描
                 if summary:
-                    summary = BeautifulSoup(summary, "html.parser").get_text()
-                    summary = re.sub(r'\s+', ' ', summary).strip()
+                    summary = html_to_text(summary, limit=SUMMARY_LENGTH)
                 
                 pub_date = entry.get("published", "")
                 
@@ -56,14 +63,17 @@ class RSSSource(BaseSource):
                     items.append({
                         "title": title[:200],
                         "link": link,
-                        "summary": summary[:300] + "..." if len(summary) > 300 else summary,
+                        "summary": summary[:SUMMARY_LENGTH] + "..." if len(summary) > SUMMARY_LENGTH else summary,
                         "source": self.name,
                         "pub_date": pub_date,
                         "fetched_at": datetime.now().isoformat()
                     })
             
+            if self.feed_cache:
+                self.feed_cache.store(url, response.headers, items)
             return items
             
         except Exception as e:
             print(f"  [RSS Error] {self.name}: {e}")
+            self.last_error = str(e)
             return []
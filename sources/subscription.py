@@ -5,6 +5,60 @@ import re
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+try:
+    from .keyword_matcher import KeywordAutomaton
+except ImportError:
+    from keyword_matcher import KeywordAutomaton
+
+# 通配符转换后仍含这些字符的订阅按正则匹配，其余按普通子串匹配
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+
+def wildcard_pattern(keyword: str) -> str:
+    """订阅关键词转正则：支持简单通配符 * ?"""
+    return keyword.lower().replace("*", ".*").replace("?", ".")
+
+
+class SubscriptionMatcher:
+    """把全部订阅编译成一个匹配器
+
+    普通关键词放进同一个 Aho-Corasick 自动机，一次扫描完成；
+    含通配符或正则字符的关键词各自预编译一次。匹配语义与逐条
+    re.search(wildcard_pattern(keyword), text) 相同。
+    """
+
+    def __init__(self, subscriptions: List[Dict]):
+        literals: Dict[str, int] = {}
+        self._literal_subs: List[List[int]] = []
+        self._regexes: List[tuple] = []
+
+        for index, sub in enumerate(subscriptions):
+            pattern = wildcard_pattern(sub["keyword"])
+            if REGEX_CHARS.isdisjoint(pattern):
+                slot = literals.get(pattern)
+                if slot is None:
+                    slot = literals[pattern] = len(self._literal_subs)
+                    self._literal_subs.append([])
+                self._literal_subs[slot].append(index)
+            else:
+                try:
+                    self._regexes.append((re.compile(pattern), index))
+                except re.error as e:
+                    print(f"  [订阅] 忽略无效关键词 {sub['keyword']!r}: {e}")
+
+        self.automaton = KeywordAutomaton(literals)
+
+    def match(self, text: str) -> List[int]:
+        """返回命中的订阅下标，按订阅顺序排列"""
+        hits = []
+        for slot in self.automaton.search(text):
+            hits.extend(self._literal_subs[slot])
+        for regex, index in self._regexes:
+            if regex.search(text):
+                hits.append(index)
+        hits.sort()
+        return hits
+
+
 class SubscriptionManager:
     """管理用户关键词订阅"""
     
@@ -15,9 +69,19 @@ class SubscriptionManager:
             self.data_file = os.path.join(base_dir, "keywords.json")
         else:
             self.data_file = data_file
+        self._stamp = None
         self.data = self._load()
+        self._matcher = None
+    
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
     
     def _load(self) -> Dict:
+        self._stamp = self._file_stamp()
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
@@ -29,6 +93,13 @@ class SubscriptionManager:
     def _save(self):
         with open(self.data_file, 'w', encoding='utf-8') as f:
             json.dump(self.data, f, ensure_ascii=False, indent=2)
+        self._stamp = self._file_stamp()
+    
+    def _reload_if_changed(self):
+        """订阅文件被其他进程 (CLI、Web) 修改后重新读取并重新编译；未修改时沿用已编译的匹配器"""
+        if self._file_stamp() != self._stamp:
+            self.data = self._load()
+            self._matcher = None
     
     def add_subscription(self, keyword: str, categories: List[str] = None, 
                         notify: bool = True) -> Dict:
@@ -43,6 +114,7 @@ class SubscriptionManager:
         }
         
         self.data["subscriptions"].append(subscription)
+        self._matcher = None
         self._save()
         return subscription
     
@@ -53,6 +125,7 @@ class SubscriptionManager:
             s for s in self.data["subscriptions"] if s["id"] != sub_id
         ]
         if len(self.data["subscriptions"]) < original_len:
+            self._matcher = None
             self._save()
             return True
         return False
@@ -61,41 +134,54 @@ class SubscriptionManager:
         """列出所有订阅"""
         return self.data.get("subscriptions", [])
     
+    def _get_matcher(self) -> SubscriptionMatcher:
+        """订阅列表变化后重新编译"""
+        if self._matcher is None:
+            self._matcher = SubscriptionMatcher(self.data.get("subscriptions", []))
+        return self._matcher
+    
     def check_matches(self, items: List[Dict]) -> List[Dict]:
-        """检查内容是否匹配订阅"""
+        """检查内容是否匹配订阅
+
+        整批资讯匹配完成后统一更新计数和告警，有命中时写一次文件。
+        同一实例可长期复用 (如常驻进程)：订阅文件未变化时不重新读取和编译。
+        """
+        self._reload_if_changed()
         matches = []
         subscriptions = self.data.get("subscriptions", [])
+        if not subscriptions or not items:
+            return matches
+        
+        matcher = self._get_matcher()
+        matched_at = datetime.now().isoformat()
         
         for item in items:
             text = f"{item.get('title', '')} {item.get('summary', '')}".lower()
-            
-            for sub in subscriptions:
-                keyword = sub["keyword"].lower()
-                
-                # 支持简单通配符 * ?
-                pattern = keyword.replace("*", ".*").replace("?", ".")
-                if re.search(pattern, text):
-                    match_info = {
-                        "item": item,
-                        "subscription": sub,
-                        "matched_at": datetime.now().isoformat()
-                    }
-                    matches.append(match_info)
-                    
-                    # 更新匹配计数
-                    sub["match_count"] = sub.get("match_count", 0) + 1
-                    
-                    # 记录告警
-                    self.data["alerts"].append({
-                        "subscription_id": sub["id"],
-                        "keyword": sub["keyword"],
-                        "title": item["title"],
-                        "link": item["link"],
-                        "time": datetime.now().isoformat()
-                    })
+            for index in matcher.match(text):
+                matches.append({
+                    "item": item,
+                    "subscription": subscriptions[index],
+                    "matched_at": matched_at
+                })
+        
+        if not matches:
+            return matches
+        
+        # 批量更新匹配计数和告警
+        alerts = self.data.setdefault("alerts", [])
+        for match in matches:
+            sub = match["subscription"]
+            sub["match_count"] = sub.get("match_count", 0) + 1
+            alerts.append({
+                "subscription_id": sub["id"],
+                "keyword": sub["keyword"],
+                "title": match["item"]["title"],
+                "link": match["item"]["link"],
+                "time": matched_at
+            })
         
         # 限制告警历史
-        self.data["alerts"] = self.data["alerts"][-100:]
+        self.data["alerts"] = alerts[-100:]
         self._save()
         
         return matches
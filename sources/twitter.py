@@ -2,88 +2,197 @@
 X (Twitter) 数据源
 需要 Bearer Token (来自 X Developer Portal)
 """
-import json
-import urllib.request
-import ssl
+import os
+import time
+import urllib.parse
 from datetime import datetime
 from typing import List, Dict, Any
 
-from sources import BaseSource
+try:
+    from . import BaseSource
+    from .fileio import load_json, update_json
+except ImportError:
+    from __init__ import BaseSource
+    from fileio import load_json, update_json
+
+TWITTER_API = "https://api.twitter.com/2"
+
+# 每个查询的游标和限流状态，多个 X 数据源共用同一文件
+TWITTER_STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "twitter_state.json")
 
 class TwitterSource(BaseSource):
-    """X/Twitter API v2 数据源"""
-    
-    BASE_URL = "https://api.twitter.com/2"
-    
+    """X/Twitter API v2 数据源 (search/recent)
+
+    按查询保存已见过的最新推文ID，下次只请求更新的推文 (since_id)；
+    结果超过一页时按 next_token 翻页，最多 max_pages 页。
+    因页数预算、额度用完或 429 提前停止翻页时，未取到的区间 (旧 since_id 到本次最早的推文)
+    记为 backfill，下次先按 since_id/until_id 补抓完这段，再继续取更新的推文，不会留下空档。
+    根据响应头 x-rate-limit-remaining / x-rate-limit-reset 控制请求：
+    额度用完时直到窗口重置前不再请求，也不计为失败。
+
+    配置项:
+      query        搜索语句
+      max_results  每页条数 (10-100，默认10)
+      max_pages    每次采集最多请求的页数 (默认3，补抓与新推文共用)
+      state_file   游标和限流状态文件 (默认项目根目录 twitter_state.json)
+      api_base     API 地址 (默认官方 v2 API，测试时指向 benchmarks/feed_server.py)
+    """
+
     def fetch(self) -> List[Dict[str, Any]]:
         if not self.is_enabled():
             return []
         
         bearer_token = self.config.get("bearer_token")
         query = self.config.get("query", "AI OR \"artificial intelligence\" -is:retweet")
-        max_results = self.config.get("max_results", 10)
         
         if not bearer_token:
             print(f"  [X/Twitter Error] {self.name}: Missing bearer_token")
             return []
         
+        state = self._load_state().get(query, {})
+        wait = state.get("reset_at", 0) - time.time()
+        if state.get("remaining") == 0 and wait > 0:
+            print(f"  [X/Twitter] {self.name}: 请求额度已用完，{wait:.0f}s 后重置")
+            return []
+        
+        pages = max(1, self.config.get("max_pages", 3))
+        tweets, users = [], {}
         try:
-            # 搜索最近推文
-            url = f"{self.BASE_URL}/tweets/search/recent"
-            params = {
-                "query": query,
-                "max_results": min(max_results, 100),
-                "tweet.fields": "created_at,public_metrics,author_id",
-                "expansions": "author_id",
-                "user.fields": "username,name"
-            }
-            
-            # 构建查询字符串
-            query_string = "&".join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
-            full_url = f"{url}?{query_string}"
-            
-            # 请求头
-            headers = {
-                "Authorization": f"Bearer {bearer_token}",
-                "User-Agent": "StellarPulse/1.0"
-            }
-            
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            req = urllib.request.Request(full_url, headers=headers)
-            with urllib.request.urlopen(req, timeout=20, context=ctx) as resp:
-                data = json.loads(resp.read().decode('utf-8'))
-            
-            # 解析推文
-            items = []
-            tweets = data.get('data', [])
-            users = {u['id']: u for u in data.get('includes', {}).get('users', [])}
-            
-            for tweet in tweets:
-                author_id = tweet.get('author_id')
-                author = users.get(author_id, {})
-                username = author.get('username', 'unknown')
-                display_name = author.get('name', username)
-                
-                metrics = tweet.get('public_metrics', {})
-                
-                items.append({
-                    "title": tweet.get('text', '')[:100] + "..." if len(tweet.get('text', '')) > 100 else tweet.get('text', ''),
-                    "link": f"https://twitter.com/{username}/status/{tweet.get('id')}",
-                    "summary": f"❤️ {metrics.get('like_count', 0)} | 🔁 {metrics.get('retweet_count', 0)} | 💬 {metrics.get('reply_count', 0)} | by @{username}",
-                    "source": f"X/@{username}",
-                    "pub_date": tweet.get('created_at', ''),
-                    "fetched_at": datetime.now().isoformat(),
-                    "raw_text": tweet.get('text', '')
-                })
-            
-            return items
+            # 先补抓上次没取完的区间；补完之前不取更新的推文，保证最多只有一段空档
+            backfill = state.get("backfill")
+            if backfill:
+                result = self._search(bearer_token, query, backfill["since_id"], pages,
+                                      until_id=backfill["until_id"])
+                tweets, users, pages = result["tweets"], result["users"], pages - result["pages"]
+                state.update(result["rate"])
+                if result["complete"]:
+                    del state["backfill"]
+                elif result["oldest_id"]:
+                    backfill["until_id"] = result["oldest_id"]
             
+            if "backfill" not in state and pages > 0 and state.get("remaining") != 0:
+                since_id = state.get("since_id")
+                result = self._search(bearer_token, query, since_id, pages)
+                tweets.extend(result["tweets"])
+                users.update(result["users"])
+                state.update(result["rate"])
+                if result["newest_id"]:
+                    # 首次采集 (没有 since_id) 不补抓更早的历史
+                    if not result["complete"] and result["since_id"]:
+                        state["backfill"] = {"since_id": result["since_id"], "until_id": result["oldest_id"]}
+                    state["since_id"] = result["newest_id"]
         except Exception as e:
             print(f"  [X/Twitter Error] {self.name}: {e}")
+            self.last_error = str(e)
             return []
+        
+        state["last_fetch"] = datetime.now().isoformat()
+        self._save_state(query, state)
+        return [self._to_item(tweet, users) for tweet in tweets]
+
+    def _search(self, bearer_token: str, query: str, since_id: str, max_pages: int,
+                until_id: str = None) -> Dict[str, Any]:
+        """在 (since_id, until_id) 区间内从新到旧翻页，最多 max_pages 页
+
+        返回 tweets、users、newest_id、oldest_id、实际请求的页数 pages、
+        区间是否已取完 complete、实际使用的 since_id 和限流状态 rate。
+        """
+        params = {
+            "query": query,
+            "max_results": max(10, min(self.config.get("max_results", 10), 100)),
+            "tweet.fields": "created_at,public_metrics,author_id",
+            "expansions": "author_id",
+            "user.fields": "username,name"
+        }
+        if since_id:
+            params["since_id"] = since_id
+        if until_id:
+            params["until_id"] = until_id
+        
+        result = {"tweets": [], "users": {}, "newest_id": None, "oldest_id": None, "pages": 0,
+                  "complete": False, "since_id": since_id, "rate": {}}
+        while result["pages"] < max_pages:
+            response = self._get(bearer_token, params)
+            rate = result["rate"] = self._rate_limit(response.headers) or result["rate"]
+            if response.status_code == 429:
+                # 已取得的页照常返回，剩余的等窗口重置后再取
+                rate.setdefault("remaining", 0)
+                print(f"  [X/Twitter] {self.name}: 触发限流，已获取 {result['pages']} 页")
+                break
+            if response.status_code == 400 and "since_id" in params and result["pages"] == 0:
+                # since_id 超出 search/recent 的 7 天范围：补抓的区间已无法取回，直接放弃；
+                # 增量游标则丢弃后重新开始
+                if until_id:
+                    result["complete"] = True
+                    break
+                del params["since_id"]
+                result["since_id"] = None
+                continue
+            response.raise_for_status()
+            data = response.json()
+            result["pages"] += 1
+            
+            meta = data.get("meta", {})
+            result["newest_id"] = result["newest_id"] or meta.get("newest_id")
+            result["oldest_id"] = meta.get("oldest_id") or result["oldest_id"]
+            result["tweets"].extend(data.get("data", []))
+            result["users"].update((u["id"], u) for u in data.get("includes", {}).get("users", []))
+            
+            if not meta.get("next_token"):
+                result["complete"] = True
+                break
+            if rate.get("remaining") == 0:
+                break
+            params["next_token"] = meta["next_token"]
+        
+        return result
+
+    def _get(self, bearer_token: str, params: Dict):
+        base_url = self.config.get("api_base", TWITTER_API).rstrip("/")
+        return self.client.get(f"{base_url}/tweets/search/recent",
+                               headers={"Authorization": f"Bearer {bearer_token}"},
+                               params=params, timeout=self.timeout or 20)
+
+    @staticmethod
+    def _rate_limit(headers) -> Dict[str, int]:
+        """解析 x-rate-limit-* 响应头"""
+        rate = {}
+        for key, header in (("limit", "x-rate-limit-limit"), ("remaining", "x-rate-limit-remaining"),
+                            ("reset_at", "x-rate-limit-reset")):
+            value = headers.get(header, "")
+            if value.isdigit():
+                rate[key] = int(value)
+        return rate
+
+    @staticmethod
+    def _to_item(tweet: Dict, users: Dict) -> Dict[str, Any]:
+        author = users.get(tweet.get('author_id'), {})
+        username = author.get('username', 'unknown')
+        metrics = tweet.get('public_metrics', {})
+        text = tweet.get('text', '')
+        return {
+            "title": text[:100] + "..." if len(text) > 100 else text,
+            "link": f"https://twitter.com/{username}/status/{tweet.get('id')}",
+            "summary": f"❤️ {metrics.get('like_count', 0)} | 🔁 {metrics.get('retweet_count', 0)} | 💬 {metrics.get('reply_count', 0)} | by @{username}",
+            "source": f"X/@{username}",
+            "pub_date": tweet.get('created_at', ''),
+            "fetched_at": datetime.now().isoformat(),
+            "raw_text": text
+        }
+
+    def _state_path(self) -> str:
+        return self.config.get("state_file") or TWITTER_STATE_FILE
+
+    def _load_state(self) -> Dict[str, Dict]:
+        return load_json(self._state_path())
+
+    def _save_state(self, query: str, entry: Dict):
+        """只更新本查询一项，不覆盖同时运行的其他 X 数据源"""
+        try:
+            update_json(self._state_path(), query, entry, indent=2)
+        except OSError as e:
+            print(f"  [X/Twitter Error] 状态写入失败: {e}")
 
 
 class TwitterSourceSimple(BaseSource):
@@ -102,22 +211,15 @@ class TwitterSourceSimple(BaseSource):
         nitter_instance = self.config.get("nitter_instance", "https://nitter.net")
         
         items = []
+        errors = []
         
         for query in queries[:3]:  # 限制查询数量
             try:
                 url = f"{nitter_instance}/search?f=tweets&q={urllib.parse.quote(query)}"
                 
-                ctx = ssl.create_default_context()
-                ctx.check_hostname = False
-                ctx.verify_mode = ssl.CERT_NONE
-                
-                req = urllib.request.Request(
-                    url,
-                    headers={"User-Agent": "Mozilla/5.0"}
-                )
-                
-                with urllib.request.urlopen(req, timeout=15, context=ctx) as resp:
-                    html = resp.read().decode('utf-8')
+                response = self.client.get(url, timeout=self.timeout or 15)
+                response.raise_for_status()
+                html = response.text
                 
                 # 简单解析 (Nitter HTML结构)
                 # 注意：这依赖于Nitter的具体实现，可能不稳定
@@ -125,7 +227,11 @@ class TwitterSourceSimple(BaseSource):
                 
             except Exception as e:
                 print(f"  [Nitter Error] {query}: {e}")
+                errors.append(f"{query}: {e}")
         
+        # 全部查询都失败才算本次采集失败
+        if errors and len(errors) == len(queries[:3]):
+            self.last_error = "; ".join(errors)
         return items[:10]  # 限制返回数量
     
     def _parse_nitter_html(self, html: str, query: str) -> List[Dict]:
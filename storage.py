@@ -0,0 +1,490 @@
+"""
+StellarPulse 存储引擎 - 基于 SQLite 的资讯库
+替代 data.json 整文件读写：增量插入、按需查询、历史不再截断
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional
+
+from search_index import tokenize, query_tokens
+from near_dup import item_minhash, band_keys, similarity, pack_signature, unpack_signature, DEFAULT_THRESHOLD
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.path.join(BASE_DIR, "data.db")
+LEGACY_DATA_FILE = os.path.join(BASE_DIR, "data.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    link        TEXT NOT NULL,
+    title       TEXT NOT NULL DEFAULT '',
+    source      TEXT NOT NULL DEFAULT '',
+    fetched_at  TEXT NOT NULL DEFAULT '',
+    importance  REAL NOT NULL DEFAULT 0,
+    data        TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_items_link ON items(link);
+CREATE INDEX IF NOT EXISTS idx_items_fetched_at ON items(fetched_at);
+CREATE INDEX IF NOT EXISTS idx_items_source ON items(source, fetched_at);
+
+CREATE TABLE IF NOT EXISTS item_categories (
+    category    TEXT NOT NULL,
+    item_id     INTEGER NOT NULL,
+    fetched_at  TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (category, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_item_categories_recent ON item_categories(category, fetched_at);
+
+-- 倒排索引：同一词元下按 item_id (即入库先后) 排序，倒序扫描即按新旧排序
+CREATE TABLE IF NOT EXISTS postings (
+    token       TEXT NOT NULL,
+    item_id     INTEGER NOT NULL,
+    PRIMARY KEY (token, item_id)
+) WITHOUT ROWID;
+
+-- 近似重复检测：MinHash 签名及其分段桶，落入同一个桶的条目才需要比较签名
+CREATE TABLE IF NOT EXISTS signatures (
+    item_id     INTEGER PRIMARY KEY,
+    signature   BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band_key    INTEGER NOT NULL,
+    item_id     INTEGER NOT NULL,
+    PRIMARY KEY (band_key, item_id)
+) WITHOUT ROWID;
+
+-- 被合并到规范条目的其他来源链接
+CREATE TABLE IF NOT EXISTS alt_links (
+    link        TEXT PRIMARY KEY,
+    item_id     INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 单条SQL中 IN (...) 的最大参数个数
+_IN_CHUNK = 500
+
+# 倒排索引版本，分词规则变化时递增以触发重建
+SEARCH_INDEX_VERSION = 1
+
+# 去重签名版本，MinHash 参数或分桶规则变化时递增以触发重建
+SIGNATURE_VERSION = 1
+
+# 估算词元文档频率时最多计数的条数
+_DF_CAP = 10000
+
+class ItemStore:
+    """资讯存储
+
+    items 表保存完整的资讯JSON，并把常用查询字段单独成列建索引；
+    分类存放在 item_categories 表中，以便按分类做索引查询。
+    一个实例持有一个连接，同一时刻只能由一个线程使用；
+    check_same_thread=False 时可在线程间传递 (如连接池借还)，由调用方保证不并发使用。
+    """
+
+    def __init__(self, db_file: str = DB_FILE, check_same_thread: bool = True):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def read_snapshot(self):
+        """在同一个读事务中执行多次查询，期间其他连接的写入不可见"""
+        self.conn.execute("BEGIN")
+        try:
+            yield self
+        finally:
+            self.conn.rollback()
+
+    def content_version(self) -> tuple:
+        """资讯数据的版本：(最大 id, 修改计数)
+
+        新增条目改变最大 id，合并来源和刷新互动计数递增 items_revision；写其他 meta 不会改变它。
+        两项都走主键查找，不扫描整表。
+        """
+        row = self.conn.execute(
+            "SELECT (SELECT MAX(id) FROM items), (SELECT value FROM meta WHERE key = 'items_revision')"
+        ).fetchone()
+        return tuple(row)
+
+    def _bump_revision(self):
+        """已有条目的内容变化时调用 (在调用方的事务内)，计入 content_version"""
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('items_revision', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+    # ---------- 写入 ----------
+    def add_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """增量插入，链接已存在的条目被忽略；返回实际新增的条目"""
+        inserted = []
+        with self.conn:
+            for item in items:
+                link = item.get("link")
+                if not link:
+                    continue
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO items (link, title, source, fetched_at, importance, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (link, item.get("title") or "", item.get("source") or "",
+                     item.get("fetched_at") or "", item.get("importance") or 0,
+                     json.dumps(item, ensure_ascii=False))
+                )
+                if cur.rowcount != 1:
+                    continue
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO item_categories (category, item_id, fetched_at) VALUES (?, ?, ?)",
+                    [(cat, cur.lastrowid, item.get("fetched_at") or "") for cat in item.get("categories") or []]
+                )
+                self._index_item(cur.lastrowid, item)
+                self._index_signature(cur.lastrowid, item)
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO alt_links (link, item_id) VALUES (?, ?)",
+                    [(alt["link"], cur.lastrowid) for alt in item.get("alt_sources") or [] if alt.get("link")]
+                )
+                inserted.append(item)
+        return inserted
+
+    def merge_alternates(self, link: str, alternates: List[Dict[str, Any]]) -> bool:
+        """把其他来源记入链接 (或备用链接) 为 link 的条目的 alt_sources"""
+        row = self.conn.execute(
+            "SELECT id FROM items WHERE link = ? "
+            "UNION ALL SELECT item_id FROM alt_links WHERE link = ? LIMIT 1", (link, link)
+        ).fetchone()
+        if row is None:
+            return False
+        self.merge_alternates_by_id(row[0], alternates)
+        return True
+
+    def merge_alternates_by_id(self, item_id: int, alternates: List[Dict[str, Any]]):
+        with self.conn:
+            row = self.conn.execute("SELECT link, data FROM items WHERE id = ?", (item_id,)).fetchone()
+            if row is None:
+                return
+            item = json.loads(row["data"])
+            known = {row["link"]} | {alt.get("link") for alt in item.get("alt_sources") or []}
+            added = []
+            for alt in alternates:
+                if alt.get("link") and alt["link"] not in known:
+                    known.add(alt["link"])
+                    added.append(alt)
+            if not added:
+                return
+            item["alt_sources"] = (item.get("alt_sources") or []) + added
+            self.conn.execute("UPDATE items SET data = ? WHERE id = ?",
+                              (json.dumps(item, ensure_ascii=False), item_id))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO alt_links (link, item_id) VALUES (?, ?)",
+                [(alt["link"], item_id) for alt in added]
+            )
+            self._bump_revision()
+
+    def update_engagement(self, updates: List[Dict[str, Any]]) -> int:
+        """在一个事务中刷新已入库条目的互动计数 (engagement) 及由其生成的摘要，返回有变化的条数
+
+        updates 中每项带 link、summary、engagement；摘要变了，搜索索引和去重签名随之重建。
+        """
+        changed = 0
+        with self.conn:
+            for update in updates:
+                row = self.conn.execute("SELECT id, data FROM items WHERE link = ?",
+                                        (update["link"],)).fetchone()
+                if row is None:
+                    continue
+                item = json.loads(row["data"])
+                summary = update.get("summary", "")
+                if item.get("engagement") == update["engagement"] and item.get("summary") == summary:
+                    continue
+                self._unindex_item(row["id"], item)
+                item["engagement"] = update["engagement"]
+                item["summary"] = summary
+                self.conn.execute("UPDATE items SET data = ? WHERE id = ?",
+                                  (json.dumps(item, ensure_ascii=False), row["id"]))
+                self._index_item(row["id"], item)
+                self._index_signature(row["id"], item)
+                changed += 1
+            if changed:
+                self._bump_revision()
+        return changed
+
+    def _unindex_item(self, item_id: int, item: Dict[str, Any]):
+        """删除按 item 旧内容建立的倒排索引和去重签名 (按主键逐条删除，不扫描整表)"""
+        tokens = tokenize(f"{item.get('title') or ''} {item.get('summary') or ''}")
+        self.conn.executemany("DELETE FROM postings WHERE token = ? AND item_id = ?",
+                              [(token, item_id) for token in tokens])
+        signature = item_minhash(item)
+        if signature is not None:
+            self.conn.executemany("DELETE FROM lsh_buckets WHERE band_key = ? AND item_id = ?",
+                                  [(key, item_id) for key in band_keys(signature)])
+        self.conn.execute("DELETE FROM signatures WHERE item_id = ?", (item_id,))
+
+    def _index_item(self, item_id: int, item: Dict[str, Any]):
+        tokens = tokenize(f"{item.get('title') or ''} {item.get('summary') or ''}")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO postings (token, item_id) VALUES (?, ?)",
+            [(token, item_id) for token in tokens]
+        )
+
+    def _index_signature(self, item_id: int, item: Dict[str, Any]):
+        signature = item_minhash(item)
+        if signature is None:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO signatures (item_id, signature) VALUES (?, ?)",
+            (item_id, pack_signature(signature))
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO lsh_buckets (band_key, item_id) VALUES (?, ?)",
+            [(key, item_id) for key in band_keys(signature)]
+        )
+
+    def ensure_signatures(self) -> int:
+        """签名版本不符时重建近似重复索引，返回重建的条数"""
+        if self.get_meta("signature_version") == SIGNATURE_VERSION:
+            return 0
+        count = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM signatures")
+            self.conn.execute("DELETE FROM lsh_buckets")
+            for row in self.conn.execute("SELECT id, data FROM items").fetchall():
+                self._index_signature(row["id"], json.loads(row["data"]))
+                count += 1
+        self.set_meta("signature_version", SIGNATURE_VERSION)
+        return count
+
+    def ensure_search_index(self) -> int:
+        """索引版本不符时重建倒排索引，返回重建的条数"""
+        if self.get_meta("search_index_version") == SEARCH_INDEX_VERSION:
+            return 0
+        count = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM postings")
+            for row in self.conn.execute("SELECT id, data FROM items").fetchall():
+                self._index_item(row["id"], json.loads(row["data"]))
+                count += 1
+        self.set_meta("search_index_version", SEARCH_INDEX_VERSION)
+        return count
+
+    def set_meta(self, key: str, value: Any):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False))
+            )
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    # ---------- 查询 ----------
+    def existing_links(self, links: List[str]) -> set:
+        """返回已入库的链接集合 (含已合并条目的备用链接)"""
+        found = set()
+        links = [l for l in links if l]
+        for start in range(0, len(links), _IN_CHUNK):
+            chunk = links[start:start + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for table in ("items", "alt_links"):
+                rows = self.conn.execute(
+                    f"SELECT link FROM {table} WHERE link IN ({placeholders})", chunk
+                )
+                found.update(row["link"] for row in rows)
+        return found
+
+    def find_near_duplicate(self, item: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+                            since: str = None) -> Optional[int]:
+        """查找与 item 近似重复的已入库条目，返回其 id；多个候选时取最相似、最早入库的一条"""
+        signature = item_minhash(item)
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+        sql = (f"SELECT DISTINCT b.item_id, s.signature FROM lsh_buckets b "
+               f"JOIN signatures s ON s.item_id = b.item_id JOIN items i ON i.id = b.item_id "
+               f"WHERE b.band_key IN ({','.join('?' * len(keys))})")
+        params: List[Any] = list(keys)
+        if since:
+            sql += " AND i.fetched_at >= ?"
+            params.append(since)
+        best = None
+        for row in self.conn.execute(sql, params):
+            score = similarity(signature, unpack_signature(row["signature"]))
+            if score >= threshold and (best is None or (-score, row["item_id"]) < best):
+                best = (-score, row["item_id"])
+        return best[1] if best else None
+
+    def _select(self, category: str = None, source: str = None,
+                since: str = None, until: str = None) -> tuple:
+        """构造按时间倒序的查询语句"""
+        if category:
+            sql = ("SELECT i.data FROM item_categories c JOIN items i ON i.id = c.item_id "
+                   "WHERE c.category = ?")
+            params: List[Any] = [category]
+            time_col = "c.fetched_at"
+        else:
+            sql = "SELECT i.data FROM items i WHERE 1 = 1"
+            params = []
+            time_col = "i.fetched_at"
+        if source:
+            sql += " AND i.source = ?"
+            params.append(source)
+        if since:
+            sql += f" AND {time_col} >= ?"
+            params.append(since)
+        if until:
+            sql += f" AND {time_col} < ?"
+            params.append(until)
+        sql += f" ORDER BY {time_col} DESC, i.id DESC"
+        return sql, params
+
+    def recent(self, limit: int = 20, category: str = None, source: str = None,
+               since: str = None, until: str = None) -> List[Dict[str, Any]]:
+        """按抓取时间倒序返回资讯"""
+        sql, params = self._select(category, source, since, until)
+        rows = self.conn.execute(sql + " LIMIT ?", params + [limit])
+        return [json.loads(row["data"]) for row in rows]
+
+    def iter_recent(self, category: str = None, source: str = None) -> Iterator[Dict[str, Any]]:
+        """按抓取时间倒序逐条遍历，供调用方提前终止的扫描使用"""
+        sql, params = self._select(category, source)
+        for row in self.conn.execute(sql, params):
+            yield json.loads(row["data"])
+
+    def search(self, query: str, limit: int = 8, category: str = None) -> Optional[List[Dict[str, Any]]]:
+        """倒排索引检索：所有词元同时命中 (AND)，按新旧倒序返回前 limit 条
+
+        以文档频率最低的词元驱动扫描，其余词元逐条做索引点查，凑够 limit 条即停止。
+        查询无法用索引表达时返回 None。
+        """
+        tokens = query_tokens(query)
+        if tokens is None:
+            return None
+
+        df = {}
+        for token in tokens:
+            df[token] = self.conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE token = ? LIMIT ?)",
+                (token, _DF_CAP)
+            ).fetchone()[0]
+            if df[token] == 0:
+                return []
+        tokens.sort(key=df.__getitem__)
+
+        sql = "SELECT i.data FROM postings p JOIN items i ON i.id = p.item_id WHERE p.token = ?"
+        params: List[Any] = [tokens[0]]
+        for token in tokens[1:]:
+            sql += " AND EXISTS (SELECT 1 FROM postings q WHERE q.token = ? AND q.item_id = p.item_id)"
+            params.append(token)
+        if category:
+            sql += " AND EXISTS (SELECT 1 FROM item_categories c WHERE c.category = ? AND c.item_id = p.item_id)"
+            params.append(category)
+        sql += " ORDER BY p.item_id DESC LIMIT ?"
+        params.append(limit)
+        return [json.loads(row["data"]) for row in self.conn.execute(sql, params)]
+
+    def page(self, limit: int = 50, before_id: int = None, category: str = None,
+             source: str = None, since: str = None, until: str = None) -> List[Dict[str, Any]]:
+        """按 id 倒序分页 (游标为上一页最后一条的 id)，条目附带 id 字段"""
+        if category:
+            sql = ("SELECT i.id, i.data FROM item_categories c JOIN items i ON i.id = c.item_id "
+                   "WHERE c.category = ?")
+            params: List[Any] = [category]
+            id_col = "c.item_id"
+        else:
+            sql = "SELECT i.id, i.data FROM items i WHERE 1 = 1"
+            params = []
+            id_col = "i.id"
+        if before_id is not None:
+            sql += f" AND {id_col} < ?"
+            params.append(before_id)
+        if source:
+            sql += " AND i.source = ?"
+            params.append(source)
+        if since:
+            sql += " AND i.fetched_at >= ?"
+            params.append(since)
+        if until:
+            sql += " AND i.fetched_at < ?"
+            params.append(until)
+        sql += f" ORDER BY {id_col} DESC LIMIT ?"
+        params.append(limit)
+        items = []
+        for row in self.conn.execute(sql, params):
+            item = json.loads(row["data"])
+            item["id"] = row["id"]
+            items.append(item)
+        return items
+
+    def top_by_importance(self, limit: int = 5) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT data FROM items ORDER BY importance DESC, id ASC LIMIT ?", (limit,)
+        )
+        return [json.loads(row["data"]) for row in rows]
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM items LIMIT 1").fetchone() is None
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def category_counts(self) -> Dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT category, COUNT(*) AS n FROM item_categories GROUP BY category"
+        )
+        return {row["category"]: row["n"] for row in rows}
+
+    def source_counts(self) -> Dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT source, COUNT(*) AS n FROM items GROUP BY source ORDER BY n DESC"
+        )
+        return {row["source"]: row["n"] for row in rows}
+
+    # ---------- 迁移 ----------
+    def migrate_from_json(self, json_file: str = LEGACY_DATA_FILE) -> int:
+        """从旧版 data.json 导入；仅在库为空时执行，返回导入条数"""
+        if not os.path.exists(json_file) or not self.is_empty():
+            return 0
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"  [Storage] 读取 {json_file} 失败: {e}")
+            return 0
+
+        inserted = self.add_items(data.get("items", []))
+        if data.get("last_run"):
+            self.set_meta("last_run", data["last_run"])
+        if data.get("stats"):
+            self.set_meta("stats", data["stats"])
+        self.set_meta("migrated_from", {"file": json_file, "items": len(inserted),
+                                        "at": datetime.now().isoformat()})
+        return len(inserted)
+
+
+def open_store(db_file: str = DB_FILE, legacy_file: Optional[str] = LEGACY_DATA_FILE) -> ItemStore:
+    """打开资讯库，首次使用时自动从 data.json 迁移"""
+    store = ItemStore(db_file)
+    if legacy_file:
+        migrated = store.migrate_from_json(legacy_file)
+        if migrated:
+            print(f"  [Storage] 已从 {os.path.basename(legacy_file)} 迁移 {migrated} 条资讯")
+    indexed = store.ensure_search_index()
+    if indexed:
+        print(f"  [Storage] 已重建 {indexed} 条资讯的检索索引")
+    signed = store.ensure_signatures()
+    if signed:
+        print(f"  [Storage] 已重建 {signed} 条资讯的去重签名")
+    return store
@@ -1,11 +1,16 @@
 import json
 import os
+import sys
 from datetime import datetime
 
 # Paths
 TD_MERGED = "/tmp/td-merged.json"
 SP_BASE = "/Users/yujie/.openclaw/workspace/stellarpulse"
 SP_DATA = os.path.join(SP_BASE, "data.json")
+SP_DB = os.path.join(SP_BASE, "data.db")
+
+sys.path.insert(0, SP_BASE)
+from storage import open_store
 
 def sync():
     if not os.path.exists(TD_MERGED):
@@ -15,14 +20,9 @@ def sync():
     with open(TD_MERGED, 'r') as f:
         td_data = json.load(f)
 
-    if not os.path.exists(SP_DATA):
-        sp_data = {"items": [], "last_run": None, "stats": {}}
-    else:
-        with open(SP_DATA, 'r') as f:
-            sp_data = json.load(f)
-
-    existing_links = {item['link'] for item in sp_data['items']}
+    store = open_store(SP_DB, SP_DATA)
     new_items = []
+    existing_links = set()
 
     # Mapping topics
     topic_map = {
@@ -53,14 +53,11 @@ def sync():
                 new_items.append(item)
                 existing_links.add(link)
 
-    # Prepend new items
-    sp_data['items'] = (new_items + sp_data['items'])[:1000]
-    sp_data['last_run'] = datetime.now().isoformat()
-    
-    with open(SP_DATA, 'w') as f:
-        json.dump(sp_data, f, ensure_ascii=False, indent=2)
+    inserted = store.add_items(new_items)
+    store.set_meta("last_run", datetime.now().isoformat())
+    store.close()
     
-    print(f"Successfully synced {len(new_items)} items from tech-news-digest to StellarPulse.")
+    print(f"Successfully synced {len(inserted)} items from tech-news-digest to StellarPulse.")
 
 if __name__ == "__main__":
     sync()
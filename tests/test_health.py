@@ -0,0 +1,62 @@
+"""health.SourceHealth 熔断状态的持久化"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from health import SourceHealth, CLOSED, OPEN, HALF_OPEN
+
+
+class SourceHealthRestartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmpdir.name, "source_health.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def trip(self, health: SourceHealth, name: str):
+        for _ in range(health.failure_threshold):
+            health.record_failure(name, "boom")
+
+    def test_half_open_saved_mid_probe_is_probed_again_after_restart(self):
+        health = SourceHealth(self.state_file, failure_threshold=2, cooldown=0)
+        self.trip(health, "feed")
+        self.assertTrue(health.allow("feed"))              # 放行试探
+        self.assertEqual(health.state["feed"]["state"], HALF_OPEN)
+        health.save()                                       # 试探中途被其他数据源保存，随后进程退出
+
+        restarted = SourceHealth(self.state_file, failure_threshold=2, cooldown=0)
+        self.assertEqual(restarted.state["feed"]["state"], OPEN)
+        self.assertTrue(restarted.allow("feed"))
+        restarted.record_success("feed")
+        self.assertEqual(restarted.state["feed"]["state"], CLOSED)
+
+    def test_failed_probe_after_restart_reopens_with_longer_cooldown(self):
+        health = SourceHealth(self.state_file, failure_threshold=2, cooldown=60)
+        self.trip(health, "feed")
+        health.state["feed"]["state"] = HALF_OPEN
+        health.save()
+
+        restarted = SourceHealth(self.state_file, failure_threshold=2, cooldown=60)
+        self.assertTrue(restarted.allow("feed"))
+        self.assertTrue(restarted.record_failure("feed", "still down"))
+        self.assertEqual(restarted.state["feed"]["state"], OPEN)
+        self.assertFalse(restarted.allow("feed"))
+        self.assertGreater(restarted.retry_in("feed"), 60)
+
+    def test_open_circuit_keeps_cooldown_across_restart(self):
+        health = SourceHealth(self.state_file, failure_threshold=2, cooldown=300)
+        self.trip(health, "feed")
+        health.save()
+
+        restarted = SourceHealth(self.state_file, failure_threshold=2, cooldown=300)
+        self.assertFalse(restarted.allow("feed"))
+        self.assertGreater(restarted.retry_in("feed"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
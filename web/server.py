@@ -1,10 +1,48 @@
 """Web管理界面"""
+import gzip
+import hashlib
 import json
 import os
+import queue
+import sys
+from contextlib import contextmanager
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
 import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'sources'))
+
+from storage import open_store, ItemStore, DB_FILE
+from metrics import METRICS_FILE, load_recent_records
+from health import SOURCE_HEALTH_FILE, load_health
+from web.telemetry import Telemetry
+
+KEYWORDS_FILE = os.path.join(BASE_DIR, 'keywords.json')
+REPORTS_DIR = os.path.join(BASE_DIR, 'reports')
+
+# /api/items 每页条数
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 200
+
+# 小于该字节数的响应不压缩
+GZIP_MIN_SIZE = 1024
+
+# 最多缓存的 API 响应数
+API_CACHE_SIZE = 256
+
+# 读连接池大小，即同时查询资讯库的请求数上限
+STORE_POOL_SIZE = 8
+
+# 这些文件变化时重建快照；SQLite 的写入先落到 -wal 文件
+WATCHED_FILES = (DB_FILE, DB_FILE + '-wal', KEYWORDS_FILE, REPORTS_DIR, METRICS_FILE, SOURCE_HEALTH_FILE)
+
+# 快照中保留的最近运行记录数 (/metrics 取各数据源最近一次的耗时和轮询间隔)
+METRICS_RUNS = 50
 
 # 页面模板
 HTML_TEMPLATE = '''
@@ -159,31 +197,254 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+class StorePool:
+    """资讯库读连接池
+
+    ThreadingHTTPServer 每个请求一个新线程，连接不能按线程保存；池中的连接在请求间借还，
+    服务器运行期间一直打开，不随请求关闭，也就不会在最后一个连接关闭时做 WAL 检查点、
+    改动被监视的文件。连接用 ItemStore 直接打开，迁移和索引检查只在启动时做一次。
+    """
+    
+    def __init__(self, db_file: str = DB_FILE, size: int = STORE_POOL_SIZE):
+        self.db_file = db_file
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+    
+    @contextmanager
+    def connection(self):
+        """借出一个连接，池满时等待其他请求归还"""
+        with self._slots:
+            try:
+                store = self._idle.get_nowait()
+            except queue.Empty:
+                store = ItemStore(self.db_file, check_same_thread=False)
+            try:
+                yield store
+            finally:
+                self._idle.put(store)
+
+
+STORE_POOL = StorePool()
+
+
+class DataSnapshot:
+    """某一时刻页面所需数据的只读快照
+
+    快照创建后不再修改（渲染缓存除外），请求线程无需加锁即可读取；
+    数据变化时整体替换为新快照。
+    """
+    
+    def __init__(self, version: tuple):
+        self.version = version
+        with STORE_POOL.connection() as store:
+            self.total = store.count()
+            self.category_counts = store.category_counts()
+            self.source_counts = store.source_counts()
+            self.latest = store.recent(limit=20)
+        self.subscriptions = load_subscriptions()
+        self.reports = list_reports()
+        self.runs = load_recent_records(METRICS_FILE, METRICS_RUNS)
+        self.health = load_health(SOURCE_HEALTH_FILE)
+        # page -> 渲染好的HTML字节；同一快照的页面内容不会变化
+        self.pages = {}
+    
+    def page(self, name: str) -> bytes:
+        html = self.pages.get(name)
+        if html is None:
+            renderer = PAGE_RENDERERS.get(name, render_home)
+            html = HTML_TEMPLATE.replace('{{content}}', renderer(self)).encode('utf-8')
+            self.pages[name] = html
+        return html
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()[:16]
+
+
+class ItemsCache:
+    """/api/items 响应缓存
+
+    ETag 只由资讯数据的版本 (ItemStore.content_version) 和查询决定，
+    指标、健康状态等文件的改写不会使其失效；版本和响应体在同一个读事务中取得，
+    返回的内容总是 ETag 所对应的版本。
+    """
+    
+    def __init__(self, pool: StorePool):
+        self.pool = pool
+        # (数据版本, 规范化查询) -> (ETag, JSON字节, gzip字节)
+        self._responses = {}
+        self._lock = threading.Lock()
+    
+    def get(self, query: tuple):
+        """返回 (ETag, JSON字节, gzip字节或None)；同一数据版本的相同查询复用结果"""
+        with self.pool.connection() as store, store.read_snapshot():
+            version = store.content_version()
+            key = (version, query)
+            cached = self._responses.get(key)
+            if cached is not None:
+                return cached
+            limit, cursor, category, source, since, until = query
+            items = store.page(limit + 1, cursor, category, source, since, until)
+        has_more = len(items) > limit
+        items = items[:limit]
+        body = json.dumps({
+            'items': items,
+            'next_cursor': items[-1]['id'] if has_more else None,
+        }, ensure_ascii=False).encode('utf-8')
+        packed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        cached = (f'"{_digest(version)}-{_digest(query)}"', body, packed)
+        with self._lock:
+            if len(self._responses) >= API_CACHE_SIZE:
+                self._responses.clear()
+            self._responses[key] = cached
+        return cached
+
+
+class SnapshotManager:
+    """按被监视文件的 mtime/大小判断数据是否变化，变化时原子替换快照"""
+    
+    def __init__(self, watched=WATCHED_FILES):
+        self.watched = watched
+        self._snapshot = None
+        self._lock = threading.Lock()
+    
+    def _signature(self) -> tuple:
+        sig = []
+        for path in self.watched:
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+    
+    def get(self) -> DataSnapshot:
+        snapshot = self._snapshot
+        signature = self._signature()
+        if snapshot is not None and snapshot.version == signature:
+            return snapshot
+        with self._lock:
+            # 其他线程可能已完成重建
+            if self._snapshot is None or self._snapshot.version != signature:
+                start = time.perf_counter()
+                self._snapshot = DataSnapshot(signature)
+                TELEMETRY.record_reload(time.perf_counter() - start)
+            return self._snapshot
+
+
+TELEMETRY = Telemetry()
+SNAPSHOTS = SnapshotManager()
+ITEMS_CACHE = ItemsCache(STORE_POOL)
+
+# 订阅增删是读-改-写整个 keywords.json，需要串行
+_subscription_lock = threading.Lock()
+
+
 class StellarPulseHandler(BaseHTTPRequestHandler):
     """HTTP请求处理器"""
     
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+    
     def do_GET(self):
+        start = time.perf_counter()
+        self._status = 500
         parsed = urlparse(self.path)
         params = parse_qs(parsed.query)
         page = params.get('page', [''])[0]
+        label = page or 'home'
+        try:
+            if parsed.path == '/metrics':
+                label = 'metrics'
+                self._serve_metrics()
+            elif parsed.path == '/api/items':
+                label = 'api_items'
+                self._serve_items(params)
+            else:
+                if page not in PAGE_RENDERERS:
+                    label = 'home'
+                    page = ''
+                self._serve_page(page)
+        finally:
+            TELEMETRY.record_request(label, self._status, time.perf_counter() - start)
+    
+    def _serve_page(self, page: str):
+        body = SNAPSHOTS.get().page(page)
         
-        if page == 'subscriptions':
-            content = self._render_subscriptions()
-        elif page == 'stats':
-            content = self._render_stats()
-        elif page == 'reports':
-            content = self._render_reports()
-        else:
-            content = self._render_home()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _serve_metrics(self):
+        body = TELEMETRY.render(SNAPSHOTS.get())
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _serve_items(self, params: dict):
+        """GET /api/items?limit=&cursor=&category=&source=&since=&until=
+
+        cursor 为上一页返回的 next_cursor；since/until 为 ISO 时间字符串，按抓取时间过滤。
+        """
+        arg = lambda name: params.get(name, [''])[0] or None
+        try:
+            limit = min(max(int(arg('limit') or API_DEFAULT_LIMIT), 1), API_MAX_LIMIT)
+            cursor = int(arg('cursor')) if arg('cursor') else None
+        except ValueError:
+            self._send_json(400, {'error': 'limit 和 cursor 必须是整数'})
+            return
+        
+        query = (limit, cursor, arg('category'), arg('source'), arg('since'), arg('until'))
+        etag, body, packed = ITEMS_CACHE.get(query)
+        use_gzip = packed is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            # 强 ETag 需区分不同编码的表示
+            etag = etag[:-1] + '-gz"'
         
-        html = HTML_TEMPLATE.replace('{{content}}', content)
+        if_none_match = self.headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
         
         self.send_response(200)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', 'no-cache')
+        if use_gzip:
+            body = packed
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        self.wfile.write(body)
+    
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
     
     def do_POST(self):
+        start = time.perf_counter()
+        self._status = 500
+        try:
+            self._handle_post()
+        finally:
+            action = urlparse(self.path).path
+            label = action[len('/api/'):] if action in ('/api/subscribe', '/api/unsubscribe') else 'other'
+            TELEMETRY.record_request(label, self._status, time.perf_counter() - start)
+    
+    def _handle_post(self):
         parsed = urlparse(self.path)
         content_length = int(self.headers.get('Content-Length', 0))
         post_data = self.rfile.read(content_length).decode('utf-8')
@@ -207,193 +468,189 @@ class StellarPulseHandler(BaseHTTPRequestHandler):
             self.send_response(404)
             self.end_headers()
     
-    def _render_home(self) -> str:
-        """渲染首页 - 最新资讯"""
-        # 加载数据
-        items = self._load_items()
-        
-        # 统计
-        ai_count = sum(1 for i in items if 'ai' in i.get('categories', []))
-        robotics_count = sum(1 for i in items if 'robotics' in i.get('categories', []))
-        space_count = sum(1 for i in items if 'space' in i.get('categories', []))
+    def _add_subscription(self, keyword: str):
+        """添加订阅"""
+        from subscription import SubscriptionManager
+        with _subscription_lock:
+            mgr = SubscriptionManager()
+            mgr.add_subscription(keyword)
+    
+    def _remove_subscription(self, sub_id: str):
+        """移除订阅"""
+        from subscription import SubscriptionManager
+        with _subscription_lock:
+            mgr = SubscriptionManager()
+            mgr.remove_subscription(sub_id)
+    
+    def log_message(self, format, *args):
+        pass  # 静默日志
+
+
+def load_subscriptions() -> list:
+    """加载订阅"""
+    try:
+        with open(KEYWORDS_FILE, 'r') as f:
+            data = json.load(f)
+            return data.get('subscriptions', [])
+    except:
+        return []
+
+def list_reports() -> list:
+    """历史报告文件名，新的在前"""
+    if not os.path.exists(REPORTS_DIR):
+        return []
+    return [f for f in sorted(os.listdir(REPORTS_DIR), reverse=True) if f.endswith('.md')]
+
+def render_home(snap: DataSnapshot) -> str:
+    """渲染首页 - 最新资讯"""
+    cat_counts = snap.category_counts
+    
+    # 统计
+    ai_count = cat_counts.get('ai', 0)
+    robotics_count = cat_counts.get('robotics', 0)
+    space_count = cat_counts.get('space', 0)
+    
+    html = f'''
+    <div class="stats">
+        <div class="stat-card">
+            <h3>{snap.total}</h3>
+            <p>📊 总资讯数</p>
+        </div>
+        <div class="stat-card">
+            <h3>{ai_count}</h3>
+            <p>🤖 AI & 大模型</p>
+        </div>
+        <div class="stat-card">
+            <h3>{robotics_count}</h3>
+            <p>🦾 具身智能</p>
+        </div>
+        <div class="stat-card">
+            <h3>{space_count}</h3>
+            <p>🚀 航天</p>
+        </div>
+    </div>
+    
+    <div class="section">
+        <h2>📰 最新资讯</h2>
+    '''
+    
+    for item in snap.latest:
+        cats = item.get('categories', ['other'])
+        cat_tags = ''.join([f'<span class="tag {c}">{c.upper()}</span>' for c in cats if c != 'other'])
         
-        html = f'''
-        <div class="stats">
-            <div class="stat-card">
-                <h3>{len(items)}</h3>
-                <p>📊 总资讯数</p>
+        html += f'''
+        <div class="news-item">
+            <div class="news-title">
+                <a href="{item.get('link', '#')}" target="_blank">{item.get('title', 'Untitled')}</a>
             </div>
-            <div class="stat-card">
-                <h3>{ai_count}</h3>
-                <p>🤖 AI & 大模型</p>
-            </div>
-            <div class="stat-card">
-                <h3>{robotics_count}</h3>
-                <p>🦾 具身智能</p>
-            </div>
-            <div class="stat-card">
-                <h3>{space_count}</h3>
-                <p>🚀 航天</p>
+            <div class="news-meta">
+                <span>📡 {item.get('source', 'Unknown')}</span>
+                <span>🕐 {item.get('fetched_at', '')[:16]}</span>
+                {cat_tags}
             </div>
         </div>
-        
-        <div class="section">
-            <h2>📰 最新资讯</h2>
         '''
-        
-        for item in items[:20]:
-            cats = item.get('categories', ['other'])
-            cat_tags = ''.join([f'<span class="tag {c}">{c.upper()}</span>' for c in cats if c != 'other'])
-            
-            html += f'''
-            <div class="news-item">
-                <div class="news-title">
-                    <a href="{item.get('link', '#')}" target="_blank">{item.get('title', 'Untitled')}</a>
-                </div>
-                <div class="news-meta">
-                    <span>📡 {item.get('source', 'Unknown')}</span>
-                    <span>🕐 {item.get('fetched_at', '')[:16]}</span>
-                    {cat_tags}
-                </div>
-            </div>
-            '''
-        
-        html += '</div>'
-        return html
     
-    def _render_subscriptions(self) -> str:
-        """渲染订阅管理页"""
-        subs = self._load_subscriptions()
+    html += '</div>'
+    return html
+
+def render_subscriptions(snap: DataSnapshot) -> str:
+    """渲染订阅管理页"""
+    html = '''
+    <div class="section">
+        <h2>🔔 关键词订阅</h2>
+        <p>添加关键词，当相关内容出现时立即通知</p>
+        <form action="/api/subscribe" method="POST" style="margin-top: 15px;">
+            <input type="text" name="keyword" placeholder="输入关键词，如: GPT-5, 宇树, SpaceX..." required>
+            <button type="submit" class="btn">添加订阅</button>
+        </form>
         
-        html = '''
-        <div class="section">
-            <h2>🔔 关键词订阅</h2>
-            <p>添加关键词，当相关内容出现时立即通知</p>
-            <form action="/api/subscribe" method="POST" style="margin-top: 15px;">
-                <input type="text" name="keyword" placeholder="输入关键词，如: GPT-5, 宇树, SpaceX..." required>
-                <button type="submit" class="btn">添加订阅</button>
+        <div class="subscription-list">
+    '''
+    
+    for sub in snap.subscriptions:
+        html += f'''
+        <div class="sub-item">
+            {sub.get('keyword', '')}
+            <form action="/api/unsubscribe" method="POST" style="display:inline;">
+                <input type="hidden" name="id" value="{sub.get('id', '')}">
+                <button type="submit" class="remove" style="background:none;border:none;">×</button>
             </form>
-            
-            <div class="subscription-list">
+        </div>
         '''
-        
-        for sub in subs:
-            html += f'''
-            <div class="sub-item">
-                {sub.get('keyword', '')}
-                <form action="/api/unsubscribe" method="POST" style="display:inline;">
-                    <input type="hidden" name="id" value="{sub.get('id', '')}">
-                    <button type="submit" class="remove" style="background:none;border:none;">×</button>
-                </form>
-            </div>
-            '''
-        
-        html += '</div></div>'
-        return html
     
-    def _render_stats(self) -> str:
-        """渲染统计页"""
-        items = self._load_items()
-        subs = self._load_subscriptions()
-        
-        # 计算统计数据
-        sources = {}
-        categories = {'ai': 0, 'robotics': 0, 'space': 0}
-        
-        for item in items:
-            src = item.get('source', 'Unknown')
-            sources[src] = sources.get(src, 0) + 1
-            
-            for cat in item.get('categories', []):
-                if cat in categories:
-                    categories[cat] += 1
-        
-        html = '''
-        <div class="section">
-            <h2>📊 数据统计</h2>
-            <h3 style="margin-top: 20px; color: #4fbdba;">📡 数据源分布</h3>
-        '''
-        
-        for src, count in sorted(sources.items(), key=lambda x: x[1], reverse=True):
-            html += f'<p>{src}: {count} 条</p>'
-        
-        html += '<h3 style="margin-top: 20px; color: #4fbdba;">🏷️ 分类统计</h3>'
-        html += f'<p>🤖 AI: {categories["ai"]} 条</p>'
-        html += f'<p>🦾 Robotics: {categories["robotics"]} 条</p>'
-        html += f'<p>🚀 Space: {categories["space"]} 条</p>'
-        html += f'<p>🔔 订阅数: {len(subs)} 个</p>'
-        
-        html += '</div>'
-        return html
+    html += '</div></div>'
+    return html
+
+def render_stats(snap: DataSnapshot) -> str:
+    """渲染统计页"""
+    categories = {cat: snap.category_counts.get(cat, 0) for cat in ('ai', 'robotics', 'space')}
     
-    def _render_reports(self) -> str:
-        """渲染历史报告页"""
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        reports_dir = os.path.join(base_dir, "reports")
-        reports = []
-        
-        if os.path.exists(reports_dir):
-            for f in sorted(os.listdir(reports_dir), reverse=True):
-                if f.endswith('.md'):
-                    reports.append(f)
-        
-        html = '''
-        <div class="section">
-            <h2>📄 历史报告</h2>
-        '''
-        
-        for report in reports[:30]:
-            date = report.replace('report-', '').replace('.md', '')
-            html += f'''
-            <div class="news-item">
-                <div class="news-title">
-                    <a href="/reports/{report}" target="_blank">📅 {date} 日报</a>
-                </div>
-            </div>
-            '''
-        
-        html += '</div>'
-        return html
+    html = '''
+    <div class="section">
+        <h2>📊 数据统计</h2>
+        <h3 style="margin-top: 20px; color: #4fbdba;">📡 数据源分布</h3>
+    '''
     
-    def _load_items(self) -> list:
-        """加载数据"""
-        try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            with open(os.path.join(base_dir, 'data.json'), 'r') as f:
-                data = json.load(f)
-                return data.get('items', [])
-        except:
-            return []
-    
-    def _load_subscriptions(self) -> list:
-        """加载订阅"""
-        try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            with open(os.path.join(base_dir, 'keywords.json'), 'r') as f:
-                data = json.load(f)
-                return data.get('subscriptions', [])
-        except:
-            return []
+    for src, count in sorted(snap.source_counts.items(), key=lambda x: x[1], reverse=True):
+        html += f'<p>{src}: {count} 条</p>'
     
-    def _add_subscription(self, keyword: str):
-        """添加订阅"""
-        from subscription import SubscriptionManager
-        mgr = SubscriptionManager()
-        mgr.add_subscription(keyword)
+    html += '<h3 style="margin-top: 20px; color: #4fbdba;">🏷️ 分类统计</h3>'
+    html += f'<p>🤖 AI: {categories["ai"]} 条</p>'
+    html += f'<p>🦾 Robotics: {categories["robotics"]} 条</p>'
+    html += f'<p>🚀 Space: {categories["space"]} 条</p>'
+    html += f'<p>🔔 订阅数: {len(snap.subscriptions)} 个</p>'
     
-    def _remove_subscription(self, sub_id: str):
-        """移除订阅"""
-        from subscription import SubscriptionManager
-        mgr = SubscriptionManager()
-        mgr.remove_subscription(sub_id)
+    html += '<h3 style="margin-top: 20px; color: #4fbdba;">🩺 数据源健康</h3>'
+    if not snap.health:
+        html += '<p>暂无采集记录</p>'
+    for name, entry in sorted(snap.health.items()):
+        if entry.get('state') == 'closed' and not entry.get('failures'):
+            html += f'<p>✅ {escape(name)}: 正常 (上次成功 {(entry.get("last_success") or "-")[:16]})</p>'
+        elif entry.get('state') == 'closed':
+            html += f'<p>⚠️ {escape(name)}: 连续失败 {entry["failures"]} 次 ({escape(entry.get("last_error") or "")})</p>'
+        else:
+            retry = datetime.fromtimestamp(entry.get('open_until', 0)).strftime('%m-%d %H:%M')
+            html += (f'<p>⛔ {escape(name)}: 熔断中，连续失败 {entry.get("failures", 0)} 次，'
+                     f'{retry} 后试探 ({escape(entry.get("last_error") or "")})</p>')
     
-    def log_message(self, format, *args):
-        pass  # 静默日志
+    html += '</div>'
+    return html
+
+def render_reports(snap: DataSnapshot) -> str:
+    """渲染历史报告页"""
+    html = '''
+    <div class="section">
+        <h2>📄 历史报告</h2>
+    '''
+    
+    for report in snap.reports[:30]:
+        date = report.replace('report-', '').replace('.md', '')
+        html += f'''
+        <div class="news-item">
+            <div class="news-title">
+                <a href="/reports/{report}" target="_blank">📅 {date} 日报</a>
+            </div>
+        </div>
+        '''
+    
+    html += '</div>'
+    return html
+
+PAGE_RENDERERS = {
+    '': render_home,
+    'subscriptions': render_subscriptions,
+    'stats': render_stats,
+    'reports': render_reports,
+}
 
 
 def start_server(port: int = 8080):
-    """启动Web服务器"""
-    server = HTTPServer(('0.0.0.0', port), StellarPulseHandler)
+    """启动Web服务器 (每个请求一个线程)"""
+    # 迁移旧数据、补建索引和签名只在启动时做一次，请求路径上的连接不再检查
+    open_store().close()
+    server = ThreadingHTTPServer(('0.0.0.0', port), StellarPulseHandler)
+    server.daemon_threads = True
     print(f"🌐 Web界面启动: http://0.0.0.0:{port}")
     server.serve_forever()
 
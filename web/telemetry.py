@@ -0,0 +1,191 @@
+"""Web服务运行指标 - Prometheus 文本格式
+
+请求线程只把 (类型, 标签, 耗时) 追加到 deque (CPython 下 append 是原子操作)，
+不获取任何锁；抓取 /metrics 时才把积压的事件汇总进直方图。
+"""
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Any
+
+# 请求和快照重建耗时的直方图桶 (秒)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 长时间无人抓取时积压的事件数达到该值，由记录线程顺手汇总 (拿不到锁就跳过，不会等待)
+DRAIN_THRESHOLD = 10000
+
+class Histogram:
+    """累积直方图"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def lines(self, name: str, labels: str = '') -> List[str]:
+        sep = ',' if labels else ''
+        out = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f'{{{labels}}}' if labels else ''
+        out.append(f'{name}_sum{suffix} {self.sum:.6f}')
+        out.append(f'{name}_count{suffix} {self.count}')
+        return out
+
+
+class Telemetry:
+    """请求与快照重建事件的记录和汇总"""
+
+    def __init__(self):
+        self._events = deque()
+        self._drain_lock = threading.Lock()
+        self.requests: Dict[tuple, int] = {}          # (page, code) -> 次数
+        self.latency: Dict[str, Histogram] = {}       # page -> 耗时直方图
+        self.reloads = Histogram()
+
+    def record_request(self, page: str, code: int, seconds: float):
+        self._events.append(('request', page, code, seconds))
+        self._maybe_drain()
+
+    def record_reload(self, seconds: float):
+        self._events.append(('reload', None, None, seconds))
+        self._maybe_drain()
+
+    def _maybe_drain(self):
+        if len(self._events) > DRAIN_THRESHOLD and self._drain_lock.acquire(blocking=False):
+            try:
+                self._drain()
+            finally:
+                self._drain_lock.release()
+
+    def _drain(self):
+        events = self._events
+        while True:
+            try:
+                kind, page, code, seconds = events.popleft()
+            except IndexError:
+                break
+            if kind == 'request':
+                self.requests[(page, code)] = self.requests.get((page, code), 0) + 1
+                histogram = self.latency.get(page)
+                if histogram is None:
+                    histogram = self.latency[page] = Histogram()
+                histogram.observe(seconds)
+            else:
+                self.reloads.observe(seconds)
+
+    def render(self, snapshot) -> bytes:
+        """汇总积压事件，并结合快照中的资讯统计与采集运行记录输出全部指标"""
+        with self._drain_lock:
+            self._drain()
+            out = []
+
+            out += ['# HELP stellarpulse_http_requests_total HTTP requests by page and status code.',
+                    '# TYPE stellarpulse_http_requests_total counter']
+            for (page, code), n in sorted(self.requests.items()):
+                out.append(f'stellarpulse_http_requests_total{{page="{_escape(page)}",code="{code}"}} {n}')
+
+            out += ['# HELP stellarpulse_http_request_duration_seconds HTTP request latency by page.',
+                    '# TYPE stellarpulse_http_request_duration_seconds histogram']
+            for page, histogram in sorted(self.latency.items()):
+                out += histogram.lines('stellarpulse_http_request_duration_seconds', f'page="{_escape(page)}"')
+
+            out += ['# HELP stellarpulse_snapshot_reload_duration_seconds Time spent rebuilding the data snapshot.',
+                    '# TYPE stellarpulse_snapshot_reload_duration_seconds histogram']
+            out += self.reloads.lines('stellarpulse_snapshot_reload_duration_seconds')
+            out += ['# HELP stellarpulse_snapshot_reloads_total Data snapshot rebuilds.',
+                    '# TYPE stellarpulse_snapshot_reloads_total counter',
+                    f'stellarpulse_snapshot_reloads_total {self.reloads.count}']
+
+        out += _data_lines(snapshot)
+        out += _run_lines(snapshot.runs)
+        out += _health_lines(snapshot.health)
+        return ('\n'.join(out) + '\n').encode('utf-8')
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _data_lines(snapshot) -> List[str]:
+    out = ['# HELP stellarpulse_items Stored items.',
+           '# TYPE stellarpulse_items gauge',
+           f'stellarpulse_items {snapshot.total}',
+           '# HELP stellarpulse_items_by_category Stored items per category.',
+           '# TYPE stellarpulse_items_by_category gauge']
+    for cat, n in sorted(snapshot.category_counts.items()):
+        out.append(f'stellarpulse_items_by_category{{category="{_escape(cat)}"}} {n}')
+    out += ['# HELP stellarpulse_items_by_source Stored items per source.',
+            '# TYPE stellarpulse_items_by_source gauge']
+    for src, n in sorted(snapshot.source_counts.items()):
+        out.append(f'stellarpulse_items_by_source{{source="{_escape(src)}"}} {n}')
+    out += ['# HELP stellarpulse_subscription_matches_total Items matched per keyword subscription.',
+            '# TYPE stellarpulse_subscription_matches_total counter']
+    # 关键词可以重复，按订阅 id 区分；旧数据中同一秒创建的订阅 id 相同，合并为一个序列
+    matches: Dict[tuple, int] = {}
+    for sub in snapshot.subscriptions:
+        key = (sub.get("id", ""), sub.get("keyword", ""))
+        matches[key] = matches.get(key, 0) + sub.get("match_count", 0)
+    for (sub_id, keyword), n in sorted(matches.items()):
+        out.append(f'stellarpulse_subscription_matches_total{{id="{_escape(sub_id)}",keyword="{_escape(keyword)}"}} {n}')
+    return out
+
+def _run_lines(runs: List[Dict[str, Any]]) -> List[str]:
+    """采集运行指标：最后一次成功运行时间、各数据源最近耗时与轮询间隔"""
+    out = ['# HELP stellarpulse_last_success_timestamp_seconds Finish time of the last successful monitor run.',
+           '# TYPE stellarpulse_last_success_timestamp_seconds gauge']
+    succeeded = [r for r in runs if r.get('status') == 'ok']
+    if succeeded:
+        out.append(f'stellarpulse_last_success_timestamp_seconds {_timestamp(succeeded[-1].get("finished_at"))}')
+
+    # 单次运行记录包含全部数据源，常驻模式下每条记录只有一个数据源；取各数据源最近的一条
+    latest: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        for src in run.get('sources', []):
+            latest[src.get('name')] = src
+
+    out += ['# HELP stellarpulse_source_fetch_seconds Fetch time of the latest poll of each source.',
+            '# TYPE stellarpulse_source_fetch_seconds gauge']
+    for name, src in sorted(latest.items()):
+        out.append(f'stellarpulse_source_fetch_seconds{{source="{_escape(name)}"}} {src.get("seconds", 0)}')
+
+    out += ['# HELP stellarpulse_source_poll_interval_seconds Current polling interval of each source in daemon mode.',
+            '# TYPE stellarpulse_source_poll_interval_seconds gauge']
+    for name, src in sorted(latest.items()):
+        if 'interval' in src:
+            out.append(f'stellarpulse_source_poll_interval_seconds{{source="{_escape(name)}"}} {src["interval"]}')
+    return out
+
+def _health_lines(health: Dict[str, Dict[str, Any]]) -> List[str]:
+    """熔断状态：是否熔断中 (open/half_open 为 1)、连续失败次数和累计失败次数"""
+    out = ['# HELP stellarpulse_source_circuit_open Whether the source is skipped by the circuit breaker.',
+           '# TYPE stellarpulse_source_circuit_open gauge']
+    for name, entry in sorted(health.items()):
+        out.append(f'stellarpulse_source_circuit_open{{source="{_escape(name)}"}} {int(entry.get("state") != "closed")}')
+    out += ['# HELP stellarpulse_source_consecutive_failures Consecutive failed fetches per source.',
+            '# TYPE stellarpulse_source_consecutive_failures gauge']
+    for name, entry in sorted(health.items()):
+        out.append(f'stellarpulse_source_consecutive_failures{{source="{_escape(name)}"}} {entry.get("failures", 0)}')
+    # total_failures 随 source_health.json 持久化，只增不减，可直接用 rate() 计算失败率
+    out += ['# HELP stellarpulse_source_errors_total Failed fetches per source.',
+            '# TYPE stellarpulse_source_errors_total counter']
+    for name, entry in sorted(health.items()):
+        out.append(f'stellarpulse_source_errors_total{{source="{_escape(name)}"}} {entry.get("total_failures", 0)}')
+    return out
+
+def _timestamp(iso: str) -> float:
+    try:
+        return round(datetime.fromisoformat(iso).timestamp(), 3)
+    except (TypeError, ValueError):
+        return 0